@@ -20,6 +20,7 @@ import Util
 
 class MyAdminInfo:
     SESSION_TIMEOUT_TIME: float = 300
+    __slots__: tuple[str, ...] = ('__token__', '__access_type__', '__enabled__', '__expires__', '__username__', '__usermail__', '__buffer__', '__user_icon__', '__last_session__', '__generation__')
 
     def __init__(self, token: int | uuid.UUID, access_type: Util.UserElevationType, enabled: bool, expires: float, username: str, email: str | None, password_buffer: bytes = None, *, user_icon: numpy.ndarray = None):
         self.__token__: uuid.UUID = token if isinstance(token, uuid.UUID) else uuid.UUID(int=token, version=4)
@@ -31,11 +32,23 @@ class MyAdminInfo:
         self.__buffer__: bytes = None if password_buffer is None else bytes(password_buffer)
         self.__user_icon__: bytes = None if user_icon is None else cv2.resize(user_icon, (256, 256, 3)).tobytes()
         self.__last_session__: tuple[datetime.datetime, float, int] | None = None
+        self.__generation__: int = 0
 
         assert len(self.__username__) >= 8, 'Username too short'
         assert re.fullmatch(r'[^@]+@[^@]+\.[^@]+', self.__usermail__), 'Invalid email'
 
+    def __getstate__(self) -> dict[str, typing.Any]:
+        return {attr: getattr(self, attr) for attr in MyAdminInfo.__slots__ if hasattr(self, attr)}
+
+    def __setstate__(self, state: dict[str, typing.Any]) -> None:
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
+        self.__generation__ = 0
+
     def set_password(self, password: str | None) -> None:
+        self.__generation__ += 1
+
         if password is None:
             self.__buffer__ = None
             return
@@ -117,6 +130,10 @@ class MyAdminInfo:
     def token(self) -> uuid.UUID:
         return self.__token__
 
+    @property
+    def generation(self) -> int:
+        return self.__generation__
+
     @property
     def does_expire(self) -> bool:
         return self.__expires__ != -1
@@ -148,6 +165,7 @@ class MyAdminInfo:
     @enabled.setter
     def enabled(self, value: bool) -> None:
         self.__enabled__ = bool(value)
+        self.__generation__ += 1
 
     @expires.setter
     def expires(self, expires: datetime.datetime | None) -> None:
@@ -158,24 +176,31 @@ class MyAdminInfo:
         else:
             self.__expires__ = expires.astimezone(datetime.timezone.utc).timestamp()
 
+        self.__generation__ += 1
+
     @access.setter
     def access(self, access_level: int | Util.UserElevationType) -> None:
         self.__access_type__ = Util.UserElevationType(access_level)
+        self.__generation__ += 1
 
     @username.setter
     def username(self, username: str) -> None:
         self.__username__ = str(username)
+        self.__generation__ += 1
         assert len(self.__username__) >= 8, 'Username too short'
 
     @usermail.setter
     def usermail(self, email: str) -> None:
         self.__usermail__ = str(email)
+        self.__generation__ += 1
         assert re.fullmatch(r'[^@]+@[^@]+\.[^@]+', self.__usermail__), 'Invalid email'
 
     @usericon.setter
-    def usericon(self, icon: PIL.Image.Image | None) -> None:
-        if icon is None:
-            self.__user_icon__ = None
+    def usericon(self, icon: PIL.Image.Image | bytes | None) -> None:
+        self.__generation__ += 1
+
+        if icon is None or isinstance(icon, bytes):
+            self.__user_icon__ = icon
             return
 
         bytestream: io.BytesIO = io.BytesIO()
@@ -208,6 +233,8 @@ class MyAdminCache:
             except Exception as err:
                 raise IOError('Failed to load user data') from err
 
+            cache.__saved_generation__ = cache.__current_generation__()
+
         zero: uuid.UUID = uuid.UUID(int=0, version=4)
 
         if zero not in cache.__cache__ and os.name == 'nt':
@@ -217,9 +244,18 @@ class MyAdminCache:
 
     def __init__(self):
         self.__cache__: dict[uuid.UUID, MyAdminInfo] = {}
+        self.__generation__: int = 0
+        self.__saved_generation__: tuple[int, int] | None = None
+
+    def __current_generation__(self) -> tuple[int, int]:
+        return self.__generation__, sum(admin.generation for admin in self.__cache__.values())
 
-    def save(self, path: str) -> None:
+    def save(self, path: str, force: bool = False) -> bool:
         file: FileSystem.File = FileSystem.File(path)
+        generation: tuple[int, int] = self.__current_generation__()
+
+        if not force and generation == self.__saved_generation__ and file.exists():
+            return False
 
         try:
             for admin in self.__cache__.values():
@@ -228,12 +264,16 @@ class MyAdminCache:
 
             with file.open('wb') as f:
                 pickle.dump(self.__cache__, f)
+
+            self.__saved_generation__ = generation
+            return True
         except Exception as err:
             raise IOError('Failed to save user data') from err
 
     def del_user(self, token: uuid.UUID) -> None:
         if token in self.__cache__:
             del self.__cache__[token]
+            self.__generation__ += 1
 
     def add_user(self, access_type: int | Util.UserElevationType, enabled: bool, expires: float, username: str, email: str | None, password: str | None, *, token: uuid.UUID = None) -> MyAdminInfo:
         assert isinstance(access_type, (int, Util.UserElevationType))
@@ -254,6 +294,7 @@ class MyAdminCache:
         user: MyAdminInfo = MyAdminInfo(token, Util.UserElevationType(access_type), enabled, expires, username, email)
         user.set_password(password)
         self.__cache__[token] = user
+        self.__generation__ += 1
         return user
 
     def get_user_by_token(self, token: uuid.UUID) -> MyAdminInfo | None:
@@ -0,0 +1,710 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import typing
+
+import SQLiteStorage
+import Storage
+import Util
+
+
+@contextlib.contextmanager
+def workspace() -> typing.Iterator[str]:
+    """
+    Runs the enclosed benchmark inside a temporary working directory with a fresh storage singleton
+    :return: (Iterator[str]) The temporary directory path
+    """
+
+    cwd: str = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.chdir(root)
+        os.makedirs('Data', exist_ok=True)
+        Storage.MyGlobalServerStorage.STORAGE = None
+
+        try:
+            yield root
+        finally:
+            Storage.MyGlobalServerStorage.STORAGE = None
+            os.chdir(cwd)
+
+
+def build_catalog(storage: Storage.MyGlobalServerStorage, games: int, sections: int, children: int) -> int:
+    """
+    Fills the specified storage with a synthetic catalog
+    :param storage: (MyGlobalServerStorage) The storage to fill
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :return: (int) The total number of created entries
+    """
+
+    for i in range(games):
+        game: Storage.MyGameStorageInfo = storage.add_game(f'game_{i:06}')
+        game.visible = True
+
+        for j in range(sections):
+            section: Storage.MyGameStorageInfo.MyGameSectionInfo = game.add_section(f'section_{j:04}', f'Section {j}', None, True)
+
+            for k in range(children):
+                section.add_child(f'child_{k:04}', f'Child {i}-{j}-{k}', f'https://example.com/{i}/{j}/{k}', None, k % 2 == 0)
+
+    for i in range(max(1, games // 10)):
+        storage.add_program(f'program_{i:06}').visible = True
+        storage.add_contact(f'contact_{i:06}').visible = True
+
+    return games + games * sections + games * sections * children + 2 * max(1, games // 10)
+
+
+def benchmark_storage_engines(games: int = 100, sections: int = 10, children: int = 10, edits: int = 100) -> dict[str, float]:
+    """
+    Compares cold load time and per-edit write cost of the JSON and SQLite storage engines
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :param edits: (int) The number of single-child edits to time
+    :return: (dict[str, float]) The measured timings in seconds
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        results['entries'] = build_catalog(Storage.MyGlobalServerStorage.load('Data/storage.json'), games, sections, children)
+        Storage.MyGlobalServerStorage.STORAGE.save('Data/storage.json')
+        Storage.MyGlobalServerStorage.STORAGE = None
+
+        start: float = time.perf_counter()
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        results['json-load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        for i in range(edits):
+            storage.get_game(f'game_{i % games:06}').get_section('section_0000').get_child('child_0000').url = f'https://example.org/{i}'
+            storage.save('Data/storage.json')
+
+        results['json-edit'] = (time.perf_counter() - start) / edits
+        Storage.MyGlobalServerStorage.STORAGE = None
+
+        start = time.perf_counter()
+        SQLiteStorage.MySQLiteServerStorage.migrate('Data/storage.json', 'Data/storage.db')
+        results['sqlite-migrate'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        storage = SQLiteStorage.MySQLiteServerStorage.load('Data/storage.db')
+        results['sqlite-load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        for i in range(edits):
+            storage.get_game(f'game_{i % games:06}').get_section('section_0000').get_child('child_0000').url = f'https://example.org/{i}'
+            storage.save('Data/storage.json')
+
+        results['sqlite-edit'] = (time.perf_counter() - start) / edits
+        storage.close()
+
+    return results
+
+
+def benchmark_snapshot_formats(games: int = 500, sections: int = 10, children: int = 10) -> dict[str, float]:
+    """
+    Compares cold load time, save time and file size of the JSON and binary snapshot formats
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :return: (dict[str, float]) The measured timings in seconds and file sizes in bytes
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        results['entries'] = build_catalog(Storage.MyGlobalServerStorage.load('Data/storage.json'), games, sections, children)
+
+        for name, path in (('json', 'Data/storage.json'), ('binary', 'Data/storage.bin')):
+            start: float = time.perf_counter()
+            Storage.MyGlobalServerStorage.STORAGE.save(path, True)
+            results[f'{name}-save'] = time.perf_counter() - start
+            results[f'{name}-size'] = os.path.getsize(path)
+
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.STORAGE
+
+        for name, path in (('json', 'Data/storage.json'), ('binary', 'Data/storage.bin')):
+            Storage.MyGlobalServerStorage.STORAGE = None
+            start: float = time.perf_counter()
+            Storage.MyGlobalServerStorage.load(path)
+            results[f'{name}-load'] = time.perf_counter() - start
+
+        Storage.MyGlobalServerStorage.STORAGE = storage
+
+    return results
+
+
+def benchmark_lazy_loading(games: int = 500, sections: int = 10, children: int = 10) -> dict[str, float]:
+    """
+    Compares cold load time and resident memory of eager and lazy binary snapshot loading
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :return: (dict[str, float]) The measured timings in seconds and memory in bytes
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        results['entries'] = build_catalog(Storage.MyGlobalServerStorage.load('Data/storage.bin'), games, sections, children)
+        Storage.MyGlobalServerStorage.STORAGE.save('Data/storage.bin')
+
+        for name, lazy in (('eager', False), ('lazy', True)):
+            Storage.MyGlobalServerStorage.STORAGE = None
+            tracemalloc.start()
+            start: float = time.perf_counter()
+            storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.bin', lazy)
+            results[f'{name}-load'] = time.perf_counter() - start
+            results[f'{name}-memory'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+        start = time.perf_counter()
+
+        for i in range(games):
+            storage.get_game(f'game_{i:06}').get_section('section_0000')
+
+        results['lazy-materialize'] = (time.perf_counter() - start) / games
+        start = time.perf_counter()
+        results['lazy-evicted'] = storage.evict()
+        results['lazy-evict'] = time.perf_counter() - start
+
+    return results
+
+
+def benchmark_search(games: int = 1000, sections: int = 10, children: int = 10, queries: int = 1000) -> dict[str, float]:
+    """
+    Measures search index build time and per-query latency over a synthetic catalog
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :param queries: (int) The number of queries to time per query kind
+    :return: (dict[str, float]) The measured timings in seconds
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+        start: float = time.perf_counter()
+        storage.reindex_search()
+        results['build'] = time.perf_counter() - start
+        results['documents'] = len(storage.search_index)
+        results['vocabulary'] = storage.search_index.vocabulary_size
+
+        for name, query in (('exact', 'child 7-3-2'), ('prefix', 'game_0004'), ('multi-token', 'example 12 section'), ('common-tokens', 'https example com 17'), ('miss', 'nonexistent')):
+            start = time.perf_counter()
+
+            for _ in range(queries):
+                storage.search_index.search(query, 20)
+
+            results[f'{name}-query'] = (time.perf_counter() - start) / queries
+
+        start = time.perf_counter()
+
+        for i in range(queries):
+            storage.search(f'child {i % games}-1', 20)
+
+        results['public-query'] = (time.perf_counter() - start) / queries
+
+    return results
+
+
+def benchmark_catalog_query(games: int = 5000, sections: int = 2, children: int = 2, pages: int = 100) -> dict[str, float]:
+    """
+    Compares a full admin listing against a single paginated query page
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :param pages: (int) The number of listings and pages to time
+    :return: (dict[str, float]) The measured timings in seconds
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+        start: float = time.perf_counter()
+
+        for _ in range(pages):
+            storage.send_dict(False)['game-storage']
+
+        results['full-listing'] = (time.perf_counter() - start) / pages
+        start = time.perf_counter()
+
+        for _ in range(pages):
+            storage.send_category('game', False)
+
+        results['category-listing'] = (time.perf_counter() - start) / pages
+
+        for name, arguments in (('page-name', {}), ('page-display-name', {'sort': 'display-name', 'descending': True}), ('page-visible', {'visible': True}), ('page-prefix', {'prefix': 'game_0012'})):
+            cursor: str | None = None
+            start = time.perf_counter()
+
+            for _ in range(pages):
+                page, cursor = storage.query('game', cursor=cursor, limit=50, **arguments)
+
+            results[name] = (time.perf_counter() - start) / pages
+
+        start = time.perf_counter()
+        storage.reindex_orders()
+        results['reindex'] = time.perf_counter() - start
+
+    return results
+
+
+def benchmark_game_transaction(sections: int = 200, children: int = 5) -> dict[str, float]:
+    """
+    Compares piecemeal setter edits against a single batched game transaction on both storage engines
+    Also compares the diff returned for a single-section edit against the full games listing
+    :param sections: (int) The number of sections edited
+    :param children: (int) The number of children per section
+    :return: (dict[str, float]) The measured timings in seconds and diff sizes in bytes
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        build_catalog(Storage.MyGlobalServerStorage.load('Data/storage.json'), 20, sections, children)
+        Storage.MyGlobalServerStorage.STORAGE.save('Data/storage.json', True)
+        Storage.MyGlobalServerStorage.STORAGE = None
+        SQLiteStorage.MySQLiteServerStorage.migrate('Data/storage.json', 'Data/storage.db')
+        Storage.MyGlobalServerStorage.STORAGE = None
+
+        for engine, loader in (('json', lambda: Storage.MyGlobalServerStorage.load('Data/storage.json')), ('sqlite', lambda: SQLiteStorage.MySQLiteServerStorage.load('Data/storage.db'))):
+            storage: Storage.MyGlobalServerStorage = loader()
+            game: Storage.MyGameStorageInfo = storage.get_game('game_000000')
+            start: float = time.perf_counter()
+
+            with storage.writer():
+                for j in range(sections):
+                    section: Storage.MyGameStorageInfo.MyGameSectionInfo = game.get_section(f'section_{j:04}')
+                    section.display_name = f'Edited Section {j}'
+                    section.visible = j % 2 == 0
+
+                    for k in range(children):
+                        section.get_child(f'child_{k:04}').url = f'https://example.org/{j}/{k}'
+
+            results[f'{engine}-piecemeal'] = time.perf_counter() - start
+            changes: dict[str, typing.Any] = {'sections': {f'section_{j:04}': {'display-name': f'Batched Section {j}', 'visible': j % 2 == 1, 'children': {f'child_{k:04}': {'url': f'https://example.net/{j}/{k}'} for k in range(children)}} for j in range(sections)}}
+            start = time.perf_counter()
+            diff: dict[str, typing.Any] = storage.apply_game_changes('game_000000', changes)
+            results[f'{engine}-transaction'] = time.perf_counter() - start
+            diff = storage.apply_game_changes('game_000000', {'sections': {'section_0000': {'display-name': 'Single Edit', 'children': {'child_0000': {'visible': False}}}}})
+            results[f'{engine}-diff-size'] = len(json.dumps(diff))
+            results[f'{engine}-listing-size'] = len(json.dumps(storage.send_category('game', False)))
+
+            if isinstance(storage, SQLiteStorage.MySQLiteServerStorage):
+                storage.close()
+
+            Storage.MyGlobalServerStorage.STORAGE = None
+
+    return results
+
+
+def benchmark_streaming_dump(games: int = 1000, sections: int = 10, children: int = 10) -> dict[str, float]:
+    """
+    Compares peak memory and the longest uninterrupted encode step of a single json.dumps against the chunked catalog stream
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :return: (dict[str, float]) The measured timings in seconds and memory in bytes
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+        tracemalloc.start()
+        start: float = time.perf_counter()
+        body: str = json.dumps(storage.send_dict(False))
+        results['dumps-time'] = time.perf_counter() - start
+        results['dumps-peak'] = tracemalloc.get_traced_memory()[1]
+        results['dumps-size'] = len(body)
+        tracemalloc.stop()
+        del body
+
+        tracemalloc.start()
+        size: int = 0
+        longest: float = 0
+        start = time.perf_counter()
+        last: float = start
+
+        for chunk in Storage.MyJsonStream.chunks(storage.iter_json(False)):
+            now: float = time.perf_counter()
+            longest = max(longest, now - last)
+            size += len(chunk)
+            last = now
+
+        results['stream-time'] = time.perf_counter() - start
+        results['stream-longest-step'] = longest
+        results['stream-peak'] = tracemalloc.get_traced_memory()[1]
+        results['stream-size'] = size
+        tracemalloc.stop()
+
+    return results
+
+
+def benchmark_ndjson_transfer(games: int = 2000, sections: int = 10, children: int = 10) -> dict[str, float]:
+    """
+    Measures NDJSON export and bulk import against a whole-document JSON load
+    Transient memory is the allocation peak above the memory retained by the loaded catalog
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :return: (dict[str, float]) The measured timings in seconds and memory in bytes
+    """
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+        storage.save('Data/storage.json', True)
+        start: float = time.perf_counter()
+
+        with open('Data/catalog.ndjson', 'w') as f:
+            results['records'] = sum(f.write(line) > 0 for line in storage.export_ndjson())
+
+        results['export'] = time.perf_counter() - start
+        Storage.MyGlobalServerStorage.STORAGE = None
+
+        def import_ndjson() -> None:
+            with open('Data/catalog.ndjson', 'rb') as source:
+                Storage.MyGlobalServerStorage.load('Data/empty.json').import_ndjson(source)
+
+        for name, loader in (('json-load', lambda: Storage.MyGlobalServerStorage.load('Data/storage.json')), ('ndjson-import', import_ndjson)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            loader()
+            results[f'{name}-time'] = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            results[f'{name}-transient'] = peak - current
+            tracemalloc.stop()
+            Storage.MyGlobalServerStorage.STORAGE = None
+
+    return results
+
+
+def benchmark_catalog_snapshot(games: int = 2000, sections: int = 10, children: int = 10, lookups: int = 1000) -> dict[str, float]:
+    """
+    Measures publishing the shared catalog snapshot and single item lookups through it
+    The baseline decodes the whole catalog document per lookup as a sub-server calling back over HTTP would
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :param lookups: (int) The number of item lookups
+    :return: (dict[str, float]) The measured timings in seconds and sizes in bytes
+    """
+
+    import CatalogSnapshot
+    import random
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+        names: list[str] = random.Random(0).choices(tuple(storage.__game_info__.keys()), k=lookups)
+        start: float = time.perf_counter()
+        storage.publish_snapshot('Data/catalog-snapshot')
+        results['publish'] = time.perf_counter() - start
+        results['snapshot-bytes'] = os.path.getsize(os.path.join('Data/catalog-snapshot', f'{storage.version}.snap'))
+        start = time.perf_counter()
+        snapshot: CatalogSnapshot.MyCatalogSnapshot = CatalogSnapshot.MyCatalogSnapshot.open('Data/catalog-snapshot')
+        results['open'] = time.perf_counter() - start
+        start = time.perf_counter()
+
+        for name in names:
+            snapshot.get('game', name)
+
+        results['snapshot-lookup'] = (time.perf_counter() - start) / lookups
+        start = time.perf_counter()
+
+        for _ in range(100):
+            snapshot.refresh()
+
+        results['refresh-unchanged'] = (time.perf_counter() - start) / 100
+        snapshot.close()
+        document: str = json.dumps(storage.send_dict(False))
+        results['document-bytes'] = len(document)
+        start = time.perf_counter()
+
+        for name in names[:max(1, lookups // 100)]:
+            json.loads(document)['game-storage'].get(name)
+
+        results['document-lookup'] = (time.perf_counter() - start) / max(1, lookups // 100)
+
+    return results
+
+
+def benchmark_json_codec(games: int = 500, sections: int = 10, children: int = 10, rounds: int = 5) -> dict[str, float]:
+    """
+    Measures encode and decode throughput of each available JSON backend on the payload shapes of the hot paths
+    Games carry 128-bit icon and background IDs as stored, so storage documents exercise the wide integer fallback
+    :param games: (int) The number of games
+    :param sections: (int) The number of sections per game
+    :param children: (int) The number of children per section
+    :param rounds: (int) The number of repetitions per measurement
+    :return: (dict[str, float]) The measured throughput in MB/s and payload sizes in bytes
+    """
+
+    import JsonCodec
+    import uuid
+
+    results: dict[str, float] = {}
+    backend: str = JsonCodec.BACKEND
+
+    with workspace():
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+        build_catalog(storage, games, sections, children)
+
+        for game in storage.__game_info__.values():
+            game.__icon_image__ = uuid.uuid4().int
+            game.__background_image__ = uuid.uuid4().int
+
+        payloads: dict[str, typing.Any] = {
+            'catalog': storage.send_dict(),
+            'admin-page': storage.query('game', limit=50)[0],
+            'storage': {f'{category}-storage': {name: item.save() for name, item in items.items()} for category, items in (('game', storage.__game_info__), ('program', storage.__program_info__), ('contact', storage.__contact_info__))},
+            'ndjson': list(Storage.MyNdjsonCodec.records(storage)),
+            'events': [{'since': i, 'version': i + 1, 'events': [{'kind': 'updated', 'category': 'game', 'path': [f'game_{i % games:06}'], 'fields': ['visible']}]} for i in range(1000)]
+        }
+
+        try:
+            for shape, payload in payloads.items():
+                items: list[typing.Any] = payload if isinstance(payload, list) else [payload]
+                results[f'{shape}-bytes'] = sum(len(json.dumps(item)) for item in items)
+
+                for name in JsonCodec.BACKENDS:
+                    JsonCodec.use_backend(name)
+                    encoded: list[bytes] = [JsonCodec.dumpb(item) for item in items]
+                    size: int = sum(len(item) for item in encoded)
+                    start: float = time.perf_counter()
+
+                    for _ in range(rounds):
+                        for item in items:
+                            JsonCodec.dumpb(item)
+
+                    results[f'{shape}-encode-{name}'] = size * rounds / (time.perf_counter() - start) / 1e6
+                    start = time.perf_counter()
+
+                    for _ in range(rounds):
+                        for item in encoded:
+                            JsonCodec.loads(item)
+
+                    results[f'{shape}-decode-{name}'] = size * rounds / (time.perf_counter() - start) / 1e6
+        finally:
+            JsonCodec.use_backend(backend)
+
+    return results
+
+
+def benchmark_image_cache(images: int = 32, requests: int = 20000) -> dict[str, float]:
+    """
+    Compares serving hot icons from disk, as the image routes used to, with the in-memory image body cache
+    :param images: (int) The number of distinct icons in the working set
+    :param requests: (int) The number of simulated requests
+    :return: (dict[str, float]) The measured microseconds per request and cache counters
+    """
+
+    import Image
+    import PIL.Image
+
+    results: dict[str, float] = {}
+
+    with workspace():
+        loader: Image.MyImageLoader = Image.MyImageLoader('Data/images', 64 * 2 ** 20)
+        container: Image.MyImageLoader.MyImageContainer = loader.MyIconStorage
+        ids: list[int] = [container.set_image(None, PIL.Image.effect_noise((512, 512), 32).convert('RGB')) for _ in range(images)]
+        start: float = time.perf_counter()
+
+        for i in range(requests):
+            file: typing.Any = container.image_file(ids[i % images])
+
+            with open(file.filepath, 'rb') as f:
+                f.read()
+
+        results['disk-us'] = (time.perf_counter() - start) / requests * 1e6
+        start = time.perf_counter()
+
+        for i in range(requests):
+            image_id: int = ids[i % images]
+
+            if container.cache.get(container.dir.dirpath, image_id) is None:
+                container.cache.load(container.dir.dirpath, image_id, (), container.image_file(image_id).filepath)
+
+        results['cached-us'] = (time.perf_counter() - start) / requests * 1e6
+        results.update({f'cache-{key}': value for key, value in container.cache.status.items()})
+
+    return results
+
+
+def peak_memory(reset: bool = False) -> float:
+    """
+    Gets the peak resident memory of this process
+    On Linux the peak is read from and reset through procfs, as the rusage peak is inherited across fork and exec
+    :param reset: (bool) Whether to reset the peak to the current resident memory
+    :return: (float) The peak resident memory in MiB
+    """
+
+    import resource
+
+    try:
+        if reset:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_upload(data: bytes, image_size: tuple[int, int], legacy: bool) -> tuple[float, float, bool]:
+    """
+    Encodes an uploaded image once in a fresh process and measures its cost
+    :param data: (bytes) The base64 encoded image
+    :param image_size: (tuple[int, int]) The target size
+    :param legacy: (bool) Whether to fully decode and resize with the default filter as uploads used to
+    :return: (tuple[float, float, bool]) The CPU seconds, the peak resident memory growth in MiB and whether the image was rejected
+    """
+
+    import base64
+    import io
+    import Image
+    import ImageWorker
+    import PIL.Image
+
+    baseline: float = peak_memory(True)
+    start: float = time.process_time()
+    rejected: bool = False
+
+    if legacy:
+        with PIL.Image.open(io.BytesIO(base64.b64decode(data)), 'r') as image:
+            width, height = image.size
+            scale: float = min(image_size[0] / width, image_size[1] / height)
+            resized: PIL.Image.Image = image.resize((round(width * scale), round(height * scale)))
+            blackbox: PIL.Image.Image = PIL.Image.new('RGB', image_size, 0x000000)
+            blackbox.paste(resized, (max(0, round((image_size[0] - resized.width) / 2)), max(0, round((image_size[1] - resized.height) / 2))))
+            blackbox.save(io.BytesIO(), 'JPEG')
+    else:
+        try:
+            ImageWorker.encode_image(data, image_size, Image.MAX_PIXELS)
+        except ValueError:
+            rejected = True
+
+    return time.process_time() - start, peak_memory() - baseline, rejected
+
+
+def benchmark_image_upload(width: int = 12000, height: int = 8000, image_size: tuple[int, int] = (512, 512)) -> dict[str, float]:
+    """
+    Compares the per-upload CPU time and peak memory of full decoding with header checks, draft decoding and a single resize
+    Each upload is encoded in its own process so the resident memory peak is not shared between measurements
+    PNG cannot be decoded at a reduced size, so the default pixel budget rejects the PNG upload from its header
+    :param width: (int) The uploaded image width
+    :param height: (int) The uploaded image height
+    :param image_size: (tuple[int, int]) The target size, as for icons
+    :return: (dict[str, float]) The measured CPU seconds, peak memory growth in MiB and rejection of each pipeline, by format
+    """
+
+    import base64
+    import concurrent.futures
+    import io
+    import multiprocessing
+    import PIL.Image
+
+    results: dict[str, float] = {}
+    source: PIL.Image.Image = PIL.Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    uploads: dict[str, bytes] = {}
+
+    for image_format in ('JPEG', 'PNG'):
+        bytestream: io.BytesIO = io.BytesIO()
+        source.save(bytestream, image_format)
+        uploads[image_format.lower()] = base64.b64encode(bytestream.getvalue())
+
+    del source
+
+    for image_format, data in uploads.items():
+        for pipeline, legacy in (('legacy', True), ('draft', False)):
+            with concurrent.futures.ProcessPoolExecutor(1, multiprocessing.get_context('spawn')) as executor:
+                seconds, memory, rejected = executor.submit(measure_upload, data, image_size, legacy).result()
+
+            results[f'{image_format}-{pipeline}-cpu-s'] = seconds
+            results[f'{image_format}-{pipeline}-peak-mib'] = memory
+            results[f'{image_format}-{pipeline}-rejected'] = int(rejected)
+
+    return results
+
+
+def benchmark_entity_memory(count: int = 100000) -> dict[str, float]:
+    """
+    Measures the average allocated size of each storage entity class
+    Field values are shared between instances so only per-object overhead is counted
+    :param count: (int) The number of instances to allocate per class
+    :return: (dict[str, float]) The measured sizes in bytes per entity
+    """
+
+    import Admins
+
+    game: Storage.MyGameStorageInfo = Storage.MyGameStorageInfo('game', 'Game', 'https://example.com', None, None, True)
+    section: Storage.MyGameStorageInfo.MyGameSectionInfo = Storage.MyGameStorageInfo.MyGameSectionInfo(game, 'section', 'Section', None, True)
+    admin: Admins.MyAdminInfo = Admins.MyAdminInfo(0, Util.UserElevationType.ADMINISTRATOR, True, -1, 'username', 'user@example.com')
+    factories: dict[str, typing.Callable[[], typing.Any]] = {
+        'game': lambda: Storage.MyGameStorageInfo('game', 'Game', 'https://example.com', None, None, True),
+        'section': lambda: Storage.MyGameStorageInfo.MyGameSectionInfo(game, 'section', 'Section', None, True),
+        'child': lambda: Storage.MyGameStorageInfo.MyGameObjectInfo(section, 'child', 'Child', 'https://example.com', None, True),
+        'program': lambda: Storage.MyProgramStorageInfo('program', 'Program', 'https://example.com', None, True, 800, 600, Util.ProgramType.WEBSITE),
+        'contact': lambda: Storage.MyContactStorageInfo('contact', 'Contact', 'https://example.com', Util.ContactType.URL, None, True),
+        'admin': lambda: Admins.MyAdminInfo(admin.__token__, Util.UserElevationType.ADMINISTRATOR, True, -1, 'username', 'user@example.com'),
+    }
+    results: dict[str, float] = {}
+
+    for name, factory in factories.items():
+        instances: list[typing.Any] = [None] * count
+        tracemalloc.start()
+        start: int = tracemalloc.get_traced_memory()[0]
+
+        for i in range(count):
+            instances[i] = factory()
+
+        results[name] = (tracemalloc.get_traced_memory()[0] - start) / count
+        tracemalloc.stop()
+        del instances
+
+    return results
+
+
+def report(name: str, results: dict[str, float]) -> None:
+    print(f'\033[38;2;50;50;255m [*] {name}\033[0m')
+
+    for key, value in results.items():
+        print(f' ... {key:<24} {value:>12.6f}' if isinstance(value, float) else f' ... {key:<24} {value:>12}')
+
+
+if __name__ == '__main__':
+    report('Storage engines', benchmark_storage_engines())
+    report('Snapshot formats', benchmark_snapshot_formats())
+    report('Lazy loading', benchmark_lazy_loading())
+    report('Entity memory', benchmark_entity_memory())
+    report('Search', benchmark_search())
+    report('Catalog query', benchmark_catalog_query())
+    report('Game transaction', benchmark_game_transaction())
+    report('Streaming dump', benchmark_streaming_dump())
+    report('NDJSON transfer', benchmark_ndjson_transfer())
+    report('Catalog snapshot', benchmark_catalog_snapshot())
+    report('JSON codec', benchmark_json_codec())
+    report('Image cache', benchmark_image_cache())
+    report('Image upload', benchmark_image_upload())
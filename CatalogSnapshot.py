@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import typing
+
+
+class MyCatalogSnapshot:
+    """
+    Versioned read-only catalog snapshot shared with sub-servers through a memory-mapped file
+    Only depends on the standard library so sub-servers may import it without the parent's modules
+    """
+
+    MAGIC: bytes = b'ISCS'
+    FORMAT_VERSION: int = 1
+    CATEGORIES: tuple[str, ...] = ('game', 'program', 'contact')
+    HEADER: struct.Struct = struct.Struct('<4sHQ')
+    TABLE: struct.Struct = struct.Struct('<QI')
+    ENTRY: struct.Struct = struct.Struct('<QIQI')
+    POINTER: str = 'CURRENT'
+    KEEP: int = 3
+    ENVIRONMENT: str = 'CATALOGSNAPSHOT'
+
+    class MyIndexKeys:
+        __slots__: tuple[str, ...] = ('__snapshot__', '__category__')
+
+        def __init__(self, snapshot: MyCatalogSnapshot, category: str):
+            self.__snapshot__: MyCatalogSnapshot = snapshot
+            self.__category__: str = category
+
+        def __len__(self) -> int:
+            return self.__snapshot__.__tables__[self.__category__][1]
+
+        def __getitem__(self, index: int) -> bytes:
+            return self.__snapshot__.__name_bytes__(self.__category__, index)
+
+    @classmethod
+    def write(cls, directory: str, version: int, items: typing.Iterable[tuple[str, str, dict]]) -> str:
+        """
+        Writes and publishes a new snapshot, replacing the current pointer atomically
+        :param directory: (str) The snapshot directory
+        :param version: (int) The catalog version
+        :param items: (Iterable[tuple[str, str, dict]]) The (category, name, data) items to store
+        :return: (str) The published snapshot file path
+        """
+
+        assert isinstance(version, int) and version >= 0, 'Invalid snapshot version'
+        os.makedirs(directory, exist_ok=True)
+        entries: dict[str, list[tuple[bytes, int, int, int]]] = {category: [] for category in cls.CATEGORIES}
+        fd, temp = tempfile.mkstemp('.part', dir=directory)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                offset: int = cls.HEADER.size + cls.TABLE.size * len(cls.CATEGORIES)
+                f.write(bytes(offset))
+
+                for category, name, data in items:
+                    encoded_name: bytes = name.encode('utf-8')
+                    encoded_data: bytes = json.dumps(data, separators=(',', ':')).encode('utf-8')
+                    entries[category].append((encoded_name, offset, offset + len(encoded_name), len(encoded_data)))
+                    f.write(encoded_name)
+                    f.write(encoded_data)
+                    offset += len(encoded_name) + len(encoded_data)
+
+                tables: list[bytes] = []
+
+                for category in cls.CATEGORIES:
+                    index: list[tuple[bytes, int, int, int]] = sorted(entries[category])
+                    tables.append(cls.TABLE.pack(offset, len(index)))
+                    f.write(b''.join(cls.ENTRY.pack(name_offset, len(name), data_offset, data_length) for name, name_offset, data_offset, data_length in index))
+                    offset += cls.ENTRY.size * len(index)
+
+                f.seek(0)
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION, version))
+                f.write(b''.join(tables))
+
+            path: str = os.path.join(directory, f'{version}.snap')
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+        fd, temp = tempfile.mkstemp('.part', dir=directory)
+
+        with os.fdopen(fd, 'w') as f:
+            f.write(os.path.basename(path))
+
+        os.replace(temp, os.path.join(directory, cls.POINTER))
+        cls.prune(directory, os.path.basename(path))
+        return path
+
+    @classmethod
+    def prune(cls, directory: str, current: str) -> int:
+        """
+        Deletes all but the newest snapshots, skipping files still mapped on platforms that lock them
+        :param directory: (str) The snapshot directory
+        :param current: (str) The current snapshot file name
+        :return: (int) The number of deleted snapshots
+        """
+
+        snapshots: list[int] = sorted(int(name[:-5]) for name in os.listdir(directory) if name.endswith('.snap') and name[:-5].isdigit() and name != current)
+        removed: int = 0
+
+        for version in snapshots[:max(0, len(snapshots) - cls.KEEP + 1)]:
+            try:
+                os.remove(os.path.join(directory, f'{version}.snap'))
+                removed += 1
+            except OSError:
+                pass
+
+        return removed
+
+    @classmethod
+    def open(cls, directory: str | None = None) -> MyCatalogSnapshot:
+        """
+        Opens the current snapshot in the specified directory
+        :param directory: (str?) The snapshot directory or None to use the CATALOGSNAPSHOT environment variable
+        :return: (MyCatalogSnapshot) The snapshot reader
+        """
+
+        directory = os.getenv(cls.ENVIRONMENT) if directory is None else directory
+        assert directory is not None, 'Catalog snapshot directory not specified'
+        return cls(directory)
+
+    def __init__(self, directory: str):
+        self.__directory__: str = os.path.abspath(directory)
+        self.__file__: str | None = None
+        self.__map__: mmap.mmap | None = None
+        self.__version__: int = -1
+        self.__tables__: dict[str, tuple[int, int]] = {}
+        self.refresh()
+
+    def __enter__(self) -> MyCatalogSnapshot:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __table__(self, category: str) -> tuple[int, int]:
+        assert self.__map__ is not None, 'Catalog snapshot not published'
+        assert category in self.__tables__, 'Invalid catalog category'
+        return self.__tables__[category]
+
+    def __name_bytes__(self, category: str, index: int) -> bytes:
+        name_offset, name_length, _, _ = MyCatalogSnapshot.ENTRY.unpack_from(self.__map__, self.__tables__[category][0] + index * MyCatalogSnapshot.ENTRY.size)
+        return self.__map__[name_offset:name_offset + name_length]
+
+    def __find__(self, category: str, name: str) -> int | None:
+        self.__table__(category)
+        key: bytes = name.encode('utf-8')
+        keys: MyCatalogSnapshot.MyIndexKeys = MyCatalogSnapshot.MyIndexKeys(self, category)
+        index: int = bisect.bisect_left(keys, key)
+        return index if index < len(keys) and keys[index] == key else None
+
+    def __record__(self, category: str, index: int) -> tuple[str, memoryview]:
+        name_offset, name_length, data_offset, data_length = MyCatalogSnapshot.ENTRY.unpack_from(self.__map__, self.__tables__[category][0] + index * MyCatalogSnapshot.ENTRY.size)
+        return self.__map__[name_offset:name_offset + name_length].decode('utf-8'), memoryview(self.__map__)[data_offset:data_offset + data_length]
+
+    def refresh(self) -> bool:
+        """
+        Maps the newest published snapshot if it changed since the last call
+        :return: (bool) Whether a new snapshot was mapped
+        """
+
+        try:
+            with open(os.path.join(self.__directory__, MyCatalogSnapshot.POINTER), 'r') as f:
+                current: str = f.read().strip()
+        except FileNotFoundError:
+            return False
+
+        if current == self.__file__:
+            return False
+
+        try:
+            with open(os.path.join(self.__directory__, current), 'rb') as f:
+                mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return False
+
+        magic, format_version, version = MyCatalogSnapshot.HEADER.unpack_from(mapped, 0)
+
+        if magic != MyCatalogSnapshot.MAGIC or format_version != MyCatalogSnapshot.FORMAT_VERSION:
+            mapped.close()
+            raise IOError('Failed to load catalog snapshot')
+
+        tables: dict[str, tuple[int, int]] = {category: MyCatalogSnapshot.TABLE.unpack_from(mapped, MyCatalogSnapshot.HEADER.size + i * MyCatalogSnapshot.TABLE.size) for i, category in enumerate(MyCatalogSnapshot.CATEGORIES)}
+        previous: mmap.mmap | None = self.__map__
+        self.__map__, self.__file__, self.__version__, self.__tables__ = mapped, current, version, tables
+
+        if previous is not None:
+            try:
+                previous.close()
+            except BufferError:
+                pass
+
+        return True
+
+    def close(self) -> None:
+        if self.__map__ is not None:
+            try:
+                self.__map__.close()
+            except BufferError:
+                pass
+
+        self.__map__ = None
+        self.__file__ = None
+        self.__tables__ = {}
+
+    def raw(self, category: str, name: str) -> memoryview | None:
+        """
+        Gets the JSON encoded item without copying it out of the mapping
+        :param category: (str) The catalog category: 'game', 'program' or 'contact'
+        :param name: (str) The item name
+        :return: (memoryview?) The JSON bytes or None if no such item exists
+        """
+
+        index: int | None = self.__find__(category, name)
+        return None if index is None else self.__record__(category, index)[1]
+
+    def get(self, category: str, name: str) -> dict[str, typing.Any] | None:
+        """
+        Gets and decodes a single item
+        :param category: (str) The catalog category: 'game', 'program' or 'contact'
+        :param name: (str) The item name
+        :return: (dict?) The item or None if no such item exists
+        """
+
+        data: memoryview | None = self.raw(category, name)
+
+        if data is None:
+            return None
+
+        with data:
+            return json.loads(data.tobytes())
+
+    def names(self, category: str, prefix: str = '') -> typing.Iterator[str]:
+        """
+        Iterates the item names of a category in UTF-8 byte order
+        :param category: (str) The catalog category: 'game', 'program' or 'contact'
+        :param prefix: (str) Only yield names beginning with this prefix
+        :return: (Iterator[str]) The item names
+        """
+
+        self.__table__(category)
+        key: bytes = prefix.encode('utf-8')
+        keys: MyCatalogSnapshot.MyIndexKeys = MyCatalogSnapshot.MyIndexKeys(self, category)
+
+        for index in range(bisect.bisect_left(keys, key), len(keys)):
+            name: bytes = keys[index]
+
+            if not name.startswith(key):
+                return
+
+            yield name.decode('utf-8')
+
+    def items(self, category: str, visible_only: bool = True) -> typing.Iterator[tuple[str, dict[str, typing.Any]]]:
+        """
+        Iterates and decodes the items of a category in name order
+        :param category: (str) The catalog category: 'game', 'program' or 'contact'
+        :param visible_only: (bool) Whether to skip hidden items
+        :return: (Iterator[tuple[str, dict]]) The item names and items
+        """
+
+        for index in range(self.__table__(category)[1]):
+            name, data = self.__record__(category, index)
+
+            with data:
+                item: dict[str, typing.Any] = json.loads(data.tobytes())
+
+            if not visible_only or item['visible']:
+                yield name, item
+
+    def count(self, category: str) -> int:
+        return self.__table__(category)[1]
+
+    @property
+    def version(self) -> int:
+        return self.__version__
+
+    @property
+    def loaded(self) -> bool:
+        return self.__map__ is not None
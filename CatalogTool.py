@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import typing
+
+import SQLiteStorage
+import StaticExport
+import Storage
+
+
+def load(path: str) -> Storage.MyGlobalServerStorage:
+    """
+    Loads the storage engine matching the file extension
+    :param path: (str) The storage file path (.json, .bin or .db)
+    :return: (MyGlobalServerStorage) The loaded storage
+    """
+
+    return SQLiteStorage.MySQLiteServerStorage.load(path) if path.endswith('.db') else Storage.MyGlobalServerStorage.load(path)
+
+
+def export_catalog(storage_path: str, output: typing.TextIO) -> int:
+    """
+    Writes the catalog as NDJSON, one record per game, section, child, program and contact
+    :param storage_path: (str) The storage file path
+    :param output: (TextIO) The output stream
+    :return: (int) The number of records written
+    """
+
+    storage: Storage.MyGlobalServerStorage = load(storage_path)
+    count: int = 0
+
+    for line in storage.export_ndjson():
+        output.write(line)
+        count += 1
+
+    if isinstance(storage, SQLiteStorage.MySQLiteServerStorage):
+        storage.close()
+
+    return count
+
+
+def import_catalog(storage_path: str, input_path: str, replace: bool = False, batch_size: int = Storage.MyNdjsonCodec.BATCH_SIZE) -> dict[str, int]:
+    """
+    Validates and bulk imports an NDJSON catalog, then saves the storage
+    :param storage_path: (str) The storage file path
+    :param input_path: (str) The NDJSON file path
+    :param replace: (bool) Whether items missing from the import are removed
+    :param batch_size: (int) The number of top-level items applied per batch
+    :return: (dict[str, int]) The number of imported records by type and the number of removed items
+    """
+
+    storage: Storage.MyGlobalServerStorage = load(storage_path)
+
+    with open(input_path, 'rb') as source:
+        counts: dict[str, int] = storage.import_ndjson(source, replace, batch_size)
+
+    if isinstance(storage, SQLiteStorage.MySQLiteServerStorage):
+        storage.close()
+    else:
+        storage.save(storage_path, True)
+
+    return counts
+
+
+def export_static(storage_path: str, output: str) -> dict[str, int]:
+    """
+    Exports or incrementally updates the static site tree of the public catalog
+    :param storage_path: (str) The storage file path
+    :param output: (str) The output directory
+    :return: (dict[str, int]) The exported catalog version and file counts
+    """
+
+    storage: Storage.MyGlobalServerStorage = load(storage_path)
+    report: dict[str, int] = StaticExport.MyStaticSiteExporter(storage, output).export()
+
+    if isinstance(storage, SQLiteStorage.MySQLiteServerStorage):
+        storage.close()
+
+    return report
+
+
+def migrate_images(storage_path: str, dry_run: bool = False) -> dict[str, typing.Any]:
+    """
+    Folds stored icons and backgrounds into content-addressed IDs, merging duplicates and rewriting the catalog
+    Lazily loaded games are materialized and files under superseded IDs are only deleted once the rewritten catalog is saved
+    Must be run with the server stopped, as the server does not see the rewritten references until it reloads
+    :param storage_path: (str) The storage file path
+    :param dry_run: (bool) Whether to only report what would be folded
+    :return: (dict[str, Any]) The migration report
+    """
+
+    storage: Storage.MyGlobalServerStorage = load(storage_path)
+
+    if isinstance(storage, SQLiteStorage.MySQLiteServerStorage):
+        report: dict[str, typing.Any] = storage.migrate_images(dry_run, lambda: None)
+        storage.close()
+    else:
+        report = storage.migrate_images(dry_run, lambda: storage.save(storage_path, True))
+
+    return report
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Bulk NDJSON export and import, static site export and image migration for the catalog')
+    commands: typing.Any = parser.add_subparsers(dest='command', required=True)
+    export_parser: argparse.ArgumentParser = commands.add_parser('export')
+    export_parser.add_argument('storage')
+    export_parser.add_argument('output', nargs='?')
+    import_parser: argparse.ArgumentParser = commands.add_parser('import')
+    import_parser.add_argument('storage')
+    import_parser.add_argument('input')
+    import_parser.add_argument('--replace', action='store_true')
+    import_parser.add_argument('--batch-size', type=int, default=Storage.MyNdjsonCodec.BATCH_SIZE)
+    static_parser: argparse.ArgumentParser = commands.add_parser('static')
+    static_parser.add_argument('storage')
+    static_parser.add_argument('output')
+    images_parser: argparse.ArgumentParser = commands.add_parser('images')
+    images_parser.add_argument('storage')
+    images_parser.add_argument('--dry-run', action='store_true')
+    args: argparse.Namespace = parser.parse_args()
+
+    try:
+        if args.command == 'export' and args.output is None:
+            written: int = export_catalog(args.storage, sys.stdout)
+        elif args.command == 'export':
+            with open(args.output, 'w') as f:
+                written = export_catalog(args.storage, f)
+        elif args.command == 'static':
+            print(f'\033[38;2;0;150;0m [+] Exported static site {export_static(args.storage, args.output)}\033[0m')
+            sys.exit(0)
+        elif args.command == 'images':
+            print(f'\033[38;2;0;150;0m [+] Migrated images {migrate_images(args.storage, args.dry_run)}\033[0m')
+            sys.exit(0)
+        else:
+            print(f'\033[38;2;0;150;0m [+] Imported {import_catalog(args.storage, args.input, args.replace, args.batch_size)}\033[0m')
+            sys.exit(0)
+
+        print(f'\033[38;2;0;150;0m [+] Exported {written} record(s)\033[0m', file=sys.stderr)
+    except AssertionError as err:
+        print(f'\033[38;2;255;50;50m [X] {err}\033[0m', file=sys.stderr)
+        sys.exit(1)
@@ -1,17 +1,170 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import io
+import os
 import PIL.Image
+import shutil
+import tempfile
+import threading
+import time
+import typing
 import uuid
 
 import CustomMethodsVI.FileSystem as FileSystem
 
+MAX_PIXELS: int = int(os.getenv('IMAGEPIXELS', 40_000_000))
+UPLOAD_FORMATS: tuple[str, ...] = ('JPEG', 'PNG', 'GIF', 'WEBP', 'BMP')
+
+
+def fit_size(size: tuple[int, int], image_size: tuple[int, int]) -> tuple[int, int]:
+    scale: float = min(image_size[0] / size[0], image_size[1] / size[1])
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def open_image(data: bytes, image_size: tuple[int, int] | None = None, max_pixels: int = MAX_PIXELS) -> PIL.Image.Image:
+    assert isinstance(max_pixels, int) and max_pixels > 0, 'Invalid pixel budget'
+
+    try:
+        image: PIL.Image.Image = PIL.Image.open(io.BytesIO(data), 'r', UPLOAD_FORMATS)
+    except PIL.Image.DecompressionBombError as err:
+        raise ValueError('Image exceeds pixel budget') from err
+
+    width, height = image.size
+
+    if image_size is not None:
+        image.draft('RGB', fit_size(image.size, image_size))
+
+    if image.width * image.height > max_pixels:
+        image.close()
+        raise ValueError(f'Image exceeds pixel budget: {width}x{height} decodes to {image.width * image.height} > {max_pixels} pixels')
+
+    return image
+
+
+def convert_image(image: PIL.Image.Image, image_size: tuple[int, int] | None) -> PIL.Image.Image:
+    assert isinstance(image, PIL.Image.Image), 'Not an image'
+
+    if image_size is not None:
+        width, height = fit_size(image.size, image_size)
+        image.draft('RGB', (width, height))
+        image = image if image.mode in ('RGB', 'RGBA', 'L') else image.convert('RGB')
+        image = image.resize((width, height), PIL.Image.Resampling.LANCZOS, reducing_gap=3.0)
+        x: int = max(0, round((image_size[0] - width) / 2))
+        y: int = max(0, round((image_size[1] - height) / 2))
+        blackbox: PIL.Image.Image = PIL.Image.new('RGB', image_size, 0x000000)
+        blackbox.paste(image, (x, y))
+        return blackbox
+
+    return image.convert('RGB')
+
+
+class MyImageBodyCache:
+    class MyImageBody:
+        __slots__: tuple[str, ...] = ('data', 'etag')
+
+        def __init__(self, data: bytes):
+            self.data: bytes = data
+            self.etag: str = hashlib.sha256(data).hexdigest()[:32]
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int | None = None):
+        assert isinstance(max_bytes, int) and max_bytes >= 0, 'Invalid cache size'
+        assert max_entry_bytes is None or (isinstance(max_entry_bytes, int) and max_entry_bytes >= 0), 'Invalid entry size'
+        self.__max_bytes__: int = max_bytes
+        self.__max_entry_bytes__: int = max_bytes // 8 if max_entry_bytes is None else max_entry_bytes
+        self.__entries__: collections.OrderedDict[tuple, MyImageBodyCache.MyImageBody] = collections.OrderedDict()
+        self.__variants__: dict[tuple[str, int], set[tuple]] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+        self.__bytes__: int = 0
+        self.__hits__: int = 0
+        self.__misses__: int = 0
+        self.__evicted__: int = 0
+        self.__invalidated__: int = 0
+
+    def __remove__(self, key: tuple) -> None:
+        body: MyImageBodyCache.MyImageBody = self.__entries__.pop(key)
+        self.__bytes__ -= len(body.data)
+        keys: set[tuple] = self.__variants__[key[:2]]
+        keys.discard(key)
+
+        if len(keys) == 0:
+            del self.__variants__[key[:2]]
+
+    def get(self, container: str, image_id: int, variant: tuple = ()) -> MyImageBodyCache.MyImageBody | None:
+        key: tuple = (container, image_id, *variant)
+
+        with self.__lock__:
+            body: MyImageBodyCache.MyImageBody | None = self.__entries__.get(key)
+
+            if body is None:
+                self.__misses__ += 1
+            else:
+                self.__entries__.move_to_end(key)
+                self.__hits__ += 1
+
+            return body
+
+    def load(self, container: str, image_id: int, variant: tuple, path: str) -> MyImageBodyCache.MyImageBody | None:
+        try:
+            with open(path, 'rb') as f:
+                body: MyImageBodyCache.MyImageBody = MyImageBodyCache.MyImageBody(f.read())
+        except FileNotFoundError:
+            return None
+
+        if len(body.data) > self.__max_entry_bytes__:
+            return body
+
+        key: tuple = (container, image_id, *variant)
+
+        with self.__lock__:
+            if key in self.__entries__:
+                self.__remove__(key)
+
+            self.__entries__[key] = body
+            self.__variants__.setdefault(key[:2], set()).add(key)
+            self.__bytes__ += len(body.data)
+
+            while self.__bytes__ > self.__max_bytes__:
+                self.__remove__(next(iter(self.__entries__)))
+                self.__evicted__ += 1
+
+        return body
+
+    def invalidate(self, container: str, image_id: int) -> int:
+        with self.__lock__:
+            keys: tuple[tuple, ...] = tuple(self.__variants__.get((container, image_id), ()))
+
+            for key in keys:
+                self.__remove__(key)
+
+            self.__invalidated__ += len(keys)
+            return len(keys)
+
+    @property
+    def status(self) -> dict[str, int]:
+        return {'entries': len(self.__entries__), 'bytes': self.__bytes__, 'max-bytes': self.__max_bytes__, 'hits': self.__hits__, 'misses': self.__misses__, 'evicted': self.__evicted__, 'invalidated': self.__invalidated__}
+
 
 class MyImageLoader:
     class MyImageContainer:
-        def __init__(self, path: FileSystem.Directory, image_size: tuple[int, int] | None):
+        GRACE: float = 600
+
+        @staticmethod
+        def content_id(data: bytes) -> int:
+            return int.from_bytes(hashlib.sha256(data).digest()[:16], 'big')
+
+        def __init__(self, path: FileSystem.Directory, image_size: tuple[int, int] | None, cache: MyImageBodyCache | None = None, content_addressed: bool = False):
             assert isinstance(path, FileSystem.Directory), 'Not a directory'
             assert image_size is None or (isinstance(image_size, tuple) and len(image_size) == 2 and all(isinstance(x, int) for x in image_size)), 'Invalid size limit'
+            assert cache is None or isinstance(cache, MyImageBodyCache), 'Invalid image cache'
 
             self.__dirpath__: FileSystem.Directory = path
             self.__image_size__: tuple[int, int] | None = image_size
+            self.__cache__: MyImageBodyCache = MyImageBodyCache(0) if cache is None else cache
+            self.__content_addressed__: bool = bool(content_addressed)
+            self.__referenced__: typing.Callable[[int], bool] | None = None
+            self.__deduplicated__: int = 0
 
             if not self.__dirpath__.exists():
                 self.__dirpath__.create()
@@ -25,24 +178,77 @@ class MyImageLoader:
         def __getitem__(self, image_id: int) -> PIL.Image.Image | None:
             return self.get_image(image_id)
 
-        def del_image(self, image_id: int) -> None:
+        def __allocate__(self) -> int:
+            uid: uuid.UUID = uuid.uuid4()
+
+            while self.__dirpath__.file(f'{int(uid.int)}.jpg').exists():
+                uid = uuid.uuid4()
+
+            return uid.int
+
+        def __store__(self, data: bytes) -> int:
+            image_id: int = MyImageLoader.MyImageContainer.content_id(data)
+            path: str = self.__dirpath__.file(f'{image_id}.jpg').filepath
+
+            if os.path.exists(path):
+                os.utime(path)
+                self.__deduplicated__ += 1
+                return image_id
+
+            fd, temp = tempfile.mkstemp('.part', dir=self.__dirpath__.dirpath)
+
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+
+            os.replace(temp, path)
+            return image_id
+
+        def track_references(self, referenced: typing.Callable[[int], bool] | None) -> None:
+            self.__referenced__ = referenced
+
+        def del_image(self, image_id: int, force: bool = False) -> bool:
             assert isinstance(image_id, int)
+            file: FileSystem.File = self.__dirpath__.file(f'{image_id}.jpg')
+
+            if not force and self.__referenced__ is not None and self.__referenced__(image_id):
+                return False
+            elif not force and self.__content_addressed__ and file.exists() and time.time() - os.stat(file.filepath).st_mtime < MyImageLoader.MyImageContainer.GRACE:
+                return False
+
             self.__dirpath__.delete_file(f'{image_id}.jpg')
+            self.__cache__.invalidate(self.__dirpath__.dirpath, image_id)
+            return True
 
         def set_image(self, image_id: int | None, image: PIL.Image.Image) -> int:
             assert image_id is None or isinstance(image_id, int), 'Invalid image ID'
             assert isinstance(image, PIL.Image.Image), 'Not an image'
 
-            if image_id is None:
-                uid: uuid.UUID = uuid.uuid4()
-
-                while self.__dirpath__.file(f'{int(uid.int)}.jpg').exists():
-                    uid = uuid.uuid4()
-
-                image_id = uid.int
+            if self.__content_addressed__:
+                assert image_id is None, 'Content-addressed images cannot be overwritten'
+                bytestream: io.BytesIO = io.BytesIO()
+                self.convert_image(image).save(bytestream, 'JPEG')
+                return self.__store__(bytestream.getvalue())
 
+            image_id = self.__allocate__() if image_id is None else image_id
             image = self.convert_image(image)
             image.save(self.__dirpath__.file(f'{int(image_id)}.jpg').filepath, 'JPEG')
+            self.__cache__.invalidate(self.__dirpath__.dirpath, image_id)
+            return image_id
+
+        def write_image(self, image_id: int | None, data: bytes) -> int:
+            assert image_id is None or isinstance(image_id, int), 'Invalid image ID'
+            assert isinstance(data, bytes) and data[:2] == b'\xff\xd8', 'Not a JPEG image'
+
+            if self.__content_addressed__:
+                assert image_id is None, 'Content-addressed images cannot be overwritten'
+                return self.__store__(data)
+
+            image_id = self.__allocate__() if image_id is None else image_id
+
+            with open(self.__dirpath__.file(f'{int(image_id)}.jpg').filepath, 'wb') as f:
+                f.write(data)
+
+            self.__cache__.invalidate(self.__dirpath__.dirpath, image_id)
             return image_id
 
         def get_image(self, image_id: int) -> PIL.Image.Image | None:
@@ -57,21 +263,46 @@ class MyImageLoader:
             return image if self.__image_size__ is None or image.size == self.__image_size__ else None
 
         def convert_image(self, image: PIL.Image.Image) -> PIL.Image.Image:
-            assert isinstance(image, PIL.Image.Image), 'Not an image'
+            return convert_image(image, self.__image_size__)
+
+        def scan(self, batch_size: int = 256) -> typing.Iterator[list[tuple[int, os.stat_result]]]:
+            assert isinstance(batch_size, int) and batch_size > 0, 'Invalid batch size'
+            batch: list[tuple[int, os.stat_result]] = []
+
+            with os.scandir(self.__dirpath__.dirpath) as entries:
+                for entry in entries:
+                    name, _, extension = entry.name.rpartition('.')
+
+                    if extension != 'jpg' or not name.isdigit():
+                        continue
+
+                    try:
+                        batch.append((int(name), entry.stat()))
+                    except FileNotFoundError:
+                        continue
+
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+            if len(batch) > 0:
+                yield batch
+
+        def fold(self, image_id: int) -> int:
+            source: str = self.__dirpath__.file(f'{int(image_id)}.jpg').filepath
+
+            with open(source, 'rb') as f:
+                content_id: int = MyImageLoader.MyImageContainer.content_id(f.read())
+
+            target: str = self.__dirpath__.file(f'{content_id}.jpg').filepath
 
-            if self.__image_size__ is not None:
-                width, height = image.size
-                scale: float = min(self.__image_size__[0] / width, self.__image_size__[1] / height)
-                width = round(width * scale)
-                height = round(height * scale)
-                image = image.resize((width, height))
-                x: int = max(0, round((self.__image_size__[0] - width) / 2))
-                y: int = max(0, round((self.__image_size__[1] - height) / 2))
-                blackbox: PIL.Image.Image = PIL.Image.new('RGB', self.__image_size__, 0x000000)
-                blackbox.paste(image, (x, y))
-                return blackbox
+            if content_id != image_id and not os.path.exists(target):
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
 
-            return image.convert('RGB')
+            return content_id
 
         def image_file(self, image_id: int) -> FileSystem.File | None:
             assert isinstance(image_id, int), 'Invalid image ID'
@@ -82,15 +313,37 @@ class MyImageLoader:
         def dir(self) -> FileSystem.Directory:
             return self.__dirpath__
 
-    def __init__(self, image_dir: str) -> None:
+        @property
+        def image_size(self) -> tuple[int, int] | None:
+            return self.__image_size__
+
+        @property
+        def cache(self) -> MyImageBodyCache:
+            return self.__cache__
+
+        @property
+        def content_addressed(self) -> bool:
+            return self.__content_addressed__
+
+        @property
+        def deduplicated(self) -> int:
+            return self.__deduplicated__
+
+    def __init__(self, image_dir: str, cache_size: int | None = None, content_addressed: bool | None = None) -> None:
         self.__dirpath__: FileSystem.Directory = FileSystem.Directory(image_dir)
+        self.__cache__: MyImageBodyCache = MyImageBodyCache(int(os.getenv('IMAGECACHESIZE', 64)) * 2 ** 20 if cache_size is None else cache_size)
+        content_addressed = os.getenv('IMAGESTORE') == 'content' if content_addressed is None else content_addressed
 
         if not self.__dirpath__.exists():
             self.__dirpath__.create()
 
-        self.__icon_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('icons'), (512, 512))
-        self.__background_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('backgrounds'), (4096, 2048))
-        self.__general_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('generic'), None)
+        self.__icon_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('icons'), (512, 512), self.__cache__, content_addressed)
+        self.__background_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('backgrounds'), (4096, 2048), self.__cache__, content_addressed)
+        self.__general_storage__: MyImageLoader.MyImageContainer = MyImageLoader.MyImageContainer(self.__dirpath__.cd('generic'), None, self.__cache__, content_addressed)
+
+    @property
+    def cache(self) -> MyImageBodyCache:
+        return self.__cache__
 
     @property
     def MyIconStorage(self) -> MyImageContainer:
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import os
+import PIL.features
+import threading
+import typing
+
+import Image
+import ImageWorker
+
+
+class MyImageVariantCache:
+    """
+    Size-bounded, least recently used disk cache of resized and re-encoded image variants
+    Variants are generated by the image worker pool and concurrent requests for the same variant share one generation
+    """
+
+    WIDTHS: tuple[int, ...] = (64, 128, 256, 512, 1024, 2048, 4096)
+    FORMATS: dict[str, tuple[str, str]] = {'jpeg': ('jpg', 'image/jpeg'), 'webp': ('webp', 'image/webp'), 'png': ('png', 'image/png')}
+    WEBP: bool = PIL.features.check('webp')
+
+    @classmethod
+    def negotiate(cls, requested: str, accepted: typing.Any) -> str:
+        """
+        Picks the variant format from the 'format' query parameter and the Accept header
+        WebP is only negotiated when explicitly accepted, as older browsers send wildcards without supporting it
+        :param requested: (str) The requested format: 'auto', 'jpeg', 'webp' or 'png'
+        :param accepted: (MIMEAccept) The parsed Accept header
+        :return: (str) The format to serve
+        """
+
+        assert requested == 'auto' or requested in cls.FORMATS, 'Invalid image format'
+
+        if requested == 'auto':
+            requested = 'webp' if any(value == 'image/webp' and quality > 0 for value, quality in accepted) else 'jpeg'
+
+        return 'jpeg' if requested == 'webp' and not cls.WEBP else requested
+
+    @classmethod
+    def bucket(cls, width: int | None, image_size: tuple[int, int] | None) -> int | None:
+        """
+        Rounds a requested width up to the nearest cached width
+        :param width: (int?) The requested width or None for the source width
+        :param image_size: (tuple[int, int]?) The container's fixed image size if any
+        :return: (int?) The variant width or None if the source width should be kept
+        """
+
+        assert width is None or (isinstance(width, int) and width > 0), 'Invalid image width'
+
+        if width is None or (image_size is not None and width >= image_size[0]):
+            return None
+
+        return next((bucket for bucket in cls.WIDTHS if bucket >= width), None)
+
+    def __init__(self, directory: str, pool: ImageWorker.MyImageWorkerPool, max_bytes: int = 256 * 2 ** 20):
+        assert isinstance(pool, ImageWorker.MyImageWorkerPool), 'Invalid worker pool'
+        assert isinstance(max_bytes, int) and max_bytes > 0, 'Invalid cache size'
+        self.__directory__: str = os.path.abspath(directory)
+        self.__pool__: ImageWorker.MyImageWorkerPool = pool
+        self.__max_bytes__: int = max_bytes
+        self.__entries__: collections.OrderedDict[str, int] = collections.OrderedDict()
+        self.__pending__: dict[str, concurrent.futures.Future] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+        self.__bytes__: int = 0
+        self.__hits__: int = 0
+        self.__misses__: int = 0
+        self.__deduplicated__: int = 0
+        self.__evicted__: int = 0
+        self.__scan__()
+
+    def __scan__(self) -> None:
+        files: list[tuple[int, str, int]] = []
+        os.makedirs(self.__directory__, exist_ok=True)
+
+        for root, _, names in os.walk(self.__directory__):
+            for name in names:
+                path: str = os.path.join(root, name)
+
+                try:
+                    if name.endswith('.part'):
+                        os.remove(path)
+                    else:
+                        stat: os.stat_result = os.stat(path)
+                        files.append((stat.st_mtime_ns, path, stat.st_size))
+                except OSError:
+                    continue
+
+        for _, path, size in sorted(files):
+            self.__entries__[path] = size
+            self.__bytes__ += size
+
+        self.__evict__()
+
+    def __evict__(self) -> None:
+        while self.__bytes__ > self.__max_bytes__ and len(self.__entries__) > 1:
+            path, size = self.__entries__.popitem(False)
+            self.__bytes__ -= size
+            self.__evicted__ += 1
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def variant(self, kind: str, container: Image.MyImageLoader.MyImageContainer, image_id: int, width: int | None, image_format: str) -> str | None:
+        """
+        Gets the path of an image variant, generating it if not cached
+        :param kind: (str) The image kind used to separate containers in the cache, such as 'icon'
+        :param container: (MyImageContainer) The image container
+        :param image_id: (int) The image ID
+        :param width: (int?) The requested width or None for the source width
+        :param image_format: (str) The variant format: 'jpeg', 'webp' or 'png'
+        :return: (str?) The path of the variant or the source image, or None if no such image exists
+        :raises OSError: If the variant failed to generate
+        """
+
+        assert image_format in MyImageVariantCache.FORMATS, 'Invalid image format'
+        source: typing.Any = container.image_file(image_id)
+
+        if source is None:
+            return None
+
+        width = MyImageVariantCache.bucket(width, container.image_size)
+        source_path: str = os.path.abspath(source.filepath)
+
+        if width is None and image_format == 'jpeg':
+            return source_path
+
+        stat: os.stat_result = os.stat(source_path)
+        path: str = os.path.join(self.__directory__, kind, f'{image_id}-{width or 0}-{stat.st_mtime_ns:x}.{MyImageVariantCache.FORMATS[image_format][0]}')
+
+        with self.__lock__:
+            if path in self.__entries__:
+                self.__entries__.move_to_end(path)
+                self.__hits__ += 1
+                return path
+
+            future: concurrent.futures.Future | None = self.__pending__.get(path)
+            owner: bool = future is None
+
+            if owner:
+                future = self.__pending__[path] = concurrent.futures.Future()
+                self.__misses__ += 1
+            else:
+                self.__deduplicated__ += 1
+
+        if not owner:
+            ImageWorker.MyImageWorkerPool.wait((future,))
+            return future.result()
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            size: int = self.__pool__.run(ImageWorker.transform_image, source_path, path, width, image_format)
+
+            with self.__lock__:
+                self.__entries__[path] = size
+                self.__bytes__ += size
+                self.__evict__()
+
+            future.set_result(path)
+            return path
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            with self.__lock__:
+                del self.__pending__[path]
+
+    @property
+    def status(self) -> dict[str, int]:
+        return {'entries': len(self.__entries__), 'bytes': self.__bytes__, 'max-bytes': self.__max_bytes__, 'hits': self.__hits__, 'misses': self.__misses__, 'deduplicated': self.__deduplicated__, 'evicted': self.__evicted__}
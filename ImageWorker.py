@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import base64
+import concurrent.futures
+import concurrent.futures.process
+import io
+import os
+import PIL.Image
+import tempfile
+import threading
+import typing
+
+import Image
+
+try:
+    import gevent
+except ImportError:
+    gevent = None
+
+
+def encode_image(data: str | bytes, image_size: tuple[int, int] | None, max_pixels: int = Image.MAX_PIXELS) -> bytes:
+    """
+    Decodes, converts and JPEG encodes an uploaded image
+    Runs inside a worker process and only depends on PIL so it never touches server state
+    :param data: (str | bytes) The base64 encoded image
+    :param image_size: (tuple[int, int]?) The target size or None to keep the source size
+    :param max_pixels: (int) The maximum number of decoded pixels
+    :return: (bytes) The JPEG data
+    :raises ValueError: If the image is not valid base64 or exceeds the pixel budget
+    """
+
+    with Image.open_image(base64.b64decode(data), image_size, max_pixels) as image:
+        converted: PIL.Image.Image = Image.convert_image(image, image_size)
+        bytestream: io.BytesIO = io.BytesIO()
+        converted.save(bytestream, 'JPEG')
+        return bytestream.getvalue()
+
+
+def transform_image(source: str, target: str, width: int | None, image_format: str) -> int:
+    """
+    Writes a resized and re-encoded variant of a stored image
+    Runs inside a worker process; the variant is written to a temporary file and renamed into place
+    :param source: (str) The source image path
+    :param target: (str) The variant path
+    :param width: (int?) The maximum variant width or None to keep the source width
+    :param image_format: (str) The variant format: 'jpeg', 'webp' or 'png'
+    :return: (int) The variant size in bytes
+    """
+
+    with PIL.Image.open(source, 'r') as image:
+        if width is not None and width < image.width:
+            size: tuple[int, int] = (width, max(1, round(image.height * width / image.width)))
+            image.draft('RGB', size)
+            image = image.resize(size, PIL.Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        fd, temp = tempfile.mkstemp('.part', dir=os.path.dirname(target))
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if image_format == 'webp':
+                    image.save(f, 'WEBP', quality=80, method=4)
+                elif image_format == 'png':
+                    image.save(f, 'PNG', optimize=True)
+                else:
+                    image.convert('RGB').save(f, 'JPEG', quality=85, optimize=True, progressive=True)
+
+                written: int = f.tell()
+
+            os.replace(temp, target)
+            return written
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+
+class MyImageWorkerPool:
+    """
+    Bounded process pool decoding, resizing and encoding uploaded images away from the gevent hub
+    Callers wait cooperatively, so other requests keep being served while large images are processed
+    """
+
+    ENVIRONMENT: str = 'IMAGEWORKERS'
+
+    def __init__(self, workers: int | None = None):
+        workers = int(os.getenv(MyImageWorkerPool.ENVIRONMENT, min(4, os.cpu_count() or 1))) if workers is None else workers
+        assert isinstance(workers, int) and workers > 0, 'Invalid worker count'
+        self.__workers__: int = workers
+        self.__executor__: concurrent.futures.ProcessPoolExecutor | None = None
+        self.__lock__: threading.Lock = threading.Lock()
+        self.__submitted__: int = 0
+        self.__completed__: int = 0
+        self.__failed__: int = 0
+        self.__restarts__: int = 0
+
+    def __pool__(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self.__lock__:
+            if self.__executor__ is None:
+                self.__executor__ = concurrent.futures.ProcessPoolExecutor(self.__workers__)
+
+            return self.__executor__
+
+    def __restart__(self, executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        with self.__lock__:
+            if self.__executor__ is executor:
+                self.__executor__ = None
+                self.__restarts__ += 1
+
+        executor.shutdown(False, cancel_futures=True)
+
+    def start(self) -> None:
+        """
+        Starts the worker processes ahead of the first upload
+        Should be called before other threads are started, as workers are forked from the calling process
+        """
+
+        MyImageWorkerPool.wait((self.__pool__().submit(os.getpid),))
+
+    @staticmethod
+    def wait(futures: typing.Iterable[concurrent.futures.Future]) -> None:
+        """
+        Waits for all specified futures, yielding to other greenlets while blocked when running under gevent
+        :param futures: (Iterable[Future]) The futures to wait for
+        """
+
+        futures = tuple(futures)
+
+        if len(futures) == 0 or all(future.done() for future in futures):
+            return
+        elif gevent is None:
+            concurrent.futures.wait(futures)
+        else:
+            gevent.get_hub().threadpool.spawn(concurrent.futures.wait, futures).get()
+
+    def run_all(self, function: typing.Callable, calls: typing.Iterable[tuple]) -> list[typing.Any]:
+        """
+        Runs a module level function in the worker processes once per argument tuple, in parallel
+        :param function: (Callable) The function to run, which must be importable by the workers
+        :param calls: (Iterable[tuple]) The positional arguments of each call
+        :return: (list[Any]) The result of each call in order
+        :raises OSError: If the pool failed
+        """
+
+        executor: concurrent.futures.ProcessPoolExecutor = self.__pool__()
+
+        try:
+            futures: list[concurrent.futures.Future] = [executor.submit(function, *args) for args in calls]
+        except concurrent.futures.process.BrokenProcessPool as err:
+            self.__restart__(executor)
+            raise IOError('Failed to submit image to worker pool') from err
+
+        self.__submitted__ += len(futures)
+        MyImageWorkerPool.wait(futures)
+        results: list[bytes] = []
+
+        for future in futures:
+            try:
+                results.append(future.result())
+                self.__completed__ += 1
+            except concurrent.futures.process.BrokenProcessPool as err:
+                self.__failed__ += 1
+                self.__restart__(executor)
+                raise IOError('Failed to process image in worker pool') from err
+            except Exception:
+                self.__failed__ += 1
+                raise
+
+        return results
+
+    def run(self, function: typing.Callable, *args) -> typing.Any:
+        return self.run_all(function, (args,))[0]
+
+    def encode_all(self, images: typing.Iterable[tuple[str | bytes, tuple[int, int] | None]]) -> list[bytes]:
+        """
+        Converts and JPEG encodes several base64 encoded images in parallel
+        :param images: (Iterable[tuple[str | bytes, tuple[int, int]?]]) The base64 data and target size of each image
+        :return: (list[bytes]) The JPEG data of each image in order
+        :raises OSError: If an image cannot be decoded or the pool failed
+        :raises ValueError: If an image is not valid base64
+        """
+
+        return self.run_all(encode_image, images)
+
+    def encode(self, data: str | bytes, image_size: tuple[int, int] | None = None) -> bytes:
+        """
+        Converts and JPEG encodes a single base64 encoded image
+        :param data: (str | bytes) The base64 encoded image
+        :param image_size: (tuple[int, int]?) The target size or None to keep the source size
+        :return: (bytes) The JPEG data
+        """
+
+        return self.run(encode_image, data, image_size)
+
+    def store_all(self, uploads: typing.Iterable[tuple[Image.MyImageLoader.MyImageContainer, str | bytes]]) -> list[int]:
+        """
+        Processes several base64 encoded images in parallel and stores each under a new ID in its container
+        Either all images are stored or none are
+        :param uploads: (Iterable[tuple[MyImageContainer, str | bytes]]) The target container and base64 data of each image
+        :return: (list[int]) The new image IDs in order
+        """
+
+        uploads = tuple(uploads)
+        encoded: list[bytes] = self.encode_all((data, container.image_size) for container, data in uploads)
+        stored: list[int] = []
+
+        try:
+            for (container, _), data in zip(uploads, encoded):
+                stored.append(container.write_image(None, data))
+        except OSError:
+            for (container, _), image_id in zip(uploads, stored):
+                container.del_image(image_id)
+
+            raise
+
+        return stored
+
+    def store(self, container: Image.MyImageLoader.MyImageContainer, data: str | bytes) -> int:
+        """
+        Processes a base64 encoded image and stores it under a new ID
+        :param container: (MyImageContainer) The target container
+        :param data: (str | bytes) The base64 encoded image
+        :return: (int) The new image ID
+        """
+
+        return self.store_all(((container, data),))[0]
+
+    def close(self) -> None:
+        with self.__lock__:
+            executor: concurrent.futures.ProcessPoolExecutor | None = self.__executor__
+            self.__executor__ = None
+
+        if executor is not None:
+            executor.shutdown(True, cancel_futures=True)
+
+    @property
+    def workers(self) -> int:
+        return self.__workers__
+
+    @property
+    def status(self) -> dict[str, int]:
+        return {'workers': self.__workers__, 'running': int(self.__executor__ is not None), 'submitted': self.__submitted__, 'completed': self.__completed__, 'failed': self.__failed__, 'restarts': self.__restarts__}
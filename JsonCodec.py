@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS: tuple[str, ...] = ('stdlib',) if orjson is None else ('orjson', 'stdlib')
+BACKEND: str = 'stdlib' if orjson is None or os.getenv('JSONCODEC') == 'stdlib' else 'orjson'
+WIDE_INTEGER: bytes = b'0' * 19
+NUMBER_TABLE: bytes = bytes(48 if 48 <= c <= 57 else 32 if c in b' \t\r\n:,[-' else 120 for c in range(256))
+DecodeError: type[ValueError] = json.JSONDecodeError
+
+
+def use_backend(backend: str) -> str:
+    """
+    Selects the JSON backend, 'orjson' when installed or 'stdlib'
+    Defaults to the fastest available backend unless the JSONCODEC environment variable is 'stdlib'
+    :param backend: (str) The backend name
+    :return: (str) The previously selected backend
+    """
+
+    global BACKEND
+    assert backend in BACKENDS, f'JSON backend unavailable: {backend}'
+    previous: str = BACKEND
+    BACKEND = backend
+    return previous
+
+
+def dumpb(obj: typing.Any, indent: int | None = None, sort_keys: bool = False) -> bytes:
+    """
+    Encodes an object as UTF-8 JSON bytes
+    orjson cannot encode integers wider than 64 bits, such as image IDs, nor indent by other than two spaces, so those are encoded by the standard library
+    :param obj: (Any) The object to encode
+    :param indent: (int?) The pretty print indentation or None for a single line
+    :param sort_keys: (bool) Whether to sort object keys
+    :return: (bytes) The encoded JSON
+    """
+
+    if BACKEND == 'orjson' and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | (0 if indent is None else orjson.OPT_INDENT_2) | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+        except TypeError:
+            pass
+
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys).encode()
+
+
+def dumps(obj: typing.Any, indent: int | None = None, sort_keys: bool = False) -> str:
+    """
+    Encodes an object as a JSON string
+    :param obj: (Any) The object to encode
+    :param indent: (int?) The pretty print indentation or None for a single line
+    :param sort_keys: (bool) Whether to sort object keys
+    :return: (str) The encoded JSON
+    """
+
+    if BACKEND == 'orjson' and indent in (None, 2):
+        return dumpb(obj, indent, sort_keys).decode()
+
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys)
+
+
+def wide_integers(data: bytes | bytearray) -> bool:
+    """
+    Checks whether a JSON document may contain an integer wider than 64 bits
+    Digit runs inside strings, such as stringified image IDs, do not count, although a string holding a space before a long run gives a harmless false positive
+    :param data: (bytes | bytearray) The JSON document
+    :return: (bool) Whether the document has an unquoted run of at least 19 digits
+    """
+
+    mapped: bytes = data.translate(NUMBER_TABLE)
+    return mapped.startswith(WIDE_INTEGER) or b' ' + WIDE_INTEGER in mapped
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> typing.Any:
+    """
+    Decodes a JSON document
+    orjson reads integers wider than 64 bits as floats, so documents containing long unquoted numbers are decoded by the standard library
+    :param data: (str | bytes | bytearray | memoryview) The JSON document
+    :return: (Any) The decoded object
+    :raises DecodeError: If the document is malformed
+    """
+
+    data = data.tobytes() if isinstance(data, memoryview) else data
+
+    if BACKEND == 'orjson' and not wide_integers(data.encode() if isinstance(data, str) else data):
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def load(fp: typing.IO) -> typing.Any:
+    return loads(fp.read())
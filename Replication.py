@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import typing
+
+import Image
+import JsonCodec
+import Storage
+
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    assert isinstance(address, str) and len(address) > 0, 'Invalid replication address'
+
+    if address.startswith('unix:'):
+        assert hasattr(socket, 'AF_UNIX'), 'Unix sockets are not supported on this platform'
+        return socket.AF_UNIX, address[5:]
+
+    host, _, port = address.rpartition(':')
+    assert port.isdigit(), 'Invalid replication port'
+    return socket.AF_INET, (host or '0.0.0.0', int(port))
+
+
+def image_stores(storage: Storage.MyGlobalServerStorage) -> dict[str, Image.MyImageLoader.MyImageContainer]:
+    return {'icons': storage.MyImageLoader.MyIconStorage, 'backgrounds': storage.MyImageLoader.MyBackgroundStorage}
+
+
+class MyReplicationPrimary:
+    TICK: float = 0.1
+    HEARTBEAT: float = 1
+
+    class MyReplicationHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            primary: MyReplicationPrimary = self.server.primary
+
+            try:
+                for line in self.rfile:
+                    request: dict[str, typing.Any] = JsonCodec.loads(line)
+                    assert isinstance(request, dict), 'Malformed replication request'
+
+                    if 'image' in request:
+                        container, image_id = request['image']
+                        primary.__send_image__(self.wfile, str(container), int(image_id))
+                    elif 'since' in request:
+                        primary.__tail__(self.wfile, int(request['since']))
+                        return
+                    else:
+                        return
+            except (OSError, ValueError, TypeError, AssertionError):
+                return
+
+    def __init__(self, storage: Storage.MyGlobalServerStorage, address: str):
+        assert isinstance(storage, Storage.MyGlobalServerStorage)
+        family, bind = parse_address(address)
+
+        if family == socket.AF_INET:
+            self.__server__: socketserver.BaseServer = socketserver.ThreadingTCPServer(bind, MyReplicationPrimary.MyReplicationHandler, bind_and_activate=False)
+            self.__server__.allow_reuse_address = True
+        else:
+            if os.path.exists(bind):
+                os.remove(bind)
+
+            self.__server__ = socketserver.ThreadingUnixStreamServer(bind, MyReplicationPrimary.MyReplicationHandler, bind_and_activate=False)
+
+        self.__server__.daemon_threads = True
+        self.__server__.primary = self
+        self.__storage__: Storage.MyGlobalServerStorage = storage
+        self.__address__: str = address
+        self.__closed__: threading.Event = threading.Event()
+        self.__replicas__: int = 0
+        self.__snapshots__: int = 0
+        self.__thread__: threading.Thread | None = None
+
+    def __send__(self, stream: typing.BinaryIO, message: dict[str, typing.Any]) -> None:
+        stream.write(JsonCodec.dumpb({**message, 'time': time.time()}) + b'\n')
+        stream.flush()
+
+    def __send_image__(self, stream: typing.BinaryIO, container: str, image_id: int) -> None:
+        store: Image.MyImageLoader.MyImageContainer | None = image_stores(self.__storage__).get(container)
+        data: bytes | None = None
+
+        try:
+            with open(store.image_file(image_id).filepath, 'rb') as f:
+                data = f.read()
+        except (AttributeError, OSError):
+            pass
+
+        stream.write(JsonCodec.dumpb({'size': -1 if data is None else len(data)}) + b'\n')
+
+        if data is not None:
+            stream.write(data)
+
+        stream.flush()
+
+    def __send_snapshot__(self, stream: typing.BinaryIO) -> int:
+        version: int = self.__storage__.version
+        self.__send__(stream, {'type': 'snapshot', 'version': version})
+
+        for chunk in Storage.MyJsonStream.chunks(self.__storage__.export_ndjson()):
+            stream.write(chunk.encode())
+
+            if self.__closed__.is_set():
+                raise ConnectionAbortedError('Replication primary closed')
+
+        self.__send__(stream, {'type': 'end', 'version': version})
+        self.__snapshots__ += 1
+        return version
+
+    def __tail__(self, stream: typing.BinaryIO, since: int) -> None:
+        self.__replicas__ += 1
+        heartbeat: float = 0
+
+        try:
+            while not self.__closed__.is_set():
+                changes: tuple[int, tuple[tuple[str, str, dict | None], ...]] | None = self.__storage__.replicated_changes(since)
+
+                if changes is None:
+                    since = self.__send_snapshot__(stream)
+                    heartbeat = time.monotonic()
+                    continue
+
+                version, items = changes
+
+                if len(items) > 0:
+                    self.__send__(stream, {'type': 'delta', 'version': version, 'items': [{'category': category, 'name': name, 'records': None if data is None else list(Storage.MyNdjsonCodec.item_records(category, name, data))} for category, name, data in items]})
+                    heartbeat = time.monotonic()
+                elif time.monotonic() - heartbeat >= MyReplicationPrimary.HEARTBEAT:
+                    self.__send__(stream, {'type': 'heartbeat', 'version': version})
+                    heartbeat = time.monotonic()
+
+                since = version
+                self.__closed__.wait(MyReplicationPrimary.TICK)
+        finally:
+            self.__replicas__ -= 1
+
+    def start(self) -> None:
+        assert self.__thread__ is None, 'Replication primary already started'
+        self.__server__.server_bind()
+        self.__server__.server_activate()
+        self.__thread__ = threading.Thread(target=self.__server__.serve_forever, args=(MyReplicationPrimary.TICK,), daemon=True)
+        self.__thread__.start()
+        print(f'\033[38;2;0;150;0m [+] Started replication primary @ {self.__address__}\033[0m')
+
+    def close(self) -> None:
+        self.__closed__.set()
+
+        if self.__thread__ is not None:
+            self.__server__.shutdown()
+            self.__thread__.join()
+
+        self.__server__.server_close()
+        print(f'\033[38;2;0;150;0m [+] Stopped replication primary @ {self.__address__}\033[0m')
+
+    @property
+    def status(self) -> dict[str, typing.Any]:
+        return {'role': 'primary', 'address': self.__address__, 'version': self.__storage__.version, 'replicas': self.__replicas__, 'snapshots-served': self.__snapshots__}
+
+
+class MyReplicaClient:
+    RETRY: float = 2
+    TIMEOUT: float = 10
+
+    def __init__(self, storage: Storage.MyGlobalServerStorage, address: str):
+        assert isinstance(storage, Storage.MyGlobalServerStorage)
+        parse_address(address)
+        self.__storage__: Storage.MyGlobalServerStorage = storage
+        self.__address__: str = address
+        self.__closed__: threading.Event = threading.Event()
+        self.__connection__: socket.socket | None = None
+        self.__thread__: threading.Thread | None = None
+        self.__connected__: bool = False
+        self.__applied__: int | None = None
+        self.__head__: int | None = None
+        self.__lag__: float = 0
+        self.__last_contact__: float | None = None
+        self.__snapshots__: int = 0
+        self.__deltas__: int = 0
+        self.__images_fetched__: int = 0
+        self.__images_failed__: int = 0
+
+    def __connect__(self) -> socket.socket:
+        family, target = parse_address(self.__address__)
+        connection: socket.socket = socket.socket(family, socket.SOCK_STREAM)
+        connection.settimeout(MyReplicaClient.TIMEOUT)
+
+        try:
+            connection.connect(target)
+        except OSError:
+            connection.close()
+            raise
+
+        return connection
+
+    def __contact__(self, message: dict[str, typing.Any]) -> None:
+        now: float = time.time()
+        self.__head__ = int(message['version'])
+        self.__last_contact__ = now
+        self.__lag__ = max(0.0, now - float(message['time']))
+
+    def __fetch_images__(self, references: typing.Iterable[tuple[str, int]]) -> None:
+        stores: dict[str, Image.MyImageLoader.MyImageContainer] = image_stores(self.__storage__)
+        missing: list[tuple[str, int]] = [(container, image_id) for container, image_id in dict.fromkeys(references) if container in stores and stores[container].image_file(image_id) is None]
+
+        if len(missing) == 0:
+            return
+
+        with self.__connect__() as connection, connection.makefile('rwb') as stream:
+            for container, image_id in missing:
+                stream.write(JsonCodec.dumpb({'image': [container, image_id]}) + b'\n')
+                stream.flush()
+                size: int = int(JsonCodec.loads(stream.readline())['size'])
+
+                if size < 0:
+                    self.__images_failed__ += 1
+                    continue
+
+                data: bytes = stream.read(size)
+
+                if len(data) != size:
+                    raise ConnectionError('Image transfer truncated')
+
+                target: str = os.path.join(stores[container].dir.dirpath, f'{image_id}.jpg')
+                fd, temp = tempfile.mkstemp('.part', dir=stores[container].dir.dirpath)
+
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+
+                os.replace(temp, target)
+                self.__images_fetched__ += 1
+
+    def __apply_snapshot__(self, stream: typing.BinaryIO, version: int) -> None:
+        references: list[tuple[str, int]] = []
+
+        with tempfile.TemporaryFile('w+b') as spool:
+            while True:
+                line: bytes = stream.readline()
+
+                if len(line) == 0:
+                    raise ConnectionError('Snapshot transfer truncated')
+
+                record: dict[str, typing.Any] = JsonCodec.loads(line)
+
+                if record.get('type') == 'end':
+                    assert int(record['version']) == version, 'Snapshot version mismatch'
+                    self.__contact__(record)
+                    break
+
+                references.extend(Storage.MyNdjsonCodec.record_images(record))
+                spool.write(line)
+
+            spool.seek(0)
+            self.__fetch_images__(references)
+            self.__storage__.import_ndjson(spool, True)
+
+        self.__applied__ = version
+        self.__snapshots__ += 1
+
+    def __apply_delta__(self, message: dict[str, typing.Any]) -> None:
+        references: list[tuple[str, int]] = []
+        changes: list[tuple[str, str, Storage.MyGameStorageInfo | Storage.MyProgramStorageInfo | Storage.MyContactStorageInfo | None]] = []
+
+        for change in message['items']:
+            category: str = change['category']
+            records: list[dict[str, typing.Any]] | None = change['records']
+            assert category in ('game', 'program', 'contact'), 'Invalid replicated category'
+
+            if records is None:
+                changes.append((category, str(change['name']), None))
+                continue
+
+            for record in records:
+                references.extend(Storage.MyNdjsonCodec.record_images(record))
+
+            built: tuple[tuple[str, typing.Any], ...] = tuple(Storage.MyNdjsonCodec.build(Storage.MyNdjsonCodec.parse(JsonCodec.dumps(record) for record in records)))
+            assert len(built) == 1 and built[0][0] == category and built[0][1].name == change['name'], 'Malformed replicated item'
+            changes.append((category, built[0][1].name, built[0][1]))
+
+        self.__fetch_images__(references)
+
+        for category, name, item in changes:
+            self.__storage__.replace_item(category, name, item)
+
+        self.__applied__ = int(message['version'])
+        self.__deltas__ += 1
+
+    def __follow__(self, connection: socket.socket) -> None:
+        with connection.makefile('rwb') as stream:
+            stream.write(JsonCodec.dumpb({'since': self.__applied__ or 0}) + b'\n')
+            stream.flush()
+            self.__connected__ = True
+            print(f'\033[38;2;0;150;0m [+] Following replication primary @ {self.__address__}\033[0m')
+
+            while not self.__closed__.is_set():
+                line: bytes = stream.readline()
+
+                if len(line) == 0:
+                    return
+
+                message: dict[str, typing.Any] = JsonCodec.loads(line)
+                kind: str = message['type']
+
+                if kind == 'snapshot':
+                    self.__apply_snapshot__(stream, int(message['version']))
+                    continue
+                elif kind == 'delta':
+                    self.__apply_delta__(message)
+
+                self.__contact__(message)
+
+    def __run__(self) -> None:
+        while not self.__closed__.is_set():
+            try:
+                self.__connection__ = self.__connect__()
+                self.__follow__(self.__connection__)
+            except (OSError, ValueError, KeyError, TypeError, AssertionError) as err:
+                if not self.__closed__.is_set():
+                    print(f'\033[38;5;214m [!] Replication from {self.__address__} interrupted - {type(err).__name__}: {err}\033[0m')
+            finally:
+                self.__connected__ = False
+
+                if self.__connection__ is not None:
+                    self.__connection__.close()
+                    self.__connection__ = None
+
+            self.__closed__.wait(MyReplicaClient.RETRY)
+
+    def start(self) -> None:
+        assert self.__thread__ is None, 'Replica client already started'
+        self.__thread__ = threading.Thread(target=self.__run__, daemon=True)
+        self.__thread__.start()
+        print(f'\033[38;2;0;150;0m [+] Started replica client for {self.__address__}\033[0m')
+
+    def close(self) -> None:
+        self.__closed__.set()
+        connection: socket.socket | None = self.__connection__
+
+        if connection is not None:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if self.__thread__ is not None:
+            self.__thread__.join()
+
+        print(f'\033[38;2;0;150;0m [+] Stopped replica client for {self.__address__}\033[0m')
+
+    @property
+    def caught_up(self) -> bool:
+        return self.__connected__ and self.__applied__ is not None and self.__applied__ == self.__head__
+
+    @property
+    def status(self) -> dict[str, typing.Any]:
+        now: float = time.time()
+        lag_versions: int | None = None if self.__applied__ is None or self.__head__ is None else self.__head__ - self.__applied__
+        lag_seconds: float | None = None
+
+        if self.__last_contact__ is not None:
+            lag_seconds = self.__lag__ if self.__connected__ else max(self.__lag__, now - self.__last_contact__)
+
+        return {'role': 'replica', 'address': self.__address__, 'connected': self.__connected__, 'applied-version': self.__applied__, 'primary-version': self.__head__, 'lag-versions': lag_versions, 'lag-seconds': lag_seconds, 'last-contact': self.__last_contact__, 'snapshots': self.__snapshots__, 'deltas': self.__deltas__, 'images-fetched': self.__images_fetched__, 'images-missing': self.__images_failed__}
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import CustomMethodsVI.FileSystem as FileSystem
+
+import JsonCodec
+import Storage
+import Util
+
+
+class MySQLiteServerStorage(Storage.MyGlobalServerStorage):
+    SCHEMA: str = '''
+        CREATE TABLE IF NOT EXISTS games (
+            name TEXT PRIMARY KEY,
+            display_name TEXT NOT NULL,
+            url TEXT,
+            icon_image TEXT,
+            background_image TEXT,
+            visible INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS sections (
+            game TEXT NOT NULL REFERENCES games(name) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            display_name TEXT NOT NULL,
+            background_image TEXT,
+            visible INTEGER NOT NULL,
+            PRIMARY KEY (game, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS children (
+            game TEXT NOT NULL,
+            section TEXT NOT NULL,
+            name TEXT NOT NULL,
+            display_name TEXT NOT NULL,
+            url TEXT,
+            icon_image TEXT,
+            visible INTEGER NOT NULL,
+            PRIMARY KEY (game, section, name),
+            FOREIGN KEY (game, section) REFERENCES sections(game, name) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS programs (
+            name TEXT PRIMARY KEY,
+            display_name TEXT NOT NULL,
+            url TEXT,
+            icon_image TEXT,
+            visible INTEGER NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            program_type INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS contacts (
+            name TEXT PRIMARY KEY,
+            display_name TEXT NOT NULL,
+            content TEXT,
+            contact_type INTEGER NOT NULL,
+            icon_image TEXT,
+            visible INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS programs_type ON programs(program_type, name);
+        CREATE INDEX IF NOT EXISTS contacts_type ON contacts(contact_type, name);
+    '''
+
+    @staticmethod
+    def __connect__(path: str) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute('PRAGMA foreign_keys = ON')
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.executescript(MySQLiteServerStorage.SCHEMA)
+        return connection
+
+    @staticmethod
+    def __image_id__(image_id: int | str | None) -> str | None:
+        return None if image_id is None else str(image_id)
+
+    @classmethod
+    def load(cls, path: str, json_path: str | None = None) -> MySQLiteServerStorage:
+        if json_path is not None and not FileSystem.File(path).exists() and FileSystem.File(json_path).exists():
+            cls.migrate(json_path, path)
+
+        storage: MySQLiteServerStorage = cls()
+
+        try:
+            connection: sqlite3.Connection = MySQLiteServerStorage.__connect__(path)
+
+            for name, display_name, url, icon_image, background_image, visible in connection.execute('SELECT name, display_name, url, icon_image, background_image, visible FROM games'):
+                storage.__game_info__[name] = Storage.MyGameStorageInfo(name, display_name, '' if url is None else url, icon_image, background_image, visible)
+
+            for game_name, name, display_name, background_image, visible in connection.execute('SELECT game, name, display_name, background_image, visible FROM sections'):
+                storage.__game_info__[game_name].add_section(name, display_name, background_image, visible)
+
+            for game_name, section_name, name, display_name, url, icon_image, visible in connection.execute('SELECT game, section, name, display_name, url, icon_image, visible FROM children'):
+                storage.__game_info__[game_name].add_child(section_name, name, display_name, url, icon_image, visible)
+
+            for name, display_name, url, icon_image, visible, width, height, program_type in connection.execute('SELECT name, display_name, url, icon_image, visible, width, height, program_type FROM programs'):
+                storage.__program_info__[name] = Storage.MyProgramStorageInfo(name, display_name, url, icon_image, visible, width, height, Util.ProgramType(program_type))
+
+            for name, display_name, content, contact_type, icon_image, visible in connection.execute('SELECT name, display_name, content, contact_type, icon_image, visible FROM contacts'):
+                storage.__contact_info__[name] = Storage.MyContactStorageInfo(name, display_name, content, Util.ContactType(contact_type), icon_image, visible)
+
+        except Exception as err:
+            raise IOError('Failed to load server data') from err
+
+        storage.__connection__ = connection
+        storage.__loaded__()
+        return storage
+
+    @classmethod
+    def migrate(cls, json_path: str, db_path: str) -> int:
+        source: FileSystem.File = FileSystem.File(json_path)
+        games: list[tuple] = []
+        sections: list[tuple] = []
+        children: list[tuple] = []
+
+        try:
+            with source.open('r') as f:
+                data: dict = JsonCodec.load(f)
+
+            for game_name, game in data['game-storage'].items():
+                games.append((game_name, game['display-name'], game['game-url'], cls.__image_id__(game['icon-image']), cls.__image_id__(game['background-image']), game.get('visible', True)))
+
+                for section_name, section in game['sections'].items():
+                    if len(section) == 0:
+                        continue
+
+                    section_visible: bool = section.get('visible', False)
+                    sections.append((game_name, section_name, section['display-name'], cls.__image_id__(section.get('background-image', section.get('background_image'))), section_visible))
+                    children.extend((game_name, section_name, child_name, child['display-name'], child['url'], cls.__image_id__(child['icon-image']), child.get('visible', section_visible)) for child_name, child in section['children'].items())
+
+            programs: list[tuple] = [(name, program['display-name'], program['url'], cls.__image_id__(program['icon-image']), program['visible'], program['width'], program['height'], program['program-type']) for name, program in data['program-storage'].items()]
+            contacts: list[tuple] = [(name, contact['display-name'], contact['content'], contact['contact-type'], cls.__image_id__(contact['icon-image']), contact['visible']) for name, contact in data['contact-storage'].items()]
+            connection: sqlite3.Connection = MySQLiteServerStorage.__connect__(db_path)
+
+            with connection:
+                for table in ('children', 'sections', 'games', 'programs', 'contacts'):
+                    connection.execute(f'DELETE FROM {table}')
+
+                connection.executemany('INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)', games)
+                connection.executemany('INSERT INTO sections VALUES (?, ?, ?, ?, ?)', sections)
+                connection.executemany('INSERT INTO children VALUES (?, ?, ?, ?, ?, ?, ?)', children)
+                connection.executemany('INSERT INTO programs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', programs)
+                connection.executemany('INSERT INTO contacts VALUES (?, ?, ?, ?, ?, ?)', contacts)
+
+            connection.close()
+            return len(games) + len(sections) + len(children) + len(programs) + len(contacts)
+        except Exception as err:
+            raise IOError('Failed to migrate server data') from err
+
+    def __init__(self):
+        super().__init__()
+        self.__connection__: sqlite3.Connection | None = None
+        self.__connection_lock__: threading.Lock = threading.Lock()
+
+    def __write_child__(self, cursor: sqlite3.Cursor, game_name: str, section_name: str, child: Storage.MyGameStorageInfo.MyGameObjectInfo) -> None:
+        cursor.execute('INSERT OR REPLACE INTO children VALUES (?, ?, ?, ?, ?, ?, ?)', (game_name, section_name, child.name, child.display_name, child.url, self.__image_id__(child.__image__), child.visible))
+
+    def __write_section__(self, cursor: sqlite3.Cursor, game_name: str, section: Storage.MyGameStorageInfo.MyGameSectionInfo) -> None:
+        cursor.execute('UPDATE sections SET display_name = ?, background_image = ?, visible = ? WHERE game = ? AND name = ?', (section.display_name, self.__image_id__(section.__background_image__), section.visible, game_name, section.section_name))
+
+        if cursor.rowcount == 0:
+            cursor.execute('INSERT INTO sections VALUES (?, ?, ?, ?, ?)', (game_name, section.section_name, section.display_name, self.__image_id__(section.__background_image__), section.visible))
+
+            for child in section.__children__.values():
+                self.__write_child__(cursor, game_name, section.section_name, child)
+
+    def __write_game__(self, cursor: sqlite3.Cursor, game: Storage.MyGameStorageInfo) -> None:
+        cursor.execute('UPDATE games SET display_name = ?, url = ?, icon_image = ?, background_image = ?, visible = ? WHERE name = ?', (game.display_name, game.url, self.__image_id__(game.__icon_image__), self.__image_id__(game.__background_image__), game.visible, game.name))
+
+        if cursor.rowcount == 0:
+            cursor.execute('INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)', (game.name, game.display_name, game.url, self.__image_id__(game.__icon_image__), self.__image_id__(game.__background_image__), game.visible))
+
+            for section in game.__subtree__().values():
+                self.__write_section__(cursor, game.name, section)
+
+    def __persist_game__(self, cursor: sqlite3.Cursor, name: str, path: tuple[str, ...]) -> None:
+        game: Storage.MyGameStorageInfo | None = self.__game_info__.get(name)
+        section: Storage.MyGameStorageInfo.MyGameSectionInfo | None = None if game is None or len(path) < 1 else game.get_section(path[0])
+        child: Storage.MyGameStorageInfo.MyGameObjectInfo | None = None if section is None or len(path) < 2 else section.get_child(path[1])
+
+        if game is None:
+            cursor.execute('DELETE FROM games WHERE name = ?', (name,))
+        elif len(path) == 0:
+            self.__write_game__(cursor, game)
+        elif section is None:
+            cursor.execute('DELETE FROM sections WHERE game = ? AND name = ?', (name, path[0]))
+        elif len(path) == 1:
+            self.__write_section__(cursor, name, section)
+        elif child is None:
+            cursor.execute('DELETE FROM children WHERE game = ? AND section = ? AND name = ?', (name, path[0], path[1]))
+        else:
+            self.__write_child__(cursor, name, path[0], child)
+
+    def __persist_program__(self, cursor: sqlite3.Cursor, name: str) -> None:
+        program: Storage.MyProgramStorageInfo | None = self.__program_info__.get(name)
+
+        if program is None:
+            cursor.execute('DELETE FROM programs WHERE name = ?', (name,))
+        else:
+            cursor.execute('INSERT OR REPLACE INTO programs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (name, program.display_name, program.url, self.__image_id__(program.__image__), program.visible, *program.dimensions, program.program_type.value))
+
+    def __persist_contact__(self, cursor: sqlite3.Cursor, name: str) -> None:
+        contact: Storage.MyContactStorageInfo | None = self.__contact_info__.get(name)
+
+        if contact is None:
+            cursor.execute('DELETE FROM contacts WHERE name = ?', (name,))
+        else:
+            cursor.execute('INSERT OR REPLACE INTO contacts VALUES (?, ?, ?, ?, ?, ?)', (name, contact.display_name, contact.content, contact.contact_type.value, self.__image_id__(contact.__image__), contact.visible))
+
+    def __persist__(self, cursor: sqlite3.Cursor, category: str, name: str, path: tuple[str, ...]) -> None:
+        if category == 'game':
+            self.__persist_game__(cursor, name, path)
+        elif category == 'program':
+            self.__persist_program__(cursor, name)
+        elif category == 'contact':
+            self.__persist_contact__(cursor, name)
+
+    def __commit_marks__(self, marks: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...]) -> None:
+        for key, fields in marks:
+            super().mark_modified(*key, fields=fields)
+
+        if self.__connection__ is None:
+            return
+
+        with self.__connection_lock__, self.__connection__:
+            cursor: sqlite3.Cursor = self.__connection__.cursor()
+
+            for (category, name, *path), _ in marks:
+                self.__persist__(cursor, category, name, tuple(path))
+
+        self.__saved_generations__ = self.__generations__.copy()
+
+    def mark_modified(self, category: str, name: str, *path: str, fields: tuple[str, ...] = ()) -> None:
+        super().mark_modified(category, name, *path, fields=fields)
+
+        if self.__connection__ is None or self.__pending_marks__ is not None:
+            return
+
+        with self.__connection_lock__, self.__connection__:
+            self.__persist__(self.__connection__.cursor(), category, name, path)
+
+        self.__saved_generations__ = self.__generations__.copy()
+
+    def __import_batch__(self, batch: tuple[tuple[str, Storage.MyGameStorageInfo | Storage.MyProgramStorageInfo | Storage.MyContactStorageInfo], ...]) -> None:
+        if self.__connection__ is None:
+            return
+
+        with self.__connection_lock__, self.__connection__:
+            cursor: sqlite3.Cursor = self.__connection__.cursor()
+
+            for category, item in batch:
+                if category == 'game':
+                    cursor.execute('DELETE FROM games WHERE name = ?', (item.name,))
+
+                self.__persist__(cursor, category, item.name, ())
+
+    def __imported__(self, removed: list[tuple[str, str]]) -> None:
+        if self.__connection__ is None:
+            return
+
+        with self.__connection_lock__, self.__connection__:
+            cursor: sqlite3.Cursor = self.__connection__.cursor()
+
+            for category, name in removed:
+                self.__persist__(cursor, category, name, ())
+
+        self.__saved_generations__ = self.__generations__.copy()
+
+    def save(self, path: str, force: bool = False) -> bool:
+        return super().save(path, True) if force else False
+
+    def close(self) -> None:
+        with self.__connection_lock__:
+            if self.__connection__ is not None:
+                self.__connection__.close()
+                self.__connection__ = None
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import re
+import threading
+import typing
+
+
+class MySearchIndex:
+    TOKEN_PATTERN: re.Pattern = re.compile(r'[^\W_]+')
+    SCAN_LIMIT: int = 1024
+
+    @staticmethod
+    def tokenize(*texts: str | None) -> tuple[str, ...]:
+        tokens: dict[str, None] = {}
+
+        for text in texts:
+            if text is not None:
+                tokens.update(dict.fromkeys(MySearchIndex.TOKEN_PATTERN.findall(str(text).casefold())))
+
+        return tuple(tokens)
+
+    def __init__(self):
+        self.__documents__: dict[tuple, tuple[str, ...]] = {}
+        self.__descendants__: dict[tuple, set[tuple]] = {}
+        self.__postings__: dict[str, set[tuple]] = {}
+        self.__vocabulary__: list[str] = []
+        self.__lock__: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.__documents__)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.__documents__
+
+    def __unlink__(self, key: tuple, tokens: tuple[str, ...]) -> None:
+        for token in tokens:
+            postings: set[tuple] = self.__postings__[token]
+            postings.discard(key)
+
+            if len(postings) == 0:
+                del self.__postings__[token]
+                del self.__vocabulary__[bisect.bisect_left(self.__vocabulary__, token)]
+
+    def __prefix_range__(self, token: str) -> tuple[str, ...]:
+        start: int = bisect.bisect_left(self.__vocabulary__, token)
+        end: int = bisect.bisect_left(self.__vocabulary__, token[:-1] + chr(ord(token[-1]) + 1), start)
+        return tuple(self.__vocabulary__[start:end])
+
+    def add(self, key: tuple, *texts: str | None) -> None:
+        assert isinstance(key, tuple) and len(key) > 0, 'Invalid document key'
+        tokens: tuple[str, ...] = MySearchIndex.tokenize(*texts)
+
+        with self.__lock__:
+            old_tokens: tuple[str, ...] | None = self.__documents__.get(key)
+
+            if old_tokens == tokens:
+                return
+            elif old_tokens is not None:
+                self.__unlink__(key, old_tokens)
+
+            self.__documents__[key] = tokens
+            self.__descendants__.setdefault(key[:-1], set()).add(key)
+
+            for token in tokens:
+                postings: set[tuple] | None = self.__postings__.get(token)
+
+                if postings is None:
+                    postings = self.__postings__[token] = set()
+                    bisect.insort(self.__vocabulary__, token)
+
+                postings.add(key)
+
+    def remove(self, key: tuple) -> int:
+        with self.__lock__:
+            removed: int = 0
+
+            for descendant in tuple(self.__descendants__.pop(key, ())):
+                removed += self.remove(descendant)
+
+            tokens: tuple[str, ...] | None = self.__documents__.pop(key, None)
+
+            if tokens is not None:
+                self.__unlink__(key, tokens)
+                siblings: set[tuple] | None = self.__descendants__.get(key[:-1])
+                removed += 1
+
+                if siblings is not None:
+                    siblings.discard(key)
+
+                    if len(siblings) == 0:
+                        del self.__descendants__[key[:-1]]
+
+            return removed
+
+    def clear(self) -> None:
+        with self.__lock__:
+            self.__documents__.clear()
+            self.__descendants__.clear()
+            self.__postings__.clear()
+            self.__vocabulary__.clear()
+
+    def search(self, query: str, limit: int = 50, prefix: bool = True, predicate: typing.Callable[[tuple], bool] | None = None) -> list[tuple]:
+        tokens: tuple[str, ...] = MySearchIndex.tokenize(query)
+
+        if len(tokens) == 0 or limit <= 0:
+            return []
+
+        with self.__lock__:
+            exact: tuple[set[tuple], ...] = tuple(self.__postings__.get(token, set()) for token in tokens)
+            matches: list[set[tuple]] = sorted(exact[:-1] if prefix else exact, key=len)
+            candidates: set[tuple] | None = None if len(matches) == 0 else matches[0].intersection(*matches[1:])
+
+            if prefix:
+                last: str = tokens[-1]
+                completions: tuple[str, ...] = self.__prefix_range__(last)
+
+                if candidates is not None and 64 * len(candidates) < sum(len(self.__postings__[completion]) for completion in completions):
+                    candidates = {key for key in candidates if any(token.startswith(last) for token in self.__documents__[key])}
+                else:
+                    completed: set[tuple] = self.__postings__[completions[0]] if len(completions) == 1 else set().union(*(self.__postings__[completion] for completion in completions))
+                    candidates = completed if candidates is None else candidates.intersection(completed)
+
+            if len(candidates) > MySearchIndex.SCAN_LIMIT:
+                preferred: set[tuple] = candidates.intersection(*exact)
+                candidates = preferred if len(preferred) >= limit else candidates
+
+            def rank(key: tuple) -> tuple[int, int, tuple]:
+                return -sum(key in postings for postings in exact), len(self.__documents__[key]), key
+
+            pool: typing.Iterable[tuple] = candidates if predicate is None else filter(predicate, candidates)
+            return heapq.nsmallest(limit, itertools.islice(pool, MySearchIndex.SCAN_LIMIT) if len(candidates) > MySearchIndex.SCAN_LIMIT else pool, key=rank)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.__vocabulary__)
@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import datetime
 import flask
-import json
+import typing
 import uuid
 
 import CustomMethodsVI.Connection as Connection
 
 import Admins
+import JsonCodec
 import Storage
 
 
 class SocketioHandler:
+    STREAM_WINDOW: int = 4
+    STREAM_POLL: float = 0.01
+    STREAM_TIMEOUT: float = 30
+
     def __init__(self, app: flask.Flask, admin_cache: Admins.MyAdminCache, **kwargs):
         assert isinstance(app, flask.Flask)
         assert isinstance(admin_cache, Admins.MyAdminCache)
@@ -20,23 +25,38 @@ class SocketioHandler:
         self.__app__: flask.Flask = app
         self.__socketio__: Connection.FlaskSocketioServer = Connection.FlaskSocketioServer(app, **kwargs)
         self.__admin_login_requests__: dict[int, datetime.datetime] = {}
+        self.__admin_sockets__: set[Connection.FlaskSocketioSocket] = set()
+        self.__admin_namespace__: Connection.FlaskSocketioNamespace | None = None
+        self.__change_feed_started__: bool = False
         self.__setup__()
 
     def __setup__(self) -> None:
         admin: Connection.FlaskSocketioNamespace = self.__socketio__.of('/admin')
+        catalog: Connection.FlaskSocketioNamespace = self.__socketio__.of('/catalog')
+        self.__admin_namespace__ = admin
+
+        @catalog.on('connect')
+        def oncatalogconnect(socket: Connection.FlaskSocketioSocket):
+            self.__start_change_feed__()
+            socket.emit('catalog-version', Storage.MyGlobalServerStorage.STORAGE.version)
 
         @admin.on('connect')
         def onconnect(socket: Connection.FlaskSocketioSocket):
+            self.__start_change_feed__()
+
             if 'AuthToken' not in socket.request.cookies:
                 socket.disconnect()
                 return
 
             auth_token: uuid.UUID = uuid.UUID(int=int(socket.request.cookies['AuthToken'], 16), version=4)
             admin_info: Admins.MyAdminInfo | None = None
+            stream_id: int = 0
+            stream_acked: int = -1
 
             @socket.on('disconnect')
             def on_disconnect(disconnector: bool) -> None:
                 nonlocal admin_info
+                self.__admin_sockets__.discard(socket)
 
                 if admin_info is not None:
                     admin_info.end_session()
@@ -52,6 +72,7 @@ class SocketioHandler:
 
                 if success:
                     admin_info.begin_session()
+                    self.__admin_sockets__.add(socket)
                     print(f'Session Start - {auth_token} @ {socket.ip_address}; {admin_info.concurrent_users()} active concurrent users')
 
             @socket.on('session-tick')
@@ -65,7 +86,70 @@ class SocketioHandler:
                     socket.disconnect()
                     return
 
-                socket.emit('games-list-response', json.dumps(Storage.MyGlobalServerStorage.STORAGE.send_dict(False)))
+                nonlocal stream_id, stream_acked
+                stream_id += 1
+                stream_acked = -1
+                self.__socketio__.socketio.start_background_task(self.__stream_chunks__, socket, 'games-list-chunk', stream_id, Storage.MyGlobalServerStorage.STORAGE.iter_json(False), lambda sid: stream_acked if sid == stream_id else None)
+
+            @socket.on('games-list-ack')
+            def on_games_list_ack(sid: int, seq: int) -> None:
+                nonlocal stream_acked
+
+                if sid == stream_id:
+                    stream_acked = max(stream_acked, int(seq))
+
+    def __stream_chunks__(self, socket: Connection.FlaskSocketioSocket, eid: str, sid: int, fragments: typing.Iterable[str], acked: typing.Callable[[int], int | None]) -> None:
+        seq: int = 0
+
+        for seq, chunk in enumerate(Storage.MyJsonStream.chunks(fragments)):
+            waited: float = 0
+
+            while (last := acked(sid)) is not None and seq - last > SocketioHandler.STREAM_WINDOW:
+                if not socket.connected or waited >= SocketioHandler.STREAM_TIMEOUT:
+                    return
+
+                self.__socketio__.socketio.sleep(SocketioHandler.STREAM_POLL)
+                waited += SocketioHandler.STREAM_POLL
+
+            if last is None or not socket.connected:
+                return
+
+            socket.emit(eid, sid, seq, chunk, False)
+            self.__socketio__.socketio.sleep(0)
+
+        socket.emit(eid, sid, seq + 1, '', True)
+
+    def __start_change_feed__(self) -> None:
+        if not self.__change_feed_started__:
+            self.__change_feed_started__ = True
+            self.__socketio__.socketio.start_background_task(self.__broadcast_changes__)
+
+    def __broadcast_changes__(self) -> None:
+        while self.__socketio__.closed:
+            self.__socketio__.socketio.sleep(Storage.MyChangeFeed.TICK)
+
+        storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.STORAGE
+        storage.change_feed.version = storage.version
+        storage.change_feed.active = True
+        print(f'\033[38;2;0;150;0m [+] Started catalog change feed - TICK={Storage.MyChangeFeed.TICK}\033[0m')
+
+        try:
+            while not self.__socketio__.closed:
+                self.__socketio__.socketio.sleep(Storage.MyChangeFeed.TICK)
+                changes: dict[str, typing.Any] | None = storage.drain_changes()
+
+                if changes is None:
+                    continue
+
+                admins: tuple[Connection.FlaskSocketioSocket, ...] = tuple(socket for socket in self.__admin_sockets__ if socket.connected)
+
+                if len(admins) > 0:
+                    self.__admin_namespace__.emit('catalog-changes', JsonCodec.dumps({'since': changes['since'], 'version': changes['version'], 'reset': changes['reset'], 'events': changes['admin']}), wl=admins)
+
+                self.__socketio__.socketio.emit('catalog-changes', JsonCodec.dumps({'since': changes['since'], 'version': changes['version'], 'reset': changes['reset'], 'events': changes['public']}), namespace='/catalog')
+        finally:
+            storage.change_feed.active = False
+            print('\033[38;2;0;150;0m [+] Stopped catalog change feed\033[0m')
 
     def listen(self, host: str, port: int, async_: bool = False, **kwargs) -> None:
         if async_:
@@ -73,6 +157,9 @@ class SocketioHandler:
         else:
             self.__socketio__.listen(host, port, **kwargs)
 
+    def sleep(self, seconds: float = 0) -> None:
+        self.__socketio__.socketio.sleep(seconds)
+
     def set_last_admin_login_attempt(self, ip: int, stamp: datetime.datetime) -> None:
         self.__admin_login_requests__[ip] = stamp
 
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import jinja2
+import os
+import re
+import tempfile
+import typing
+
+import JsonCodec
+import Storage
+
+
+class MyStaticSiteExporter:
+    """
+    Exports the public site as a self-contained static tree with fingerprinted, precompressed files
+    Repeated exports only write what changed and keep the previous generation for clients still holding the old index
+    """
+
+    MANIFEST: str = 'manifest.json'
+    ASSET_PATTERN: re.Pattern = re.compile(r'''(?:\.\./|/)?static/([^"'?#\s)]+)(?:\?[^"'#\s)]*)?''')
+    COMPRESSED: tuple[str, ...] = ('.html', '.css', '.js', '.json', '.svg', '.txt')
+    IMAGE_FIELDS: dict[str, str] = {'icon-image': 'icons', 'background-image': 'backgrounds', 'background_image': 'backgrounds'}
+    FINGERPRINT_LENGTH: int = 16
+
+    @staticmethod
+    def fingerprint(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:MyStaticSiteExporter.FINGERPRINT_LENGTH]
+
+    @classmethod
+    def collect_images(cls, node: typing.Any, images: set[tuple[str, int]]) -> set[tuple[str, int]]:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in cls.IMAGE_FIELDS and value is not None:
+                    images.add((cls.IMAGE_FIELDS[key], int(value)))
+                elif isinstance(value, dict):
+                    cls.collect_images(value, images)
+
+        return images
+
+    def __init__(self, storage: Storage.MyGlobalServerStorage, output: str, root: str | None = None):
+        assert isinstance(storage, Storage.MyGlobalServerStorage)
+        self.__storage__: Storage.MyGlobalServerStorage = storage
+        self.__output__: str = os.path.abspath(output)
+        self.__root__: str = os.path.dirname(os.path.abspath(__file__)) if root is None else os.path.abspath(root)
+        self.__templates__: jinja2.Environment = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.join(self.__root__, 'templates')), autoescape=True)
+        self.__manifest__: dict[str, typing.Any] | None = None
+
+    def __load_manifest__(self) -> dict[str, typing.Any]:
+        if self.__manifest__ is None:
+            try:
+                with open(os.path.join(self.__output__, MyStaticSiteExporter.MANIFEST), 'r') as f:
+                    self.__manifest__ = JsonCodec.load(f)
+            except (OSError, ValueError):
+                self.__manifest__ = {}
+
+        return self.__manifest__
+
+    def __write__(self, relative: str, data: bytes, report: dict[str, int], compress: bool = True) -> None:
+        target: str = os.path.join(self.__output__, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        variants: list[tuple[str, bytes]] = [(target, data)]
+
+        if compress and os.path.splitext(relative)[1] in MyStaticSiteExporter.COMPRESSED:
+            variants.append((f'{target}.gz', gzip.compress(data, 9, mtime=0)))
+
+        for path, content in variants:
+            fd, temp = tempfile.mkstemp('.part', dir=os.path.dirname(target))
+
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+
+            os.replace(temp, path)
+            report['written'] += 1
+            report['bytes'] += len(content)
+
+    def __asset__(self, source: str, relative: str, previous: dict[str, typing.Any] | None, report: dict[str, int]) -> dict[str, typing.Any]:
+        stat: os.stat_result = os.stat(source)
+
+        if previous is not None and previous['mtime'] == stat.st_mtime_ns and previous['size'] == stat.st_size and os.path.exists(os.path.join(self.__output__, previous['file'])):
+            report['reused'] += 1
+            return previous
+
+        with open(source, 'rb') as f:
+            data: bytes = f.read()
+
+        stem, extension = os.path.splitext(relative)
+        entry: dict[str, typing.Any] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'file': f'{stem}.{MyStaticSiteExporter.fingerprint(data)}{extension}'}
+
+        if os.path.exists(os.path.join(self.__output__, entry['file'])):
+            report['reused'] += 1
+        else:
+            self.__write__(entry['file'], data, report)
+
+        return entry
+
+    def __catalog__(self, manifest: dict[str, typing.Any], images: dict[str, dict[str, typing.Any]], report: dict[str, int]) -> dict[str, typing.Any]:
+        payload: Storage.MyCatalogPayload = self.__storage__.public_payload()
+        previous: dict[str, typing.Any] | None = manifest.get('catalog')
+
+        if previous is not None and previous['version'] == payload.version and os.path.exists(os.path.join(self.__output__, previous['file'])) and all(os.path.exists(os.path.join(self.__output__, entry['file'])) for entry in images.values()):
+            return previous
+
+        stores: dict[str, typing.Any] = {'icons': self.__storage__.MyImageLoader.MyIconStorage, 'backgrounds': self.__storage__.MyImageLoader.MyBackgroundStorage}
+        urls: dict[str, dict[str, str]] = {'icon': {}, 'background': {}}
+        images.clear()
+
+        for container, image_id in sorted(MyStaticSiteExporter.collect_images(JsonCodec.loads(payload.body), set())):
+            source: typing.Any = stores[container].image_file(image_id)
+
+            if source is None:
+                continue
+
+            key: str = f'{container}/{image_id}'
+            images[key] = self.__asset__(source.filepath, f'images/{key}.jpg', manifest.get('images', {}).get(key), report)
+            urls['icon' if container == 'icons' else 'background'][str(image_id)] = images[key]['file']
+
+        body: bytes = b''.join((b'{"version": ', str(payload.version).encode(), b', "images": ', JsonCodec.dumpb(urls), b', "catalog": ', payload.body, b'}'))
+        catalog: dict[str, typing.Any] = {'version': payload.version, 'file': f'catalog/catalog.{MyStaticSiteExporter.fingerprint(body)}.json'}
+
+        if not os.path.exists(os.path.join(self.__output__, catalog['file'])):
+            self.__write__(catalog['file'], body, report)
+
+        return catalog
+
+    def export(self) -> dict[str, int]:
+        """
+        Exports or incrementally updates the static tree
+        :return: (dict[str, int]) The catalog version and the number of written, reused and removed files and written bytes
+        """
+
+        manifest: dict[str, typing.Any] = self.__load_manifest__()
+        report: dict[str, int] = {'version': 0, 'written': 0, 'reused': 0, 'removed': 0, 'bytes': 0}
+        os.makedirs(self.__output__, exist_ok=True)
+
+        try:
+            images: dict[str, dict[str, typing.Any]] = dict(manifest.get('images', {}))
+            catalog: dict[str, typing.Any] = self.__catalog__(manifest, images, report)
+            assets: dict[str, dict[str, typing.Any]] = {}
+            html: str = self.__templates__.get_template('index.html').render()
+
+            def replace_asset(match: re.Match) -> str:
+                relative: str = match.group(1)
+
+                if relative not in assets:
+                    assets[relative] = self.__asset__(os.path.join(self.__root__, 'static', relative), f'assets/{relative}', manifest.get('assets', {}).get(relative), report)
+
+                return assets[relative]['file']
+
+            html = MyStaticSiteExporter.ASSET_PATTERN.sub(replace_asset, html)
+            html = html.replace('</head>', f'    <meta name="static-catalog" content="{catalog["file"]}">\n</head>', 1)
+            index: bytes = html.encode()
+            index_hash: str = MyStaticSiteExporter.fingerprint(index)
+
+            if manifest.get('index') != index_hash or not os.path.exists(os.path.join(self.__output__, 'index.html')):
+                self.__write__('index.html', index, report)
+            else:
+                report['reused'] += 1
+        except OSError as err:
+            raise IOError('Failed to export static site') from err
+
+        files: list[str] = sorted({catalog['file'], *(entry['file'] for entry in assets.values()), *(entry['file'] for entry in images.values())})
+        kept: set[str] = {*files, *manifest.get('files', ())}
+
+        for relative in manifest.get('retained', ()):
+            if relative in kept:
+                continue
+
+            for path in (relative, f'{relative}.gz'):
+                try:
+                    os.remove(os.path.join(self.__output__, path))
+                    report['removed'] += 1
+                except FileNotFoundError:
+                    pass
+
+        self.__manifest__ = {'version': catalog['version'], 'index': index_hash, 'catalog': catalog, 'assets': assets, 'images': images, 'files': files, 'retained': manifest.get('files', []) if manifest.get('files') != files else manifest.get('retained', [])}
+        self.__write__(MyStaticSiteExporter.MANIFEST, JsonCodec.dumpb(self.__manifest__), {'written': 0, 'bytes': 0}, False)
+        report['version'] = catalog['version']
+        return report
+
+    @property
+    def version(self) -> int | None:
+        return self.__load_manifest__().get('version')
+
+    @property
+    def output(self) -> str:
+        return self.__output__
@@ -1,33 +1,74 @@
 from __future__ import annotations
 
-import json
+import array
+import base64
+import bisect
+import collections
+import contextlib
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
+import os
 import PIL.Image
+import struct
+import threading
+import time
+import typing
 
 import CustomMethodsVI.FileSystem as FileSystem
 
+import CatalogSnapshot
 import Image
+import JsonCodec
+import Search
 import Util
 
 
 class MyGameStorageInfo:
     class MyGameSectionInfo:
-        def __init__(self, name: str, display_name: str, background_image: int | None, visible: bool):
+        __slots__: tuple[str, ...] = ('__parent__', '__visible__', '__section_name__', '__display_name__', '__background_image__', '__children__')
+
+        def __init__(self, parent: MyGameStorageInfo, name: str, display_name: str, background_image: int | None, visible: bool):
+            assert isinstance(parent, MyGameStorageInfo)
+            self.__parent__: MyGameStorageInfo = parent
             self.__visible__: bool = bool(visible)
             self.__section_name__: str = str(name)
             self.__display_name__: str = str(display_name)
             self.__background_image__: int | None = None if background_image is None else int(background_image)
             self.__children__: dict[str, MyGameStorageInfo.MyGameObjectInfo] = {}
 
+        def __modified__(self, *path: str, fields: tuple[str, ...] = ()) -> None:
+            self.__parent__.__modified__(self.__section_name__, *path, fields=fields)
+
+        def __witness__(self, *path: str, created: bool = False) -> None:
+            self.__parent__.__witness__(self.__section_name__, *path, created=created)
+
+        def __image_refs__(self) -> tuple[tuple[str, int | None], ...]:
+            return (('backgrounds', self.__background_image__),)
+
+        def __search_terms__(self) -> tuple[str | None, ...]:
+            return self.__display_name__, self.__section_name__
+
         def del_child(self, child_name: str) -> None:
             if child_name in self.__children__:
+                self.__witness__(child_name)
+                MyGlobalServerStorage.STORAGE.image_references.remove_entity(self.__children__[child_name])
                 del self.__children__[child_name]
+                self.__modified__(child_name)
 
         def rename_child(self, old_name: str, new_name: str) -> None:
             if old_name in self.__children__ and old_name != new_name:
+                assert new_name not in self.__children__, f'Duplicate child \'{new_name}\''
+                self.__witness__(old_name)
+                self.__witness__(new_name, created=True)
                 child: MyGameStorageInfo.MyGameObjectInfo = self.__children__[old_name]
                 child.__child_name__ = new_name
                 self.__children__[new_name] = child
                 del self.__children__[old_name]
+                self.__modified__(old_name)
+                self.__modified__(new_name)
 
         def get_child(self, child_name: str) -> MyGameStorageInfo.MyGameObjectInfo | None:
             return self.__children__[child_name] if child_name in self.__children__ else None
@@ -36,6 +77,8 @@ class MyGameStorageInfo:
             assert child_name not in self.__children__
             child: MyGameStorageInfo.MyGameObjectInfo = MyGameStorageInfo.MyGameObjectInfo(self, child_name, child_display_name, url, icon_image, visible)
             self.__children__[child_name] = child
+            MyGlobalServerStorage.STORAGE.image_references.add_entity(child)
+            self.__modified__(child_name)
             return child
 
         def save(self) -> dict:
@@ -46,11 +89,16 @@ class MyGameStorageInfo:
                 'children': {c.name: c.save() for c in self.__children__.values()}
             }
 
-        def send_dict(self, visible_only: bool = True) -> dict:
+        def send_fields(self) -> dict:
             return {
                 'visible': self.__visible__,
                 'display-name': self.__display_name__,
-                'background_image': None if self.__background_image__ is None else str(self.__background_image__),
+                'background_image': None if self.__background_image__ is None else str(self.__background_image__)
+            }
+
+        def send_dict(self, visible_only: bool = True) -> dict:
+            return {
+                **self.send_fields(),
                 'children': {c.name: c.send_dict() for c in self.__children__.values() if not visible_only or c.visible}
             }
 
@@ -60,7 +108,9 @@ class MyGameStorageInfo:
 
         @visible.setter
         def visible(self, visible: bool) -> None:
-                self.__visible__ = bool(visible)
+            self.__witness__()
+            self.__visible__ = bool(visible)
+            self.__modified__(fields=('visible',))
 
         @property
         def section_name(self) -> str:
@@ -71,6 +121,7 @@ class MyGameStorageInfo:
             assert isinstance(name, str), 'Type error'
             assert 4 <= len(name) <= 64, 'Name length error'
             self.__section_name__ = str(name)
+            self.__modified__()
 
         @property
         def display_name(self) -> str:
@@ -81,6 +132,7 @@ class MyGameStorageInfo:
             assert isinstance(name, str), 'Type error'
             assert 4 <= len(name) <= 64, 'Name length error'
             self.__display_name__ = str(name)
+            self.__modified__(fields=('display-name',))
 
         @property
         def background_image(self) -> PIL.Image.Image | None:
@@ -91,13 +143,23 @@ class MyGameStorageInfo:
 
         @background_image.setter
         def background_image(self, image: PIL.Image.Image | int | None):
-            if self.__background_image__ is not None and image is None:
-                MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.del_image(self.__background_image__)
+            old_image: int | None = self.__background_image__
+
+            if image is None:
                 self.__background_image__ = None
-            elif image is not None:
-                self.__background_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.set_image(self.__background_image__, image)
+            else:
+                self.__background_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.set_image(None, image)
+
+            MyGlobalServerStorage.STORAGE.image_references.replace('backgrounds', old_image, self.__background_image__, self)
+
+            if old_image is not None and image is None:
+                MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.del_image(old_image)
+
+            self.__modified__(fields=('background_image',))
 
     class MyGameObjectInfo:
+        __slots__: tuple[str, ...] = ('__parent__', '__visible__', '__child_name__', '__child_display_name__', '__url__', '__image__')
+
         def __init__(self, parent: MyGameStorageInfo.MyGameSectionInfo, name: str, display_name: str, url: str | None, image: int | None, visible: bool):
             assert isinstance(parent, MyGameStorageInfo.MyGameSectionInfo)
             self.__parent__: MyGameStorageInfo.MyGameSectionInfo = parent
@@ -107,6 +169,18 @@ class MyGameStorageInfo:
             self.__url__: str | None = None if url is None else str(url)
             self.__image__: int | None = None if image is None else int(image)
 
+        def __modified__(self, fields: tuple[str, ...] = ()) -> None:
+            self.__parent__.__modified__(self.__child_name__, fields=fields)
+
+        def __witness__(self) -> None:
+            self.__parent__.__witness__(self.__child_name__)
+
+        def __image_refs__(self) -> tuple[tuple[str, int | None], ...]:
+            return (('icons', self.__image__),)
+
+        def __search_terms__(self) -> tuple[str | None, ...]:
+            return self.__child_display_name__, self.__child_name__, self.__url__
+
         def save(self) -> dict:
             return {
                 'visible': self.__visible__,
@@ -129,7 +203,9 @@ class MyGameStorageInfo:
 
         @visible.setter
         def visible(self, visible: bool) -> None:
+            self.__witness__()
             self.__visible__ = bool(visible)
+            self.__modified__(fields=('visible',))
 
         @property
         def name(self) -> str:
@@ -143,8 +219,9 @@ class MyGameStorageInfo:
         def display_name(self, name: str) -> None:
             assert isinstance(name, str), 'Type error'
             assert 4 <= len(name) <= 64, 'Name length error'
+            self.__parent__.rename_child(self.__child_name__, Util.to_functional_name(str(name)))
             self.__child_display_name__ = str(name)
-            self.__parent__.rename_child(self.__child_name__, Util.to_functional_name(self.__child_display_name__))
+            self.__modified__(fields=('display-name',))
 
         @property
         def url(self) -> str:
@@ -154,6 +231,7 @@ class MyGameStorageInfo:
         def url(self, url: str) -> None:
             assert isinstance(url, str), 'Type error'
             self.__url__ = None if url is None or len(str(url)) == 0 else str(url)
+            self.__modified__(fields=('url',))
 
         @property
         def icon_image(self) -> PIL.Image.Image | None:
@@ -164,46 +242,114 @@ class MyGameStorageInfo:
 
         @icon_image.setter
         def icon_image(self, image: PIL.Image.Image | int | None):
-            if self.__image__ is not None and image is None:
-                MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(self.__image__)
+            old_image: int | None = self.__image__
+
+            if image is None:
                 self.__image__ = None
-            elif image is not None:
-                self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(self.__image__, image)
+            else:
+                self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(None, image)
+
+            MyGlobalServerStorage.STORAGE.image_references.replace('icons', old_image, self.__image__, self)
+
+            if old_image is not None and image is None:
+                MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(old_image)
 
-    def __init__(self, name: str, display_name: str, url: str, icon_image: int | None, background_image: int | None, visible: bool):
+            self.__modified__(fields=('icon-image',))
+
+    __slots__: tuple[str, ...] = ('__visible__', '__game_name__', '__game_display_name__', '__game_url__', '__icon_image__', '__background_image__', '__children__', '__loader__', '__accessed__')
+
+    def __init__(self, name: str, display_name: str, url: str, icon_image: int | None, background_image: int | None, visible: bool, *, loader: typing.Callable[[MyGameStorageInfo], dict[str, MyGameStorageInfo.MyGameSectionInfo]] | None = None):
         self.__visible__: bool = bool(visible)
         self.__game_name__: str = str(name)
         self.__game_display_name__: str = str(display_name)
         self.__game_url__: str = str(url)
         self.__icon_image__: int | None = None if icon_image is None else int(icon_image)
         self.__background_image__: int | None = None if background_image is None else int(background_image)
-        self.__children__: dict[str, MyGameStorageInfo.MyGameSectionInfo] = {}
+        self.__children__: dict[str, MyGameStorageInfo.MyGameSectionInfo] | None = {} if loader is None else None
+        self.__loader__: typing.Callable[[MyGameStorageInfo], dict[str, MyGameStorageInfo.MyGameSectionInfo]] | None = loader
+        self.__accessed__: float = 0
+
+    def __modified__(self, *path: str, fields: tuple[str, ...] = ()) -> None:
+        if len(path) > 0 and self.__children__ is not None:
+            self.__loader__ = None
+
+        MyGlobalServerStorage.STORAGE.mark_modified('game', self.__game_name__, *path, fields=fields)
+
+    def __witness__(self, *path: str, created: bool = False) -> None:
+        MyGlobalServerStorage.STORAGE.witness_public('game', self.__game_name__, *path, created=created)
+
+    def __image_refs__(self) -> tuple[tuple[str, int | None], ...]:
+        return (('icons', self.__icon_image__), ('backgrounds', self.__background_image__))
+
+    def __search_terms__(self) -> tuple[str | None, ...]:
+        return self.__game_display_name__, self.__game_name__, self.__game_url__
+
+    def __subtree__(self) -> dict[str, MyGameStorageInfo.MyGameSectionInfo]:
+        self.__accessed__ = time.monotonic()
+
+        if self.__children__ is None:
+            with MyGlobalServerStorage.STORAGE.__subtree_lock__:
+                if self.__children__ is None:
+                    children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__loader__(self)
+                    MyGlobalServerStorage.STORAGE.image_references.materialize(self, children.values())
+                    self.__children__ = children
+
+        return self.__children__
+
+    def __sections__(self) -> dict[str, MyGameStorageInfo.MyGameSectionInfo]:
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] | None = self.__children__
+        return self.__loader__(self) if children is None else children
+
+    def evict(self) -> bool:
+        if not self.evictable:
+            return False
+
+        MyGlobalServerStorage.STORAGE.image_references.evict(self, self.__children__.values())
+        self.__children__ = None
+        return True
 
     def add_child(self, section_name: str, item_name: str, item_display_name: str, item_url: str, item_image: int | None, visible: bool) -> None:
-        assert section_name in self.__children__, f'No such section \'{section_name}\''
-        section: MyGameStorageInfo.MyGameSectionInfo = self.__children__[section_name]
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__subtree__()
+        assert section_name in children, f'No such section \'{section_name}\''
+        section: MyGameStorageInfo.MyGameSectionInfo = children[section_name]
         section.add_child(item_name, item_display_name, item_url, item_image, visible)
 
     def del_section(self, section_name: str) -> None:
-        if section_name in self.__children__:
-            del self.__children__[section_name]
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__subtree__()
+
+        if section_name in children:
+            self.__witness__(section_name)
+            MyGlobalServerStorage.STORAGE.image_references.remove_sections((children[section_name],))
+            del children[section_name]
+            self.__modified__(section_name)
 
     def rename_section(self, old_name: str, new_name: str) -> None:
-        if old_name in self.__children__ and old_name != new_name:
-            section: MyGameStorageInfo.MyGameSectionInfo = self.__children__[old_name]
-            section.__child_name__ = new_name
-            self.__children__[new_name] = section
-            del self.__children__[old_name]
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__subtree__()
+
+        if old_name in children and old_name != new_name:
+            assert new_name not in children, f'Duplicate section \'{new_name}\''
+            self.__witness__(old_name)
+            self.__witness__(new_name, created=True)
+            section: MyGameStorageInfo.MyGameSectionInfo = children[old_name]
+            section.__section_name__ = new_name
+            children[new_name] = section
+            del children[old_name]
+            self.__modified__(old_name)
+            self.__modified__(new_name)
 
     def add_section(self, section_name: str, section_display_name: str, background_image: int | None, visible: bool) -> MyGameStorageInfo.MyGameSectionInfo:
         section_name = str(section_name)
-        assert section_name not in self.__children__, f'Duplicate section \'{section_name}\''
-        section: MyGameStorageInfo.MyGameSectionInfo = MyGameStorageInfo.MyGameSectionInfo(section_name, str(section_display_name), background_image, visible)
-        self.__children__[section_name] = section
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__subtree__()
+        assert section_name not in children, f'Duplicate section \'{section_name}\''
+        section: MyGameStorageInfo.MyGameSectionInfo = MyGameStorageInfo.MyGameSectionInfo(self, section_name, str(section_display_name), background_image, visible)
+        children[section_name] = section
+        MyGlobalServerStorage.STORAGE.image_references.add_entity(section)
+        self.__modified__(section_name)
         return section
 
     def get_section(self, section_name: str) -> MyGameStorageInfo.MyGameSectionInfo | None:
-        return self.__children__[section_name] if section_name in self.__children__ else None
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = self.__subtree__()
+        return children[section_name] if section_name in children else None
 
     def save(self) -> dict:
         return {
@@ -212,26 +358,44 @@ class MyGameStorageInfo:
             'game-url': self.__game_url__,
             'icon-image': None if self.__icon_image__ is None else self.__icon_image__,
             'background-image': None if self.__background_image__ is None else self.__background_image__,
-            'sections': {k: v.save() for k, v in self.__children__.items()}
+            'sections': {k: v.save() for k, v in self.__sections__().items()}
         }
 
-    def send_dict(self, visible_only: bool = True) -> dict:
+    def send_fields(self) -> dict:
         return {
             'visible': self.__visible__,
             'display-name': self.__game_display_name__,
             'game-url': self.__game_url__,
             'icon-image': None if self.__icon_image__ is None else str(self.__icon_image__),
-            'background-image': None if self.__background_image__ is None else str(self.__background_image__),
-            'sections': {k: v.send_dict(visible_only) for k, v in self.__children__.items() if not visible_only or v.visible}
+            'background-image': None if self.__background_image__ is None else str(self.__background_image__)
+        }
+
+    def send_dict(self, visible_only: bool = True) -> dict:
+        return {
+            **self.send_fields(),
+            'sections': {k: v.send_dict(visible_only) for k, v in self.__sections__().items() if not visible_only or v.visible}
         }
 
+    def iter_json(self, visible_only: bool = True) -> typing.Iterator[str]:
+        yield f'{JsonCodec.dumps(self.send_fields())[:-1]}, "sections": {{'
+        separator: str = ''
+
+        for name, section in self.__sections__().items():
+            if not visible_only or section.visible:
+                yield f'{separator}{JsonCodec.dumps(name)}: {JsonCodec.dumps(section.send_dict(visible_only))}'
+                separator = ', '
+
+        yield '}}'
+
     @property
     def visible(self) -> bool:
         return self.__visible__
 
     @visible.setter
     def visible(self, visible: bool) -> None:
+        self.__witness__()
         self.__visible__ = bool(visible)
+        self.__modified__(fields=('visible',))
 
     @property
     def name(self) -> str:
@@ -247,6 +411,7 @@ class MyGameStorageInfo:
         assert 4 <= len(name) <= 64, 'Name length error'
         self.__game_display_name__ = str(name)
         MyGlobalServerStorage.STORAGE.rename_game(self.__game_name__, Util.to_functional_name(self.__game_display_name__))
+        self.__modified__(fields=('display-name',))
 
     @property
     def url(self) -> str:
@@ -256,6 +421,7 @@ class MyGameStorageInfo:
     def url(self, url: str) -> None:
         assert isinstance(url, str), 'Type error'
         self.__game_url__ = None if url is None or len(str(url)) == 0 else str(url)
+        self.__modified__(fields=('game-url',))
 
     @property
     def icon_image(self) -> PIL.Image.Image | None:
@@ -266,11 +432,19 @@ class MyGameStorageInfo:
 
     @icon_image.setter
     def icon_image(self, image: PIL.Image.Image | int | None):
-        if self.__icon_image__ is not None and image is None:
-            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(self.__icon_image__)
+        old_image: int | None = self.__icon_image__
+
+        if image is None:
             self.__icon_image__ = None
-        elif image is not None:
-            self.__icon_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(self.__icon_image__, image)
+        else:
+            self.__icon_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(None, image)
+
+        MyGlobalServerStorage.STORAGE.image_references.replace('icons', old_image, self.__icon_image__, self)
+
+        if old_image is not None and image is None:
+            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(old_image)
+
+        self.__modified__(fields=('icon-image',))
 
     @property
     def background_image(self) -> PIL.Image.Image | None:
@@ -281,14 +455,36 @@ class MyGameStorageInfo:
 
     @background_image.setter
     def background_image(self, image: PIL.Image.Image | int | None):
-        if self.__background_image__ is not None and image is None:
-            MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.del_image(self.__background_image__)
+        old_image: int | None = self.__background_image__
+
+        if image is None:
             self.__background_image__ = None
-        elif image is not None:
-            self.__background_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.set_image(self.__background_image__, image)
+        else:
+            self.__background_image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.set_image(None, image)
+
+        MyGlobalServerStorage.STORAGE.image_references.replace('backgrounds', old_image, self.__background_image__, self)
+
+        if old_image is not None and image is None:
+            MyGlobalServerStorage.STORAGE.MyImageLoader.MyBackgroundStorage.del_image(old_image)
+
+        self.__modified__(fields=('background-image',))
+
+    @property
+    def loaded(self) -> bool:
+        return self.__children__ is not None
+
+    @property
+    def evictable(self) -> bool:
+        return self.__loader__ is not None and self.__children__ is not None
+
+    @property
+    def last_accessed(self) -> float:
+        return self.__accessed__
 
 
 class MyProgramStorageInfo:
+    __slots__: tuple[str, ...] = ('__program_name__', '__program_display_name__', '__url__', '__image__', '__visible__', '__dimensions__', '__program_type__')
+
     def __init__(self, name: str, display_name: str, url: str | None, icon_image: int | None, visible: bool, width: int, height: int, program_type: Util.ProgramType):
         self.__program_name__: str = str(name)
         self.__program_display_name__: str = str(display_name)
@@ -298,6 +494,18 @@ class MyProgramStorageInfo:
         self.__dimensions__: tuple[int, int] = (int(width), int(height))
         self.__program_type__: Util.ProgramType = Util.ProgramType(program_type)
 
+    def __modified__(self, fields: tuple[str, ...] = ()) -> None:
+        MyGlobalServerStorage.STORAGE.mark_modified('program', self.__program_name__, fields=fields)
+
+    def __witness__(self) -> None:
+        MyGlobalServerStorage.STORAGE.witness_public('program', self.__program_name__)
+
+    def __image_refs__(self) -> tuple[tuple[str, int | None], ...]:
+        return (('icons', self.__image__),)
+
+    def __search_terms__(self) -> tuple[str | None, ...]:
+        return self.__program_display_name__, self.__program_name__, self.__url__
+
     def save(self) -> dict:
         return {
             'visible': self.__visible__,
@@ -326,7 +534,9 @@ class MyProgramStorageInfo:
 
     @visible.setter
     def visible(self, visible: bool) -> None:
+        self.__witness__()
         self.__visible__ = bool(visible)
+        self.__modified__(fields=('visible',))
 
     @property
     def name(self) -> str:
@@ -342,6 +552,7 @@ class MyProgramStorageInfo:
         assert 4 <= len(name) <= 64, 'Name length error'
         self.__program_display_name__ = str(name)
         MyGlobalServerStorage.STORAGE.rename_program(self.__program_name__, Util.to_functional_name(self.__program_display_name__))
+        self.__modified__(fields=('display-name',))
 
     @property
     def url(self) -> str:
@@ -351,6 +562,7 @@ class MyProgramStorageInfo:
     def url(self, url: str) -> None:
         assert url is None or isinstance(url, str), 'Type error'
         self.__url__ = None if url is None or len(str(url)) == 0 else str(url)
+        self.__modified__(fields=('url',))
 
     @property
     def icon_image(self) -> PIL.Image.Image | None:
@@ -361,11 +573,19 @@ class MyProgramStorageInfo:
 
     @icon_image.setter
     def icon_image(self, image: PIL.Image.Image | int | None):
-        if self.__image__ is not None and image is None:
-            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(self.__image__)
+        old_image: int | None = self.__image__
+
+        if image is None:
             self.__image__ = None
-        elif image is not None:
-            self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(self.__image__, image)
+        else:
+            self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(None, image)
+
+        MyGlobalServerStorage.STORAGE.image_references.replace('icons', old_image, self.__image__, self)
+
+        if old_image is not None and image is None:
+            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(old_image)
+
+        self.__modified__(fields=('icon-image',))
 
     @property
     def dimensions(self) -> tuple[int, int]:
@@ -376,6 +596,7 @@ class MyProgramStorageInfo:
         width: int = self.__dimensions__[0] if dimension[0] is ... else 1 if dimension[0] is None else int(dimension[0])
         height: int = self.__dimensions__[1] if dimension[1] is ... else 1 if dimension[1] is None else int(dimension[1])
         self.__dimensions__ = (width, height)
+        self.__modified__(fields=('width', 'height'))
 
     @property
     def program_type(self) -> Util.ProgramType:
@@ -384,9 +605,12 @@ class MyProgramStorageInfo:
     @program_type.setter
     def program_type(self, value: int | Util.ProgramType) -> None:
         self.__program_type__ = Util.ProgramType(value)
+        self.__modified__(fields=('program-type',))
 
 
 class MyContactStorageInfo:
+    __slots__: tuple[str, ...] = ('__contact_name__', '__contact_display_name__', '__content__', '__contact_type__', '__image__', '__visible__')
+
     def __init__(self, name: str, display_name: str, content: str | None, contact_type: Util.ContactType, icon_image: int | None, visible: bool):
         self.__contact_name__: str = str(name)
         self.__contact_display_name__: str = str(display_name)
@@ -395,6 +619,18 @@ class MyContactStorageInfo:
         self.__image__: int | None = None if icon_image is None else int(icon_image)
         self.__visible__: bool = bool(visible)
 
+    def __modified__(self, fields: tuple[str, ...] = ()) -> None:
+        MyGlobalServerStorage.STORAGE.mark_modified('contact', self.__contact_name__, fields=fields)
+
+    def __witness__(self) -> None:
+        MyGlobalServerStorage.STORAGE.witness_public('contact', self.__contact_name__)
+
+    def __image_refs__(self) -> tuple[tuple[str, int | None], ...]:
+        return (('icons', self.__image__),)
+
+    def __search_terms__(self) -> tuple[str | None, ...]:
+        return self.__contact_display_name__, self.__contact_name__, self.__content__
+
     def save(self) -> dict:
         return {
             'visible': self.__visible__,
@@ -420,7 +656,9 @@ class MyContactStorageInfo:
 
     @visible.setter
     def visible(self, visible: bool) -> None:
+        self.__witness__()
         self.__visible__ = bool(visible)
+        self.__modified__(fields=('visible',))
 
     @property
     def name(self) -> str:
@@ -436,6 +674,7 @@ class MyContactStorageInfo:
         assert 4 <= len(name) <= 64, 'Name length error'
         self.__contact_display_name__ = str(name)
         MyGlobalServerStorage.STORAGE.rename_contact(self.__contact_name__, Util.to_functional_name(self.__contact_display_name__))
+        self.__modified__(fields=('display-name',))
 
     @property
     def content(self) -> str:
@@ -446,6 +685,7 @@ class MyContactStorageInfo:
         assert content is None or isinstance(content, str), 'Type error'
         self.__content__ = None if content is None or len(str(content)) == 0 else str(content)
         self.__contact_type__ = Util.ContactType.NONE if self.__content__ is None else self.__contact_type__
+        self.__modified__(fields=('content', 'url'))
 
     @property
     def contact_type(self) -> Util.ContactType:
@@ -454,6 +694,7 @@ class MyContactStorageInfo:
     @contact_type.setter
     def contact_type(self, value: int | Util.ContactType) -> None:
         self.__contact_type__ = Util.ContactType(value)
+        self.__modified__(fields=('contact-type', 'url'))
 
     @property
     def icon_image(self) -> PIL.Image.Image | None:
@@ -464,11 +705,19 @@ class MyContactStorageInfo:
 
     @icon_image.setter
     def icon_image(self, image: PIL.Image.Image | int | None):
-        if self.__image__ is not None and image is None:
-            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(self.__image__)
+        old_image: int | None = self.__image__
+
+        if image is None:
             self.__image__ = None
-        elif image is not None:
-            self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(self.__image__, image)
+        else:
+            self.__image__ = int(image) if isinstance(image, int) else MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.set_image(None, image)
+
+        MyGlobalServerStorage.STORAGE.image_references.replace('icons', old_image, self.__image__, self)
+
+        if old_image is not None and image is None:
+            MyGlobalServerStorage.STORAGE.MyImageLoader.MyIconStorage.del_image(old_image)
+
+        self.__modified__(fields=('icon-image',))
 
     @property
     def url(self) -> str | None:
@@ -484,20 +733,720 @@ class MyContactStorageInfo:
             raise ValueError(f'Unknown contact type: \'{self.__contact_type__}\'')
 
 
+class MyImageReferenceIndex:
+    CONTAINERS: tuple[str, ...] = ('icons', 'backgrounds')
+
+    def __init__(self):
+        self.__references__: dict[str, dict[int, dict[object, int]]] = {container: {} for container in MyImageReferenceIndex.CONTAINERS}
+        self.__pending__: set[MyGameStorageInfo] = set()
+        self.__lock__: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return sum(len(references) for references in self.__references__.values())
+
+    def __link__(self, container: str, image_id: int | None, owner: object) -> None:
+        if image_id is not None:
+            owners: dict[object, int] = self.__references__[container].setdefault(int(image_id), {})
+            owners[owner] = owners.get(owner, 0) + 1
+
+    def __unlink__(self, container: str, image_id: int | None, owner: object) -> None:
+        owners: dict[object, int] | None = None if image_id is None else self.__references__[container].get(int(image_id))
+
+        if owners is None or owner not in owners:
+            return
+
+        owners[owner] -= 1
+
+        if owners[owner] <= 0:
+            del owners[owner]
+
+        if len(owners) == 0:
+            del self.__references__[container][int(image_id)]
+
+    def clear(self) -> None:
+        with self.__lock__:
+            for references in self.__references__.values():
+                references.clear()
+
+            self.__pending__.clear()
+
+    def replace(self, container: str, old_id: int | None, new_id: int | None, owner: object) -> None:
+        if old_id == new_id:
+            return
+
+        with self.__lock__:
+            self.__unlink__(container, old_id, owner)
+            self.__link__(container, new_id, owner)
+
+    def add_entity(self, entity: typing.Any, owner: object = None) -> None:
+        with self.__lock__:
+            for container, image_id in entity.__image_refs__():
+                self.__link__(container, image_id, entity if owner is None else owner)
+
+    def remove_entity(self, entity: typing.Any, owner: object = None) -> None:
+        with self.__lock__:
+            for container, image_id in entity.__image_refs__():
+                self.__unlink__(container, image_id, entity if owner is None else owner)
+
+    def add_sections(self, sections: typing.Iterable[MyGameStorageInfo.MyGameSectionInfo], owner: MyGameStorageInfo | None = None) -> None:
+        with self.__lock__:
+            for section in sections:
+                self.add_entity(section, owner)
+
+                for child in section.__children__.values():
+                    self.add_entity(child, owner)
+
+    def remove_sections(self, sections: typing.Iterable[MyGameStorageInfo.MyGameSectionInfo], owner: MyGameStorageInfo | None = None) -> None:
+        with self.__lock__:
+            for section in sections:
+                self.remove_entity(section, owner)
+
+                for child in section.__children__.values():
+                    self.remove_entity(child, owner)
+
+    def add_game(self, game: MyGameStorageInfo) -> None:
+        with self.__lock__:
+            self.add_entity(game)
+
+            if game.loaded:
+                self.add_sections(game.__children__.values())
+            else:
+                self.__pending__.add(game)
+
+    def remove_game(self, game: MyGameStorageInfo) -> None:
+        with self.__lock__:
+            self.__pending__.discard(game)
+
+            for references in self.__references__.values():
+                for image_id in [image_id for image_id, owners in references.items() if game in owners]:
+                    del references[image_id][game]
+
+                    if len(references[image_id]) == 0:
+                        del references[image_id]
+
+            if game.loaded:
+                self.remove_sections(game.__children__.values())
+
+    def materialize(self, game: MyGameStorageInfo, sections: typing.Iterable[MyGameStorageInfo.MyGameSectionInfo]) -> None:
+        sections = tuple(sections)
+
+        with self.__lock__:
+            if game in self.__pending__:
+                self.__pending__.discard(game)
+            else:
+                self.remove_sections(sections, game)
+
+            self.add_sections(sections)
+
+    def evict(self, game: MyGameStorageInfo, sections: typing.Iterable[MyGameStorageInfo.MyGameSectionInfo]) -> None:
+        sections = tuple(sections)
+
+        with self.__lock__:
+            self.remove_sections(sections)
+            self.add_sections(sections, game)
+
+    def resolve(self) -> int:
+        with self.__lock__:
+            pending: tuple[MyGameStorageInfo, ...] = tuple(self.__pending__)
+
+            for game in pending:
+                self.add_sections(game.__sections__().values(), game)
+
+            self.__pending__.clear()
+            return len(pending)
+
+    def owners(self, container: str, image_id: int) -> tuple[object, ...]:
+        with self.__lock__:
+            self.resolve()
+            return tuple(self.__references__[container].get(int(image_id), ()))
+
+    def referenced(self, container: str, image_id: int) -> bool:
+        with self.__lock__:
+            self.resolve()
+            return int(image_id) in self.__references__[container]
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending__)
+
+
+class MyCatalogOrder:
+    SORT_KEYS: tuple[str, ...] = ('name', 'display-name')
+
+    @staticmethod
+    def sort_key(sort: str, name: str, item: typing.Any) -> tuple[str, ...]:
+        return (name,) if sort == 'name' else (item.display_name.casefold(), name)
+
+    @staticmethod
+    def facet(item: typing.Any) -> tuple[bool, int]:
+        if isinstance(item, MyProgramStorageInfo):
+            return item.visible, item.program_type.value
+        elif isinstance(item, MyContactStorageInfo):
+            return item.visible, item.contact_type.value
+
+        return item.visible, -1
+
+    @staticmethod
+    def encode_cursor(sort: str, descending: bool, key: tuple[str, ...]) -> str:
+        return base64.urlsafe_b64encode(JsonCodec.dumpb([sort, bool(descending), *key])).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, descending: bool) -> tuple[str, ...]:
+        try:
+            cursor_sort, cursor_descending, *key = JsonCodec.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except Exception as err:
+            raise ValueError('Invalid cursor') from err
+
+        if cursor_sort != sort or cursor_descending != bool(descending) or len(key) == 0 or not all(isinstance(x, str) for x in key):
+            raise ValueError('Cursor does not match query')
+
+        return tuple(key)
+
+    def __init__(self):
+        self.__entries__: dict[str, tuple[tuple[bool, int], dict[str, tuple[str, ...]]]] = {}
+        self.__buckets__: dict[tuple[bool, int], dict[str, list[tuple[str, ...]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
+
+    def __bounds__(self, keys: list[tuple[str, ...]], prefix: str | None, after: tuple[str, ...] | None, descending: bool) -> tuple[int, int]:
+        start: int = 0 if prefix is None else bisect.bisect_left(keys, (prefix,))
+        end: int = len(keys) if prefix is None else bisect.bisect_left(keys, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), start)
+
+        if after is not None and descending:
+            end = min(end, bisect.bisect_left(keys, after, start, end))
+        elif after is not None:
+            start = max(start, bisect.bisect_right(keys, after, start, end))
+
+        return start, end
+
+    def __scan__(self, keys: list[tuple[str, ...]], prefix: str | None, after: tuple[str, ...] | None, descending: bool) -> typing.Iterator[tuple[str, ...]]:
+        start, end = self.__bounds__(keys, prefix, after, descending)
+
+        for i in (range(end - 1, start - 1, -1) if descending else range(start, end)):
+            yield keys[i]
+
+    def __matching__(self, sort: str, visible: bool | None, item_type: int | None) -> list[list[tuple[str, ...]]]:
+        return [bucket[sort] for facet, bucket in self.__buckets__.items() if (visible is None or facet[0] == visible) and (item_type is None or facet[1] == item_type)]
+
+    def clear(self) -> None:
+        self.__entries__.clear()
+        self.__buckets__.clear()
+
+    def rebuild(self, items: dict[str, typing.Any]) -> None:
+        self.clear()
+
+        for name, item in items.items():
+            facet: tuple[bool, int] = MyCatalogOrder.facet(item)
+            keys: dict[str, tuple[str, ...]] = {sort: MyCatalogOrder.sort_key(sort, name, item) for sort in MyCatalogOrder.SORT_KEYS}
+            bucket: dict[str, list[tuple[str, ...]]] = self.__buckets__.setdefault(facet, {sort: [] for sort in MyCatalogOrder.SORT_KEYS})
+            self.__entries__[name] = (facet, keys)
+
+            for sort, key in keys.items():
+                bucket[sort].append(key)
+
+        for bucket in self.__buckets__.values():
+            for keys in bucket.values():
+                keys.sort()
+
+    def remove(self, name: str) -> None:
+        entry: tuple[tuple[bool, int], dict[str, tuple[str, ...]]] | None = self.__entries__.pop(name, None)
+
+        if entry is None:
+            return
+
+        facet, keys = entry
+        bucket: dict[str, list[tuple[str, ...]]] = self.__buckets__[facet]
+
+        for sort, key in keys.items():
+            del bucket[sort][bisect.bisect_left(bucket[sort], key)]
+
+        if len(bucket['name']) == 0:
+            del self.__buckets__[facet]
+
+    def update(self, name: str, item: typing.Any) -> None:
+        facet: tuple[bool, int] = MyCatalogOrder.facet(item)
+        keys: dict[str, tuple[str, ...]] = {sort: MyCatalogOrder.sort_key(sort, name, item) for sort in MyCatalogOrder.SORT_KEYS}
+
+        if self.__entries__.get(name) == (facet, keys):
+            return
+
+        self.remove(name)
+        self.__entries__[name] = (facet, keys)
+        bucket: dict[str, list[tuple[str, ...]]] = self.__buckets__.setdefault(facet, {sort: [] for sort in MyCatalogOrder.SORT_KEYS})
+
+        for sort, key in keys.items():
+            bisect.insort(bucket[sort], key)
+
+    def scan(self, sort: str = 'name', descending: bool = False, visible: bool | None = None, item_type: int | None = None, prefix: str | None = None, after: tuple[str, ...] | None = None) -> typing.Iterator[str]:
+        assert sort in MyCatalogOrder.SORT_KEYS, 'Invalid sort key'
+        prefix = None if prefix is None or len(prefix) == 0 else prefix if sort == 'name' else prefix.casefold()
+        lists: list[typing.Iterator[tuple[str, ...]]] = [self.__scan__(keys, prefix, after, descending) for keys in self.__matching__(sort, visible, item_type)]
+        return (key[-1] for key in heapq.merge(*lists, reverse=descending))
+
+    def position(self, sort: str = 'name', descending: bool = False, visible: bool | None = None, item_type: int | None = None, prefix: str | None = None, after: tuple[str, ...] | None = None) -> tuple[int, int]:
+        assert sort in MyCatalogOrder.SORT_KEYS, 'Invalid sort key'
+        prefix = None if prefix is None or len(prefix) == 0 else prefix if sort == 'name' else prefix.casefold()
+        offset: int = 0
+        total: int = 0
+
+        for keys in self.__matching__(sort, visible, item_type):
+            start, end = self.__bounds__(keys, prefix, None, descending)
+            remaining_start, remaining_end = self.__bounds__(keys, prefix, after, descending)
+            total += end - start
+            offset += (end - start) - (remaining_end - remaining_start)
+
+        return offset, total
+
+
+class MyChangeFeed:
+    TICK: float = 0.25
+
+    @staticmethod
+    def merge(pending: dict[tuple[str, ...], set[str] | None], key: tuple[str, ...], fields: tuple[str, ...]) -> None:
+        if len(fields) == 0:
+            pending[key] = None
+        elif key not in pending:
+            pending[key] = set(fields)
+        elif pending[key] is not None:
+            pending[key].update(fields)
+
+    def __init__(self):
+        self.__pending__: dict[tuple[str, ...], set[str] | None] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+        self.__active__: bool = False
+        self.__reset__: bool = False
+        self.__public__: dict[tuple[str, ...], bool] = {}
+        self.__version__: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__pending__)
+
+    def record(self, key: tuple[str, ...], fields: tuple[str, ...]) -> None:
+        if self.__active__:
+            with self.__lock__:
+                MyChangeFeed.merge(self.__pending__, key, fields)
+
+    def witness(self, key: tuple[str, ...], public: bool) -> None:
+        if self.__active__:
+            with self.__lock__:
+                self.__public__.setdefault(key, bool(public))
+
+    def witnessed(self, key: tuple[str, ...]) -> bool | None:
+        return self.__public__.get(key)
+
+    def invalidate(self) -> None:
+        if self.__active__:
+            with self.__lock__:
+                self.__pending__.clear()
+                self.__public__.clear()
+                self.__reset__ = True
+
+    def drain(self) -> tuple[dict[tuple[str, ...], set[str] | None], bool, dict[tuple[str, ...], bool]]:
+        with self.__lock__:
+            pending: dict[tuple[str, ...], set[str] | None] = self.__pending__
+            reset: bool = self.__reset__
+            public: dict[tuple[str, ...], bool] = self.__public__
+            self.__pending__ = {}
+            self.__reset__ = False
+            self.__public__ = {}
+            return pending, reset, public
+
+    @property
+    def active(self) -> bool:
+        return self.__active__
+
+    @active.setter
+    def active(self, active: bool) -> None:
+        with self.__lock__:
+            self.__active__ = bool(active)
+            self.__reset__ = False
+            self.__pending__.clear()
+            self.__public__.clear()
+
+    @property
+    def version(self) -> int:
+        return self.__version__
+
+    @version.setter
+    def version(self, version: int) -> None:
+        self.__version__ = int(version)
+
+
+class MyJsonStream:
+    CHUNK_SIZE: int = 65536
+
+    @staticmethod
+    def chunks(fragments: typing.Iterable[str], chunk_size: int = CHUNK_SIZE) -> typing.Iterator[str]:
+        buffer: list[str] = []
+        size: int = 0
+
+        for fragment in fragments:
+            buffer.append(fragment)
+            size += len(fragment)
+
+            if size >= chunk_size:
+                yield ''.join(buffer)
+                buffer.clear()
+                size = 0
+
+        if len(buffer) > 0:
+            yield ''.join(buffer)
+
+    @staticmethod
+    def wrap(fragments: typing.Iterable[str], key: str, **fields: typing.Any) -> typing.Iterator[str]:
+        yield '{'
+
+        for name, value in fields.items():
+            yield f'{JsonCodec.dumps(name)}: {JsonCodec.dumps(value)}, '
+
+        yield f'{JsonCodec.dumps(key)}: '
+        yield from fragments
+        yield '}'
+
+
+class MyCatalogPayload:
+    def __init__(self, version: int, body: bytes):
+        self.__version__: int = int(version)
+        self.__body__: bytes = bytes(body)
+        self.__compressed_body__: bytes = gzip.compress(self.__body__, 9)
+        self.__etag__: str = f'{self.__version__:x}-{hashlib.sha256(self.__body__).hexdigest()[:32]}'
+
+    @property
+    def version(self) -> int:
+        return self.__version__
+
+    @property
+    def body(self) -> bytes:
+        return self.__body__
+
+    @property
+    def compressed_body(self) -> bytes:
+        return self.__compressed_body__
+
+    @property
+    def etag(self) -> str:
+        return self.__etag__
+
+
+class MyNdjsonCodec:
+    BATCH_SIZE: int = 1000
+    FIELDS: dict[str, dict[str, tuple[type, ...]]] = {
+        'game': {'name': (str,), 'display-name': (str,), 'game-url': (str, type(None)), 'icon-image': (int, type(None)), 'background-image': (int, type(None)), 'visible': (bool,)},
+        'section': {'game': (str,), 'name': (str,), 'display-name': (str,), 'background-image': (int, type(None)), 'visible': (bool,)},
+        'child': {'game': (str,), 'section': (str,), 'name': (str,), 'display-name': (str,), 'url': (str, type(None)), 'icon-image': (int, type(None)), 'visible': (bool,)},
+        'program': {'name': (str,), 'display-name': (str,), 'url': (str, type(None)), 'icon-image': (int, type(None)), 'width': (int,), 'height': (int,), 'program-type': (int,), 'visible': (bool,)},
+        'contact': {'name': (str,), 'display-name': (str,), 'content': (str, type(None)), 'contact-type': (int,), 'icon-image': (int, type(None)), 'visible': (bool,)}
+    }
+    DEFAULTS: dict[str, typing.Any] = {'game-url': None, 'url': None, 'content': None, 'icon-image': None, 'background-image': None, 'visible': False, 'width': 1, 'height': 1, 'program-type': 0, 'contact-type': 0}
+
+    @staticmethod
+    def __image__(image_id: int | str | None) -> int | None:
+        return None if image_id is None else int(image_id)
+
+    @classmethod
+    def item_records(cls, category: str, name: str, data: dict[str, typing.Any]) -> typing.Iterator[dict[str, typing.Any]]:
+        if category != 'game':
+            yield {'type': category, 'name': name, **data, 'icon-image': cls.__image__(data['icon-image'])}
+            return
+
+        sections: dict[str, dict] = data['sections']
+        yield {'type': 'game', 'name': name, 'visible': data['visible'], 'display-name': data['display-name'], 'game-url': data['game-url'], 'icon-image': cls.__image__(data['icon-image']), 'background-image': cls.__image__(data['background-image'])}
+
+        for section_name, section in sections.items():
+            yield {'type': 'section', 'game': name, 'name': section_name, 'display-name': section['display-name'], 'background-image': cls.__image__(section['background_image']), 'visible': section['visible']}
+
+            for child_name, child in section['children'].items():
+                yield {'type': 'child', 'game': name, 'section': section_name, 'name': child_name, **child, 'icon-image': cls.__image__(child['icon-image'])}
+
+    @staticmethod
+    def record_images(record: dict[str, typing.Any]) -> tuple[tuple[str, int], ...]:
+        return tuple((container, record[field]) for field, container in (('icon-image', 'icons'), ('background-image', 'backgrounds')) if record.get(field) is not None)
+
+    @classmethod
+    def records(cls, storage: MyGlobalServerStorage) -> typing.Iterator[dict[str, typing.Any]]:
+        for category, name, data in storage.iter_saved():
+            yield from cls.item_records(category, name, data)
+
+    @classmethod
+    def export(cls, storage: MyGlobalServerStorage) -> typing.Iterator[str]:
+        for record in cls.records(storage):
+            yield f'{JsonCodec.dumps(record)}\n'
+
+    @classmethod
+    def parse(cls, lines: typing.Iterable[str | bytes], validate: bool = True) -> typing.Iterator[tuple[int, dict[str, typing.Any]]]:
+        game: str | None = None
+        section: str | None = None
+        sections: set[str] = set()
+        children: set[str] = set()
+
+        for line_number, line in enumerate(lines, 1):
+            try:
+                text: str = line.decode() if isinstance(line, bytes) else line
+
+                if len(text.strip()) == 0:
+                    continue
+
+                record: typing.Any = JsonCodec.loads(text)
+            except UnicodeDecodeError:
+                raise AssertionError(f'Line {line_number}: Invalid UTF-8') from None
+            except ValueError:
+                raise AssertionError(f'Line {line_number}: Malformed JSON') from None
+
+            if not validate:
+                for field in cls.FIELDS[record['type']]:
+                    if field not in record:
+                        record[field] = cls.DEFAULTS[field]
+
+                yield line_number, record
+                continue
+
+            assert isinstance(record, dict) and record.get('type') in cls.FIELDS, f'Line {line_number}: Invalid record type'
+            kind: str = record['type']
+            fields: dict[str, tuple[type, ...]] = cls.FIELDS[kind]
+            unknown: set[str] = record.keys() - fields.keys() - {'type'}
+            assert len(unknown) == 0, f'Line {line_number}: Unknown field(s): {", ".join(sorted(unknown))}'
+
+            for field, types in fields.items():
+                if field not in record:
+                    assert field in cls.DEFAULTS, f'Line {line_number}: Missing field \'{field}\''
+                    record[field] = cls.DEFAULTS[field]
+
+                value: typing.Any = record[field]
+                assert isinstance(value, types) and isinstance(value, bool) == (bool in types), f'Line {line_number}: Type error in \'{field}\''
+
+            assert len(record['name']) > 0, f'Line {line_number}: Empty name'
+            assert all(record[field] is None or record[field] >= 0 for field in ('icon-image', 'background-image') if field in record), f'Line {line_number}: Invalid image ID'
+
+            if kind == 'game':
+                game, section = record['name'], None
+                sections.clear()
+            elif kind == 'section':
+                assert record['game'] == game, f'Line {line_number}: Section does not follow its game'
+                assert record['name'] not in sections, f'Line {line_number}: Duplicate section \'{record["name"]}\''
+                section = record['name']
+                sections.add(section)
+                children.clear()
+            elif kind == 'child':
+                assert record['game'] == game and record['section'] == section, f'Line {line_number}: Child does not follow its section'
+                assert record['name'] not in children, f'Line {line_number}: Duplicate child \'{record["name"]}\''
+                children.add(record['name'])
+            else:
+                game = section = None
+                assert kind != 'program' or (record['width'] > 0 and record['height'] > 0), f'Line {line_number}: Invalid dimensions'
+                assert record.get('program-type', 0) in tuple(Util.ProgramType) and record.get('contact-type', 0) in tuple(Util.ContactType), f'Line {line_number}: Invalid type'
+
+            yield line_number, record
+
+    @classmethod
+    def build(cls, records: typing.Iterable[tuple[int, dict[str, typing.Any]]]) -> typing.Iterator[tuple[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo]]:
+        game: MyGameStorageInfo | None = None
+        section: MyGameStorageInfo.MyGameSectionInfo | None = None
+
+        for _, record in records:
+            kind: str = record['type']
+
+            if kind == 'section':
+                section = game.__children__[record['name']] = MyGameStorageInfo.MyGameSectionInfo(game, record['name'], record['display-name'], record['background-image'], record['visible'])
+                continue
+            elif kind == 'child':
+                section.__children__[record['name']] = MyGameStorageInfo.MyGameObjectInfo(section, record['name'], record['display-name'], record['url'], record['icon-image'], record['visible'])
+                continue
+            elif game is not None:
+                yield 'game', game
+                game = None
+
+            if kind == 'game':
+                game = MyGameStorageInfo(record['name'], record['display-name'], record['game-url'] or '', record['icon-image'], record['background-image'], record['visible'])
+            elif kind == 'program':
+                yield 'program', MyProgramStorageInfo(record['name'], record['display-name'], record['url'], record['icon-image'], record['visible'], record['width'], record['height'], Util.ProgramType(record['program-type']))
+            else:
+                yield 'contact', MyContactStorageInfo(record['name'], record['display-name'], record['content'], Util.ContactType(record['contact-type']), record['icon-image'], record['visible'])
+
+        if game is not None:
+            yield 'game', game
+
+
+class MyBinarySnapshot:
+    MAGIC: bytes = b'ISSB'
+    FORMAT_VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<4sHI')
+    LENGTH: struct.Struct = struct.Struct('<I')
+    GAME: struct.Struct = struct.Struct('<IIIIIBI')
+    SECTION: struct.Struct = struct.Struct('<IIIBI')
+    CHILD: struct.Struct = struct.Struct('<IIIIB')
+    PROGRAM: struct.Struct = struct.Struct('<IIIIBIIB')
+    CONTACT: struct.Struct = struct.Struct('<IIIBIB')
+
+    @classmethod
+    def encode(cls, data: dict[str, dict[str, dict]]) -> bytes:
+        strings: dict[str, int] = {}
+        body: list[bytes] = []
+
+        def intern(value: str | int | None) -> int:
+            if value is None:
+                return 0
+
+            value = str(value)
+            index: int | None = strings.get(value)
+
+            if index is None:
+                index = strings[value] = len(strings) + 1
+
+            return index
+
+        def append(records: list[bytes]) -> None:
+            body.append(cls.LENGTH.pack(len(records)))
+
+            for record in records:
+                body.append(cls.LENGTH.pack(len(record)))
+                body.append(record)
+
+        games: list[bytes] = []
+
+        for game_name, game in data['game-storage'].items():
+            parts: list[bytes] = [cls.GAME.pack(intern(game_name), intern(game['display-name']), intern(game['game-url']), intern(game['icon-image']), intern(game['background-image']), game['visible'], len(game['sections']))]
+
+            for section_name, section in game['sections'].items():
+                parts.append(cls.SECTION.pack(intern(section_name), intern(section['display-name']), intern(section['background_image']), section['visible'], len(section['children'])))
+                parts.extend(cls.CHILD.pack(intern(child_name), intern(child['display-name']), intern(child['url']), intern(child['icon-image']), child['visible']) for child_name, child in section['children'].items())
+
+            games.append(b''.join(parts))
+
+        append(games)
+        append([cls.PROGRAM.pack(intern(name), intern(program['display-name']), intern(program['url']), intern(program['icon-image']), program['visible'], program['width'], program['height'], program['program-type']) for name, program in data['program-storage'].items()])
+        append([cls.CONTACT.pack(intern(name), intern(contact['display-name']), intern(contact['content']), contact['contact-type'], intern(contact['icon-image']), contact['visible']) for name, contact in data['contact-storage'].items()])
+        blob: bytes = ''.join(strings).encode('utf-8')
+        header: bytes = cls.HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION, len(strings)) + struct.pack(f'<{len(strings)}I', *(len(string) for string in strings)) + cls.LENGTH.pack(len(blob))
+        return b''.join((header, blob, *body))
+
+    class MyStringTable:
+        __slots__: tuple[str, ...] = ('__text__', '__offsets__')
+
+        def __init__(self, text: str, lengths: typing.Iterable[int]):
+            self.__text__: str = text
+            self.__offsets__: array.array = array.array('Q', (0, *itertools.accumulate(lengths)))
+
+        def __getitem__(self, index: int) -> str | None:
+            return None if index == 0 else self.__text__[self.__offsets__[index - 1]:self.__offsets__[index]]
+
+        def to_list(self) -> list[str | None]:
+            return [None, *(self.__text__[start:end] for start, end in zip(self.__offsets__, self.__offsets__[1:]))]
+
+    @classmethod
+    def __strings__(cls, view: memoryview) -> tuple[MyBinarySnapshot.MyStringTable, int]:
+        magic, version, count = cls.HEADER.unpack_from(view, 0)
+        assert magic == cls.MAGIC and version == cls.FORMAT_VERSION, 'Invalid storage snapshot'
+        offset: int = cls.HEADER.size
+        lengths: tuple[int, ...] = struct.unpack_from(f'<{count}I', view, offset)
+        offset += 4 * count
+        blob_length: int = cls.LENGTH.unpack_from(view, offset)[0]
+        offset += cls.LENGTH.size
+        text: str = bytes(view[offset:offset + blob_length]).decode('utf-8')
+        return MyBinarySnapshot.MyStringTable(text, lengths), offset + blob_length
+
+    @classmethod
+    def decode_sections(cls, strings: MyBinarySnapshot.MyStringTable | list[str | None], view: memoryview, offset: int, sections: int, game: MyGameStorageInfo) -> dict[str, MyGameStorageInfo.MyGameSectionInfo]:
+        children: dict[str, MyGameStorageInfo.MyGameSectionInfo] = {}
+
+        for _ in range(sections):
+            name, display_name, background_image, visible, count = cls.SECTION.unpack_from(view, offset)
+            section: MyGameStorageInfo.MyGameSectionInfo = MyGameStorageInfo.MyGameSectionInfo(game, strings[name], strings[display_name], strings[background_image], visible)
+            offset += cls.SECTION.size
+            children[section.section_name] = section
+
+            for name, display_name, url, icon_image, visible in cls.CHILD.iter_unpack(view[offset:offset + count * cls.CHILD.size]):
+                section.__children__[strings[name]] = MyGameStorageInfo.MyGameObjectInfo(section, strings[name], strings[display_name], strings[url], strings[icon_image], visible)
+
+            offset += count * cls.CHILD.size
+
+        return children
+
+    @classmethod
+    def decode(cls, storage: MyGlobalServerStorage, buffer: bytes, lazy: bool = False) -> None:
+        view: memoryview = memoryview(buffer)
+        table, offset = cls.__strings__(view)
+        strings: MyBinarySnapshot.MyStringTable | list[str | None] = table if lazy else table.to_list()
+
+        if lazy:
+            view, offset = memoryview(view[offset:].tobytes()), 0
+
+        for category in ('game', 'program', 'contact'):
+            records: int = cls.LENGTH.unpack_from(view, offset)[0]
+            offset += cls.LENGTH.size
+
+            for _ in range(records):
+                end: int = offset + cls.LENGTH.unpack_from(view, offset)[0] + cls.LENGTH.size
+                offset += cls.LENGTH.size
+
+                if category == 'game':
+                    name, display_name, url, icon_image, background_image, visible, sections = cls.GAME.unpack_from(view, offset)
+                    loader: typing.Callable[[MyGameStorageInfo], dict[str, MyGameStorageInfo.MyGameSectionInfo]] = functools.partial(cls.decode_sections, strings, view, offset + cls.GAME.size, sections)
+                    game: MyGameStorageInfo = MyGameStorageInfo(strings[name], strings[display_name], strings[url] or '', strings[icon_image], strings[background_image], visible, loader=loader)
+
+                    if not lazy:
+                        game.__children__ = loader(game)
+                        game.__loader__ = None
+
+                    storage.__game_info__[game.name] = game
+                elif category == 'program':
+                    name, display_name, url, icon_image, visible, width, height, program_type = cls.PROGRAM.unpack_from(view, offset)
+                    storage.__program_info__[strings[name]] = MyProgramStorageInfo(strings[name], strings[display_name], strings[url], strings[icon_image], visible, width, height, Util.ProgramType(program_type))
+                else:
+                    name, display_name, content, contact_type, icon_image, visible = cls.CONTACT.unpack_from(view, offset)
+                    storage.__contact_info__[strings[name]] = MyContactStorageInfo(strings[name], strings[display_name], strings[content], Util.ContactType(contact_type), strings[icon_image], visible)
+
+                offset = end
+
+    @classmethod
+    def rebind(cls, storage: MyGlobalServerStorage, buffer: bytes) -> int:
+        view: memoryview = memoryview(buffer)
+        strings, offset = cls.__strings__(view)
+        view = memoryview(view[offset:].tobytes())
+        records: int = cls.LENGTH.unpack_from(view, 0)[0]
+        offset = cls.LENGTH.size
+        rebound: int = 0
+
+        for _ in range(records):
+            end: int = offset + cls.LENGTH.unpack_from(view, offset)[0] + cls.LENGTH.size
+            offset += cls.LENGTH.size
+            name, *_, sections = cls.GAME.unpack_from(view, offset)
+            game: MyGameStorageInfo | None = storage.__game_info__.get(strings[name])
+
+            if game is not None:
+                game.__loader__ = functools.partial(cls.decode_sections, strings, view, offset + cls.GAME.size, sections)
+                rebound += 1
+
+            offset = end
+
+        return rebound
+
+
 class MyGlobalServerStorage:
     STORAGE: MyGlobalServerStorage = None
+    CHANGE_LOG_SIZE: int = 4096
 
     @classmethod
-    def load(cls, path: str) -> MyGlobalServerStorage:
+    def load(cls, path: str, lazy: bool = False) -> MyGlobalServerStorage:
         file: FileSystem.File = FileSystem.File(path)
         storage: MyGlobalServerStorage = cls()
 
         if not file.exists():
             return storage
+        elif file.extension == 'bin':
+            try:
+                with file.open('rb') as f:
+                    MyBinarySnapshot.decode(storage, f.read(), lazy)
+            except Exception as err:
+                raise IOError('Failed to load server data') from err
+
+            storage.__lazy__ = bool(lazy)
+            storage.__loaded__()
+            return storage
 
         try:
             with file.open('r') as f:
-                data: dict = json.load(f)
+                data: dict = JsonCodec.load(f)
 
             for game_name, game in data['game-storage'].items():
                 game_item: MyGameStorageInfo = MyGameStorageInfo(game_name, game['display-name'], game['game-url'], game['icon-image'], game['background-image'], game['visible'] if 'visible' in game else True)
@@ -524,6 +1473,7 @@ class MyGlobalServerStorage:
         except Exception as err:
             raise IOError('Failed to load server data') from err
 
+        storage.__loaded__()
         return storage
 
     def __new__(cls, *args, **kwargs) -> MyGlobalServerStorage:
@@ -537,87 +1487,1087 @@ class MyGlobalServerStorage:
         self.__program_info__: dict[str, MyProgramStorageInfo] = {}
         self.__contact_info__: dict[str, MyContactStorageInfo] = {}
         self.__images__: Image.MyImageLoader = Image.MyImageLoader('Data/images')
+        self.__version__: int = time.time_ns() // 1000
+        self.__public_payload__: MyCatalogPayload | None = None
+        self.__delta_payloads__: dict[int, MyCatalogPayload] = {}
+        self.__change_log__: collections.deque[tuple[int, str, str]] = collections.deque(maxlen=MyGlobalServerStorage.CHANGE_LOG_SIZE)
+        self.__change_floor__: int = self.__version__
+        self.__created__: dict[tuple[str, str], int] = {}
+        self.__generations__: dict[str, int] = {'game': 0, 'program': 0, 'contact': 0}
+        self.__saved_generations__: dict[str, int] = {}
+        self.__saved_fragments__: dict[str, str] = {}
+        self.__lock__: Util.ReadWriteLock = Util.ReadWriteLock()
+        self.__save_lock__: threading.Lock = threading.Lock()
+        self.__subtree_lock__: threading.Lock = threading.Lock()
+        self.__image_index__: MyImageReferenceIndex = MyImageReferenceIndex()
+        self.__search_index__: Search.MySearchIndex = Search.MySearchIndex()
+        self.__search_pending__: set[MyGameStorageInfo] = set()
+        self.__search_lock__: threading.Lock = threading.Lock()
+        self.__orders__: dict[str, MyCatalogOrder] = {'game': MyCatalogOrder(), 'program': MyCatalogOrder(), 'contact': MyCatalogOrder()}
+        self.__pending_marks__: dict[tuple[str, ...], set[str] | None] | None = None
+        self.__change_feed__: MyChangeFeed = MyChangeFeed()
+        self.__lazy__: bool = False
+        self.__published_version__: int | None = None
+        self.__images__.MyIconStorage.track_references(functools.partial(self.__image_referenced__, 'icons'))
+        self.__images__.MyBackgroundStorage.track_references(functools.partial(self.__image_referenced__, 'backgrounds'))
+
+    def __loaded__(self) -> None:
+        self.__saved_generations__ = self.__generations__.copy()
+        self.__change_log__.clear()
+        self.__change_floor__ = self.__version__
+        self.__created__.clear()
+        self.reindex_images()
+        self.reindex_search()
+        self.reindex_orders()
+
+    def __index_section__(self, game_name: str, section: MyGameStorageInfo.MyGameSectionInfo) -> None:
+        self.__search_index__.add(('game', game_name, section.section_name), *section.__search_terms__())
+
+        for child in section.__children__.values():
+            self.__search_index__.add(('game', game_name, section.section_name, child.name), *child.__search_terms__())
+
+    def __index_game__(self, game: MyGameStorageInfo) -> None:
+        self.__search_index__.add(('game', game.name), *game.__search_terms__())
+
+        if not game.loaded:
+            self.__search_pending__.add(game)
+            return
+
+        for section in game.__children__.values():
+            self.__index_section__(game.name, section)
+
+    def __update_search__(self, category: str, name: str, *path: str) -> None:
+        key: tuple[str, ...] = (category, name, *path)
+
+        if category != 'game':
+            item: MyProgramStorageInfo | MyContactStorageInfo | None = (self.__program_info__ if category == 'program' else self.__contact_info__).get(name)
+
+            if item is None:
+                self.__search_index__.remove(key)
+            else:
+                self.__search_index__.add(key, *item.__search_terms__())
+
+            return
+
+        game: MyGameStorageInfo | None = self.__game_info__.get(name)
+
+        if game is None:
+            self.__search_index__.remove(key[:2])
+            return
+        elif len(path) == 0:
+            if key in self.__search_index__:
+                self.__search_index__.add(key, *game.__search_terms__())
+            else:
+                self.__index_game__(game)
+
+            return
+        elif not game.loaded:
+            return
+
+        section: MyGameStorageInfo.MyGameSectionInfo | None = game.__children__.get(path[0])
+        child: MyGameStorageInfo.MyGameObjectInfo | None = None if section is None or len(path) < 2 else section.get_child(path[1])
+
+        if section is None:
+            self.__search_index__.remove(key[:3])
+        elif len(path) == 1 and key in self.__search_index__:
+            self.__search_index__.add(key, *section.__search_terms__())
+        elif len(path) == 1:
+            self.__index_section__(name, section)
+        elif child is None:
+            self.__search_index__.remove(key)
+        else:
+            self.__search_index__.add(key, *child.__search_terms__())
+
+    def __resolve_search__(self) -> None:
+        with self.__search_lock__:
+            for game in self.__search_pending__:
+                if self.__game_info__.get(game.name) is game:
+                    for section in game.__sections__().values():
+                        self.__index_section__(game.name, section)
+
+            self.__search_pending__.clear()
+
+    def __search_chain__(self, key: tuple[str, ...]) -> list[typing.Any]:
+        category, name, *path = key
+        item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}[category].get(name)
+        chain: list[typing.Any] = [item]
+
+        if item is not None and len(path) > 0:
+            chain.append(item.get_section(path[0]))
 
-    def save(self, path: str) -> None:
+        if chain[-1] is not None and len(path) > 1:
+            chain.append(chain[-1].get_child(path[1]))
+
+        return chain
+
+    def __snapshot__(self, reuse_fragments: bool) -> tuple[dict[str, int], dict[str, dict | str]]:
+        with self.__lock__.reader():
+            generations: dict[str, int] = self.__generations__.copy()
+            snapshot: dict[str, dict | str] = {}
+
+            for category, items in (('game', self.__game_info__), ('program', self.__program_info__), ('contact', self.__contact_info__)):
+                if reuse_fragments and category in self.__saved_fragments__ and self.__saved_generations__.get(category) == generations[category]:
+                    snapshot[category] = self.__saved_fragments__[category]
+                else:
+                    snapshot[category] = {child.name: child.save() for child in items.values()}
+
+            return generations, snapshot
+
+    def save(self, path: str, force: bool = False) -> bool:
         file: FileSystem.File = FileSystem.File(path)
+        temp: FileSystem.File = FileSystem.File(f'{path}.tmp')
 
-        try:
-            with file.open('w') as f:
-                f.write(json.dumps({
-                    'game-storage': {child.name: child.save() for child in self.__game_info__.values()},
-                    'program-storage': {child.name: child.save() for child in self.__program_info__.values()},
-                    'contact-storage': {child.name: child.save() for child in self.__contact_info__.values()},
-                }, indent=4))
-        except Exception as err:
-            raise IOError('Failed to save server data') from err
+        with self.__save_lock__:
+            if not force and not self.modified and file.exists():
+                return False
+
+            binary: bool = file.extension == 'bin'
+            generations, snapshot = self.__snapshot__(not binary)
+
+            try:
+                if binary:
+                    fragments: dict[str, str] = {}
+                    buffer: bytes = MyBinarySnapshot.encode({'game-storage': snapshot['game'], 'program-storage': snapshot['program'], 'contact-storage': snapshot['contact']})
+
+                    with open(temp.filepath, 'wb') as f:
+                        f.write(buffer)
+                        f.flush()
+                        os.fsync(f.fileno())
+                else:
+                    fragments: dict[str, str] = {category: data if isinstance(data, str) else JsonCodec.dumps(data, 4).replace('\n', '\n    ') for category, data in snapshot.items()}
+                    games, programs, contacts = fragments['game'], fragments['program'], fragments['contact']
+
+                    with open(temp.filepath, 'w') as f:
+                        f.write(f'{{\n    "game-storage": {games},\n    "program-storage": {programs},\n    "contact-storage": {contacts}\n}}')
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                os.replace(temp.filepath, file.filepath)
+                self.__saved_fragments__ = fragments
+                self.__saved_generations__ = generations
+
+                if binary and self.__lazy__:
+                    with self.__lock__.writer():
+                        if self.__generations__['game'] == generations['game']:
+                            MyBinarySnapshot.rebind(self, buffer)
+
+                return True
+            except Exception as err:
+                if temp.exists():
+                    os.remove(temp.filepath)
+
+                raise IOError('Failed to save server data') from err
 
     def send_dict(self, visible_only: bool = True) -> dict:
-        return {
-            'game-storage': {child.name: child.send_dict(visible_only) for child in self.__game_info__.values() if not visible_only or child.visible},
-            'program-storage': {child.name: child.send_dict() for child in self.__program_info__.values() if not visible_only or child.visible},
-            'contact-storage': {child.name: child.send_dict() for child in self.__contact_info__.values() if not visible_only or child.visible}
-        }
+        with self.__lock__.reader():
+            return {f'{category}-storage': self.send_category(category, visible_only) for category in ('game', 'program', 'contact')}
+
+    def iter_category_json(self, category: str, visible_only: bool = True) -> typing.Iterator[str]:
+        with self.__lock__.reader():
+            items: dict[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}[category]
+            names: tuple[str, ...] = tuple(items.keys())
+
+        yield '{'
+        separator: str = ''
+
+        for name in names:
+            with self.__lock__.reader():
+                item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = items.get(name)
+
+                if item is None or (visible_only and not item.visible):
+                    continue
+
+                fragments: tuple[str, ...] = tuple(item.iter_json(visible_only)) if category == 'game' else (JsonCodec.dumps(item.send_dict()),)
+
+            yield f'{separator}{JsonCodec.dumps(name)}: '
+            yield from fragments
+            separator = ', '
+
+        yield '}'
+
+    def iter_json(self, visible_only: bool = True) -> typing.Iterator[str]:
+        for index, category in enumerate(('game', 'program', 'contact')):
+            yield f'{", " if index else "{"}"{category}-storage": '
+            yield from self.iter_category_json(category, visible_only)
+
+        yield '}'
+
+    def send_category(self, category: str, visible_only: bool = True) -> dict:
+        with self.__lock__.reader():
+            if category == 'game':
+                return {child.name: child.send_dict(visible_only) for child in self.__game_info__.values() if not visible_only or child.visible}
+
+            items: dict[str, MyProgramStorageInfo | MyContactStorageInfo] = {'program': self.__program_info__, 'contact': self.__contact_info__}[category]
+            return {child.name: child.send_dict() for child in items.values() if not visible_only or child.visible}
+
+    def public_payload(self) -> MyCatalogPayload:
+        payload: MyCatalogPayload | None = self.__public_payload__
+
+        if payload is not None and payload.version == self.__version__:
+            return payload
+        elif not self.__lock__.acquire_reader(payload is None):
+            return payload
+
+        try:
+            version: int = self.__version__
+            data: dict = self.send_dict()
+        finally:
+            self.__lock__.release_reader()
+
+        payload = MyCatalogPayload(version, JsonCodec.dumpb(data))
+
+        if self.__public_payload__ is None or self.__public_payload__.version < version:
+            self.__public_payload__ = payload
+
+        return payload
+
+    def public_delta(self, since: int) -> MyCatalogPayload | None:
+        since = int(since)
+        payload: MyCatalogPayload | None = self.__delta_payloads__.get(since)
+
+        if payload is not None and payload.version == self.__version__:
+            return payload
+
+        with self.__lock__.reader():
+            version: int = self.__version__
+
+            if since > version or since < self.__change_floor__:
+                return None
+
+            names: dict[str, set[str]] = {'game': set(), 'program': set(), 'contact': set()}
+
+            for entry_version, category, name in reversed(self.__change_log__):
+                if entry_version <= since:
+                    break
+
+                names[category].add(name)
+
+            data: dict[str, typing.Any] = {'version': version, 'since': since, 'added': {}, 'changed': {}, 'removed': {}}
+
+            for category, items in (('game', self.__game_info__), ('program', self.__program_info__), ('contact', self.__contact_info__)):
+                added: dict[str, dict] = data['added'].setdefault(f'{category}-storage', {})
+                changed: dict[str, dict] = data['changed'].setdefault(f'{category}-storage', {})
+                removed: list[str] = data['removed'].setdefault(f'{category}-storage', [])
+
+                for name in sorted(names[category]):
+                    item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = items.get(name)
+
+                    if item is None or not item.visible:
+                        removed.append(name)
+                    elif self.__created__.get((category, name), self.__change_floor__) > since:
+                        added[name] = item.send_dict()
+                    else:
+                        changed[name] = item.send_dict()
+
+        payload = MyCatalogPayload(version, JsonCodec.dumpb(data))
+
+        if len(self.__delta_payloads__) >= 64 or any(cached.version != version for cached in self.__delta_payloads__.values()):
+            self.__delta_payloads__ = {}
+
+        self.__delta_payloads__[since] = payload
+        return payload
+
+    def drain_changes(self) -> dict[str, typing.Any] | None:
+        def event(kind: str, key: tuple[str, ...], body: dict | None = None) -> dict[str, typing.Any]:
+            data: dict[str, typing.Any] = {'type': kind, 'category': key[0], 'path': list(key[1:])}
+
+            if kind == 'added':
+                data['data'] = body
+            elif kind == 'updated':
+                data['fields'] = body
+
+            return data
+
+        def send(item: typing.Any, visible_only: bool) -> dict:
+            return item.send_dict(visible_only) if isinstance(item, (MyGameStorageInfo, MyGameStorageInfo.MyGameSectionInfo)) else item.send_dict()
+
+        with self.__lock__.reader():
+            pending, reset, public = self.__change_feed__.drain()
+
+            if len(pending) == 0 and not reset:
+                return None
+
+            changes: dict[str, typing.Any] = {'since': self.__change_feed__.version, 'version': self.__version__, 'reset': reset, 'admin': [], 'public': []}
+            self.__change_feed__.version = self.__version__
+
+            if reset:
+                changes['since'] = self.__version__
+                return changes
+
+            for key in sorted(pending, key=len):
+                fields: set[str] | None = pending[key]
+                chain: list[typing.Any] = self.__search_chain__(key)
+                item: typing.Any = chain[-1]
+                visible: bool = all(link is not None and link.visible for link in chain)
+                was_public: bool = public.get(key, fields is not None and visible)
+
+                if item is None:
+                    changes['admin'].append(event('removed', key))
+
+                    if was_public:
+                        changes['public'].append(event('removed', key))
+
+                    continue
+                elif fields is None:
+                    changes['admin'].append(event('added', key, send(item, False)))
+                else:
+                    values: dict = item.send_fields() if isinstance(item, (MyGameStorageInfo, MyGameStorageInfo.MyGameSectionInfo)) else item.send_dict()
+                    changes['admin'].append(event('updated', key, {field: values[field] for field in sorted(fields) if field in values}))
+
+                if fields is None or 'visible' in fields:
+                    if visible:
+                        changes['public'].append(event('added', key, send(item, True)))
+                    elif was_public:
+                        changes['public'].append(event('removed', key))
+                elif visible:
+                    changes['public'].append(changes['admin'][-1])
+
+            return changes
+
+    def iter_saved(self) -> typing.Iterator[tuple[str, str, dict]]:
+        for category in ('game', 'program', 'contact'):
+            with self.__lock__.reader():
+                items: dict[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}[category]
+                names: tuple[str, ...] = tuple(items.keys())
+
+            for name in names:
+                with self.__lock__.reader():
+                    item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = items.get(name)
+
+                    if item is None:
+                        continue
+
+                    data: dict[str, typing.Any] = item.save()
+
+                yield category, name, data
+
+    def publish_snapshot(self, directory: str, force: bool = False) -> bool:
+        version: int = self.__version__
+
+        if not force and version == self.__published_version__:
+            return False
+
+        try:
+            CatalogSnapshot.MyCatalogSnapshot.write(directory, version, self.iter_saved())
+        except OSError as err:
+            raise IOError('Failed to publish catalog snapshot') from err
+
+        self.__published_version__ = version
+        return True
+
+    def export_ndjson(self) -> typing.Iterator[str]:
+        return MyNdjsonCodec.export(self)
+
+    def import_ndjson(self, source: typing.IO, replace: bool = False, batch_size: int = MyNdjsonCodec.BATCH_SIZE, pause: typing.Callable[[], typing.Any] | None = None) -> dict[str, int]:
+        assert source.seekable(), 'Import source must be seekable'
+        assert isinstance(batch_size, int) and batch_size > 0, 'Invalid batch size'
+        counts: dict[str, int] = dict.fromkeys(MyNdjsonCodec.FIELDS, 0)
+
+        for index, (_, record) in enumerate(MyNdjsonCodec.parse(source), 1):
+            counts[record['type']] += 1
+
+            if pause is not None and index % batch_size == 0:
+                pause()
+
+        source.seek(0)
+        imported: dict[str, set[str]] = {'game': set(), 'program': set(), 'contact': set()}
+        stores: dict[str, dict] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}
+        items: typing.Iterator[tuple[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo]] = MyNdjsonCodec.build(MyNdjsonCodec.parse(source, False))
+
+        while len(batch := tuple(itertools.islice(items, batch_size))) > 0:
+            with self.__lock__.writer():
+                for category, item in batch:
+                    stores[category][item.name] = item
+                    imported[category].add(item.name)
+
+                    if category == 'game':
+                        self.__image_index__.add_game(item)
+                    else:
+                        self.__image_index__.add_entity(item)
+
+                self.__import_batch__(batch)
+
+            if pause is not None:
+                pause()
+
+        with self.__lock__.writer():
+            removed: list[tuple[str, str]] = []
+
+            if replace:
+                for category, store in stores.items():
+                    removed.extend((category, name) for name in store if name not in imported[category])
+
+                for category, name in removed:
+                    del stores[category][name]
+
+            self.__version__ += 1
+
+            for category in self.__generations__:
+                self.__generations__[category] += 1
+
+            self.__imported__(removed)
+
+            self.__change_log__.clear()
+            self.__change_floor__ = self.__version__
+            self.__created__.clear()
+            self.reindex_images()
+            self.reindex_search()
+            self.reindex_orders()
+            self.__change_feed__.invalidate()
+
+        counts['removed'] = len(removed)
+        return counts
+
+    def replicated_changes(self, since: int) -> tuple[int, tuple[tuple[str, str, dict | None], ...]] | None:
+        with self.__lock__.reader():
+            if since > self.__version__ or since < self.__change_floor__:
+                return None
+
+            names: dict[tuple[str, str], None] = {}
+
+            for entry_version, category, name in reversed(self.__change_log__):
+                if entry_version <= since:
+                    break
+
+                names[(category, name)] = None
+
+            stores: dict[str, dict] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}
+            return self.__version__, tuple((category, name, None if (item := stores[category].get(name)) is None else item.save()) for category, name in reversed(names))
+
+    def replace_item(self, category: str, name: str, item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None) -> None:
+        with self.__lock__.writer():
+            stores: dict[str, dict] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}
+            self.witness_public(category, name)
+            previous: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = stores[category].pop(name, None)
+
+            if previous is not None and category == 'game':
+                self.__image_index__.remove_game(previous)
+                self.__search_index__.remove(('game', name))
+            elif previous is not None:
+                self.__image_index__.remove_entity(previous)
+
+            if item is None:
+                self.__created__.pop((category, name), None)
+                self.mark_modified(category, name)
+                return
+
+            stores[category][name] = item
+
+            if category == 'game':
+                self.__image_index__.add_game(item)
+            else:
+                self.__image_index__.add_entity(item)
+
+            self.mark_modified(category, name)
+
+            if previous is None:
+                self.__created__[(category, name)] = self.__version__
+
+    def __import_batch__(self, batch: tuple[tuple[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo], ...]) -> None:
+        pass
+
+    def __imported__(self, removed: list[tuple[str, str]]) -> None:
+        pass
+
+    def reindex_search(self) -> None:
+        with self.__lock__.reader(), self.__search_lock__:
+            self.__search_index__.clear()
+            self.__search_pending__.clear()
+
+            for game in self.__game_info__.values():
+                self.__index_game__(game)
+
+            for category, items in (('program', self.__program_info__), ('contact', self.__contact_info__)):
+                for name, item in items.items():
+                    self.__search_index__.add((category, name), *item.__search_terms__())
+
+    def search(self, query: str, limit: int = 50, visible_only: bool = True) -> list[dict[str, typing.Any]]:
+        with self.__lock__.reader():
+            self.__resolve_search__()
+            keys: list[tuple] = self.__search_index__.search(query, limit, predicate=(lambda key: all(item is not None and item.visible for item in self.__search_chain__(key))) if visible_only else None)
+            results: list[dict[str, typing.Any]] = []
+
+            for key in keys:
+                item: typing.Any = self.__search_chain__(key)[-1]
+
+                if item is None:
+                    continue
+
+                results.append({'type': ('game', 'section', 'child')[len(key) - 2] if key[0] == 'game' else key[0], 'path': list(key[1:]), 'display-name': item.display_name, 'url': getattr(item, 'url', None), 'visible': item.visible})
+
+            return results
+
+    def reindex_orders(self) -> None:
+        with self.__lock__.reader():
+            for category, items in (('game', self.__game_info__), ('program', self.__program_info__), ('contact', self.__contact_info__)):
+                self.__orders__[category].rebuild(items)
+
+    def query(self, category: str, visible: bool | None = None, item_type: int | None = None, prefix: str | None = None, sort: str = 'name', descending: bool = False, cursor: str | None = None, limit: int = 50) -> tuple[dict[str, dict], str | None]:
+        assert category in self.__orders__, 'Invalid category'
+        assert sort in MyCatalogOrder.SORT_KEYS, 'Invalid sort key'
+        assert isinstance(limit, int) and limit > 0, 'Invalid limit'
+        assert item_type is None or category != 'game', 'Games have no type'
+        item_type = None if item_type is None else (Util.ProgramType if category == 'program' else Util.ContactType)(item_type).value
+        after: tuple[str, ...] | None = None if cursor is None else MyCatalogOrder.decode_cursor(cursor, sort, descending)
+
+        with self.__lock__.reader():
+            items: dict[str, MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo] = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}[category]
+            names: list[str] = list(itertools.islice(self.__orders__[category].scan(sort, descending, visible, item_type, prefix, after), limit + 1))
+            page: dict[str, dict] = {name: items[name].send_dict(False) if category == 'game' else items[name].send_dict() for name in names[:limit]}
+            next_cursor: str | None = None if len(names) <= limit else MyCatalogOrder.encode_cursor(sort, descending, MyCatalogOrder.sort_key(sort, names[limit - 1], items[names[limit - 1]]))
+            return page, next_cursor
+
+    def query_position(self, category: str, visible: bool | None = None, item_type: int | None = None, prefix: str | None = None, sort: str = 'name', descending: bool = False, cursor: str | None = None) -> tuple[int, int]:
+        assert category in self.__orders__, 'Invalid category'
+        assert sort in MyCatalogOrder.SORT_KEYS, 'Invalid sort key'
+        assert item_type is None or category != 'game', 'Games have no type'
+        item_type = None if item_type is None else (Util.ProgramType if category == 'program' else Util.ContactType)(item_type).value
+        after: tuple[str, ...] | None = None if cursor is None else MyCatalogOrder.decode_cursor(cursor, sort, descending)
+
+        with self.__lock__.reader():
+            return self.__orders__[category].position(sort, descending, visible, item_type, prefix, after)
+
+    def __image_referenced__(self, container: str, image_id: int) -> bool:
+        return self.__image_index__.pending > 0 or self.__image_index__.referenced(container, image_id)
+
+    def reindex_images(self) -> None:
+        with self.__lock__.reader():
+            self.__image_index__.clear()
+
+            for game in self.__game_info__.values():
+                self.__image_index__.add_game(game)
+
+            for item in itertools.chain(self.__program_info__.values(), self.__contact_info__.values()):
+                self.__image_index__.add_entity(item)
+
+    def collect_images(self, dry_run: bool = False, batch_size: int = 256, min_age: float = 3600, containers: tuple[str, ...] = MyImageReferenceIndex.CONTAINERS) -> dict[str, typing.Any]:
+        stores: dict[str, Image.MyImageLoader.MyImageContainer] = {'icons': self.__images__.MyIconStorage, 'backgrounds': self.__images__.MyBackgroundStorage}
+        report: dict[str, typing.Any] = {'dry-run': bool(dry_run), 'scanned': 0, 'referenced': 0, 'recent': 0, 'orphaned': 0, 'removed': 0, 'bytes': 0, 'orphans': []}
+        assert all(container in stores for container in containers), 'Invalid image container'
+
+        with self.__lock__.reader():
+            self.__image_index__.resolve()
+
+        for container in containers:
+            store: Image.MyImageLoader.MyImageContainer = stores[container]
+
+            for batch in store.scan(batch_size):
+                now: float = time.time()
+
+                with self.__lock__.reader():
+                    for image_id, stat in batch:
+                        report['scanned'] += 1
+
+                        if self.__image_index__.referenced(container, image_id):
+                            report['referenced'] += 1
+                        elif now - stat.st_mtime < min_age:
+                            report['recent'] += 1
+                        else:
+                            report['orphaned'] += 1
+                            report['bytes'] += stat.st_size
+                            report['orphans'].append(f'{container}/{image_id}.jpg')
+
+                            if not dry_run and store.del_image(image_id):
+                                report['removed'] += 1
+
+                time.sleep(0)
+
+        return report
+
+    def migrate_images(self, dry_run: bool = False, commit: typing.Callable[[], typing.Any] | None = None, containers: tuple[str, ...] = MyImageReferenceIndex.CONTAINERS) -> dict[str, typing.Any]:
+        stores: dict[str, Image.MyImageLoader.MyImageContainer] = {'icons': self.__images__.MyIconStorage, 'backgrounds': self.__images__.MyBackgroundStorage}
+        report: dict[str, typing.Any] = {'dry-run': bool(dry_run), 'scanned': 0, 'renamed': 0, 'duplicates': 0, 'bytes': 0, 'rewritten': 0, 'removed': 0, 'superseded': []}
+        mapping: dict[str, dict[int, int]] = {container: {} for container in containers}
+        attributes: dict[str, str] = {'icons': 'icon_image', 'backgrounds': 'background_image'}
+        assert all(container in stores for container in containers), 'Invalid image container'
+
+        with self.__lock__.writer():
+            for container in containers:
+                store: Image.MyImageLoader.MyImageContainer = stores[container]
+                files: list[tuple[int, os.stat_result]] = [entry for batch in store.scan() for entry in batch]
+                present: set[int] = {image_id for image_id, _ in files}
+                seen: set[int] = set()
+
+                for image_id, stat in files:
+                    report['scanned'] += 1
+
+                    with open(store.image_file(image_id).filepath, 'rb') as f:
+                        content_id: int = Image.MyImageLoader.MyImageContainer.content_id(f.read())
+
+                    if content_id == image_id:
+                        seen.add(content_id)
+                        continue
+                    elif content_id in seen or content_id in present:
+                        report['duplicates'] += 1
+                        report['bytes'] += stat.st_size
+                    else:
+                        report['renamed'] += 1
+
+                    seen.add(content_id)
+                    mapping[container][image_id] = content_id
+                    report['superseded'].append(f'{container}/{image_id}.jpg')
+
+                    if not dry_run:
+                        store.fold(image_id)
+
+            if dry_run or not any(len(ids) > 0 for ids in mapping.values()):
+                return report
+
+            entities: list[typing.Any] = [*self.__program_info__.values(), *self.__contact_info__.values()]
+
+            for game in self.__game_info__.values():
+                entities.append(game)
+
+                for section in game.__subtree__().values():
+                    entities.append(section)
+                    entities.extend(section.__children__.values())
+
+            for entity in entities:
+                for container, image_id in entity.__image_refs__():
+                    if container in mapping and image_id in mapping[container]:
+                        setattr(entity, attributes[container], mapping[container][image_id])
+                        report['rewritten'] += 1
+
+            if commit is None:
+                return report
+
+            commit()
+
+            for container, ids in mapping.items():
+                for image_id in ids:
+                    if not self.__image_index__.referenced(container, image_id) and stores[container].del_image(image_id, True):
+                        report['removed'] += 1
+
+        return report
+
+    def evict(self, max_idle: float = 0) -> int:
+        with self.__lock__.writer():
+            now: float = time.monotonic()
+            return sum(game.evict() for game in self.__game_info__.values() if game.evictable and now - game.last_accessed >= max_idle)
+
+    def reader(self) -> Util.ReadWriteLock.Lock:
+        return self.__lock__.reader()
+
+    def writer(self) -> Util.ReadWriteLock.Lock:
+        return self.__lock__.writer()
+
+    def __commit_marks__(self, marks: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...]) -> None:
+        for key, fields in marks:
+            self.mark_modified(*key, fields=fields)
+
+    def __validate_game_changes__(self, game: MyGameStorageInfo, changes: dict[str, typing.Any]) -> None:
+        def validate_name(name: typing.Any) -> str:
+            assert isinstance(name, str), 'Type error'
+            assert 4 <= len(name) <= 64, 'Name length error'
+            return Util.to_functional_name(name)
+
+        def validate_fields(fields: typing.Any, allowed: tuple[str, ...], images: tuple[str, ...], urls: tuple[str, ...]) -> None:
+            assert isinstance(fields, dict), 'Invalid change set'
+            assert all(field in allowed for field in fields), f'Unknown field(s): {", ".join(field for field in fields if field not in allowed)}'
+            assert 'visible' not in fields or isinstance(fields['visible'], bool), 'Invalid visibility'
+            assert all(fields[field] is None or (isinstance(fields[field], int) and not isinstance(fields[field], bool)) for field in images if field in fields), 'Invalid image ID'
+            assert all(fields[field] is None or isinstance(fields[field], str) for field in urls if field in fields), 'Invalid URL'
+
+        validate_fields(changes, ('display-name', 'url', 'visible', 'icon-image', 'background-image', 'sections'), ('icon-image', 'background-image'), ('url',))
+        sections: dict[str, MyGameStorageInfo.MyGameSectionInfo] = game.__subtree__()
+        section_changes: dict[str, typing.Any] = changes.get('sections', {})
+        assert isinstance(section_changes, dict), 'Invalid section changes'
+        section_names: set[str] = {name for name in sections if name not in section_changes or section_changes[name] is not None}
+
+        if 'display-name' in changes:
+            name: str = validate_name(changes['display-name'])
+            assert name == game.name or name not in self.__game_info__, f'Duplicate game \'{name}\''
+
+        for section_key, section_change in section_changes.items():
+            if section_change is None:
+                continue
+
+            validate_fields(section_change, ('display-name', 'visible', 'background-image', 'children'), ('background-image',), ())
+            section: MyGameStorageInfo.MyGameSectionInfo | None = sections.get(section_key)
+            children: dict[str, MyGameStorageInfo.MyGameObjectInfo] = {} if section is None else section.__children__
+            child_changes: dict[str, typing.Any] = section_change.get('children', {})
+            assert isinstance(child_changes, dict), 'Invalid child changes'
+
+            if section is None:
+                assert 'display-name' in section_change, f'Missing display name for new section \'{section_key}\''
+                name: str = validate_name(section_change['display-name'])
+                assert name not in section_names, f'Duplicate section \'{name}\''
+                section_names.add(name)
+            elif 'display-name' in section_change:
+                validate_name(section_change['display-name'])
+
+            child_names: set[str] = {name for name in children if name not in child_changes or child_changes[name] is not None}
+
+            for child_key, child_change in child_changes.items():
+                if child_change is None:
+                    continue
+
+                validate_fields(child_change, ('display-name', 'url', 'visible', 'icon-image'), ('icon-image',), ('url',))
+
+                if child_key not in children:
+                    assert 'display-name' in child_change, f'Missing display name for new child \'{child_key}\''
+                    name: str = validate_name(child_change['display-name'])
+                    assert name not in child_names, f'Duplicate child \'{name}\''
+                    child_names.add(name)
+                elif 'display-name' in child_change and (name := validate_name(child_change['display-name'])) != child_key:
+                    assert name not in child_names, f'Duplicate child \'{name}\''
+                    child_names.discard(child_key)
+                    child_names.add(name)
+
+    def __apply_game_changes__(self, game: MyGameStorageInfo, changes: dict[str, typing.Any], released: list[tuple[str, int]]) -> dict[str, typing.Any]:
+        def apply_image(entity: typing.Any, container: str, attribute: str, image_id: int | None) -> bool:
+            old_image: int | None = getattr(entity, attribute)
+
+            if old_image == image_id:
+                return False
+
+            setattr(entity, attribute, image_id)
+            self.__image_index__.replace(container, old_image, image_id, entity)
+
+            if old_image is not None:
+                released.append((container, old_image))
+
+            return True
+
+        diff: dict[str, typing.Any] = {'game': game.name, 'previous': game.name, 'fields': {}, 'sections': {}}
+        fields: dict[str, typing.Any] = diff['fields']
+
+        if 'display-name' in changes and changes['display-name'] != game.display_name:
+            game.__game_display_name__ = changes['display-name']
+            fields['display-name'] = game.display_name
+            self.rename_game(game.name, Util.to_functional_name(game.display_name))
+            diff['game'] = game.name
+
+        if 'url' in changes and (changes['url'] or None) != game.url:
+            game.__game_url__ = changes['url'] or None
+            fields['game-url'] = game.url
+
+        if 'visible' in changes and changes['visible'] != game.visible:
+            game.__witness__()
+            game.__visible__ = changes['visible']
+            fields['visible'] = game.visible
+
+        for field, container, attribute in (('icon-image', 'icons', '__icon_image__'), ('background-image', 'backgrounds', '__background_image__')):
+            if field in changes and apply_image(game, container, attribute, changes[field]):
+                fields[field] = None if changes[field] is None else str(changes[field])
+
+        if len(fields) > 0:
+            game.__modified__(fields=tuple(fields))
+
+        for section_key, section_change in sorted(changes.get('sections', {}).items(), key=lambda item: item[1] is not None):
+            section: MyGameStorageInfo.MyGameSectionInfo | None = game.get_section(section_key)
+
+            if section_change is None:
+                if section is not None:
+                    game.del_section(section_key)
+                    diff['sections'][section_key] = None
+
+                continue
+            elif section is None:
+                section = game.add_section(Util.to_functional_name(section_change['display-name']), section_change['display-name'], section_change.get('background-image'), section_change.get('visible', False))
+                section_diff: dict[str, typing.Any] = {'fields': {field: value for field, value in section.send_dict(False).items() if field != 'children'}, 'children': {}}
+            else:
+                section_diff: dict[str, typing.Any] = {'fields': {}, 'children': {}}
+
+                if 'display-name' in section_change and section_change['display-name'] != section.display_name:
+                    section.__display_name__ = section_change['display-name']
+                    section_diff['fields']['display-name'] = section.display_name
+
+                if 'visible' in section_change and section_change['visible'] != section.visible:
+                    section.__witness__()
+                    section.__visible__ = section_change['visible']
+                    section_diff['fields']['visible'] = section.visible
+
+                if 'background-image' in section_change and apply_image(section, 'backgrounds', '__background_image__', section_change['background-image']):
+                    section_diff['fields']['background_image'] = None if section_change['background-image'] is None else str(section_change['background-image'])
+
+                if len(section_diff['fields']) > 0:
+                    section.__modified__(fields=tuple(section_diff['fields']))
+
+            for child_key, child_change in sorted(section_change.get('children', {}).items(), key=lambda item: item[1] is not None):
+                child: MyGameStorageInfo.MyGameObjectInfo | None = section.get_child(child_key)
+
+                if child_change is None:
+                    if child is not None:
+                        section.del_child(child_key)
+                        section_diff['children'][child_key] = None
+
+                    continue
+                elif child is None:
+                    child = section.add_child(Util.to_functional_name(child_change['display-name']), child_change['display-name'], child_change.get('url') or None, child_change.get('icon-image'), child_change.get('visible', False))
+                    section_diff['children'][child.name] = child.send_dict()
+                    continue
+
+                modified: list[str] = []
+
+                if 'display-name' in child_change and child_change['display-name'] != child.display_name:
+                    child.__child_display_name__ = child_change['display-name']
+                    name: str = Util.to_functional_name(child.display_name)
+                    modified.append('display-name')
+
+                    if name != child_key:
+                        section.rename_child(child_key, name)
+                        section_diff['children'][child_key] = None
+
+                if 'url' in child_change and (child_change['url'] or None) != child.url:
+                    child.__url__ = child_change['url'] or None
+                    modified.append('url')
+
+                if 'visible' in child_change and child_change['visible'] != child.visible:
+                    child.__witness__()
+                    child.__visible__ = child_change['visible']
+                    modified.append('visible')
+
+                if 'icon-image' in child_change and apply_image(child, 'icons', '__image__', child_change['icon-image']):
+                    modified.append('icon-image')
+
+                if len(modified) > 0:
+                    child.__modified__(fields=tuple(modified))
+                    section_diff['children'][child.name] = child.send_dict()
+
+            if len(section_diff['fields']) > 0 or len(section_diff['children']) > 0:
+                diff['sections'][section.section_name] = section_diff
+
+        return diff
+
+    def __restore_game__(self, game: MyGameStorageInfo, name: str, backup: dict) -> None:
+        if game.name != name:
+            self.__game_info__.pop(game.name, None)
+            self.__search_index__.remove(('game', game.name))
+            game.__game_name__ = name
+            self.__game_info__[name] = game
+
+        self.__image_index__.remove_game(game)
+        game.__game_display_name__ = backup['display-name']
+        game.__game_url__ = backup['game-url']
+        game.__visible__ = backup['visible']
+        game.__icon_image__ = backup['icon-image']
+        game.__background_image__ = backup['background-image']
+        game.__children__ = {}
+
+        for section_name, section_data in backup['sections'].items():
+            section: MyGameStorageInfo.MyGameSectionInfo = MyGameStorageInfo.MyGameSectionInfo(game, section_name, section_data['display-name'], section_data['background_image'], section_data['visible'])
+            section.__children__ = {child_name: MyGameStorageInfo.MyGameObjectInfo(section, child_name, child['display-name'], child['url'], child['icon-image'], child['visible']) for child_name, child in section_data['children'].items()}
+            game.__children__[section_name] = section
+
+        self.__image_index__.add_game(game)
+        self.__search_index__.remove(('game', name))
+        self.__index_game__(game)
+        self.mark_modified('game', name)
+
+    @contextlib.contextmanager
+    def transaction(self) -> typing.Iterator[MyGlobalServerStorage]:
+        with self.__lock__.writer():
+            if self.__pending_marks__ is not None:
+                yield self
+                return
+
+            self.__pending_marks__ = {}
+
+            try:
+                yield self
+            finally:
+                marks: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...] = tuple((key, () if fields is None else tuple(fields)) for key, fields in self.__pending_marks__.items())
+                self.__pending_marks__ = None
+                self.__commit_marks__(marks)
+
+    def apply_game_changes(self, name: str, changes: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        released: list[tuple[str, int]] = []
+
+        with self.transaction():
+            game: MyGameStorageInfo | None = self.__game_info__.get(name)
+
+            if game is None:
+                raise KeyError(name)
+
+            self.__validate_game_changes__(game, changes)
+            backup: dict = game.save()
+
+            try:
+                diff: dict[str, typing.Any] = self.__apply_game_changes__(game, changes, released)
+            except Exception:
+                self.__restore_game__(game, name, backup)
+                raise
+
+        with self.__lock__.reader():
+            stores: dict[str, Image.MyImageLoader.MyImageContainer] = {'icons': self.__images__.MyIconStorage, 'backgrounds': self.__images__.MyBackgroundStorage}
+            diff['version'] = self.__version__
+
+            if self.__image_index__.pending == 0:
+                for container, image_id in released:
+                    if not self.__image_index__.referenced(container, image_id):
+                        stores[container].del_image(image_id)
+
+        return diff
+
+    def witness_public(self, category: str, name: str, *path: str, created: bool = False) -> None:
+        if not self.__change_feed__.active:
+            return
+
+        key: tuple[str, ...] = (category, name, *path)
+        public: bool = not created
+
+        for depth, link in enumerate(() if created else self.__search_chain__(key), 2):
+            witnessed: bool | None = self.__change_feed__.witnessed(key[:depth])
+            public = public and (link is not None and link.visible if witnessed is None else witnessed)
+
+        self.__change_feed__.witness(key, public)
+
+    def mark_modified(self, category: str, name: str, *path: str, fields: tuple[str, ...] = ()) -> None:
+        if self.__pending_marks__ is not None:
+            MyChangeFeed.merge(self.__pending_marks__, (category, name, *path), fields)
+            return
+
+        self.__version__ += 1
+        self.__generations__[category] += 1
+        self.__update_search__(category, name, *path)
+        self.__change_feed__.record((category, name, *path), fields)
+
+        if len(path) == 0:
+            item: MyGameStorageInfo | MyProgramStorageInfo | MyContactStorageInfo | None = {'game': self.__game_info__, 'program': self.__program_info__, 'contact': self.__contact_info__}[category].get(name)
+
+            if item is None:
+                self.__orders__[category].remove(name)
+            else:
+                self.__orders__[category].update(name, item)
+
+        if len(self.__change_log__) > 0 and self.__change_log__[-1][1] == category and self.__change_log__[-1][2] == name:
+            self.__change_log__[-1] = (self.__version__, category, name)
+            return
+        elif len(self.__change_log__) == self.__change_log__.maxlen:
+            self.__change_floor__ = self.__change_log__[0][0]
+
+        self.__change_log__.append((self.__version__, category, name))
 
     def del_game(self, name: str) -> None:
-        if name in self.__game_info__:
-            del self.__game_info__[name]
+        with self.__lock__.writer():
+            if name in self.__game_info__:
+                self.witness_public('game', name)
+                self.__image_index__.remove_game(self.__game_info__[name])
+                del self.__game_info__[name]
+                self.__created__.pop(('game', name), None)
+                self.mark_modified('game', name)
 
     def rename_game(self, old_name: str, new_name: str) -> None:
-        if old_name in self.__game_info__ and old_name != new_name:
-            game: MyGameStorageInfo = self.__game_info__[old_name]
-            game.__game_name__ = new_name
-            self.__game_info__[new_name] = game
-            del self.__game_info__[old_name]
+        with self.__lock__.writer():
+            if old_name in self.__game_info__ and old_name != new_name:
+                self.witness_public('game', old_name)
+                self.witness_public('game', new_name, created=True)
+                game: MyGameStorageInfo = self.__game_info__[old_name]
+                game.__game_name__ = new_name
+                self.__game_info__[new_name] = game
+                del self.__game_info__[old_name]
+                self.__created__.pop(('game', old_name), None)
+                self.mark_modified('game', old_name)
+                self.mark_modified('game', new_name)
+                self.__created__[('game', new_name)] = self.__version__
 
     def add_game(self, name: str) -> MyGameStorageInfo:
-        assert name not in self.__game_info__
-        game: MyGameStorageInfo = MyGameStorageInfo(name, '', '', None, None, False)
-        self.__game_info__[name] = game
-        return game
+        with self.__lock__.writer():
+            assert name not in self.__game_info__
+            game: MyGameStorageInfo = MyGameStorageInfo(name, '', '', None, None, False)
+            self.__game_info__[name] = game
+            self.mark_modified('game', name)
+            self.__created__[('game', name)] = self.__version__
+            return game
 
     def get_game(self, name: str) -> MyGameStorageInfo | None:
         return self.__game_info__[name] if name in self.__game_info__ else None
 
     def del_program(self, name: str) -> None:
-        if name in self.__program_info__:
-            del self.__program_info__[name]
+        with self.__lock__.writer():
+            if name in self.__program_info__:
+                self.witness_public('program', name)
+                self.__image_index__.remove_entity(self.__program_info__[name])
+                del self.__program_info__[name]
+                self.__created__.pop(('program', name), None)
+                self.mark_modified('program', name)
 
     def rename_program(self, old_name: str, new_name: str) -> None:
-        if old_name in self.__program_info__ and old_name != new_name:
-            program: MyProgramStorageInfo = self.__program_info__[old_name]
-            program.__program_name__ = new_name
-            self.__program_info__[new_name] = program
-            del self.__program_info__[old_name]
+        with self.__lock__.writer():
+            if old_name in self.__program_info__ and old_name != new_name:
+                self.witness_public('program', old_name)
+                self.witness_public('program', new_name, created=True)
+                program: MyProgramStorageInfo = self.__program_info__[old_name]
+                program.__program_name__ = new_name
+                self.__program_info__[new_name] = program
+                del self.__program_info__[old_name]
+                self.__created__.pop(('program', old_name), None)
+                self.mark_modified('program', old_name)
+                self.mark_modified('program', new_name)
+                self.__created__[('program', new_name)] = self.__version__
 
     def add_program(self, name: str) -> MyProgramStorageInfo:
-        assert name not in self.__program_info__
-        program: MyProgramStorageInfo = MyProgramStorageInfo(name, '', None, None, False, 1, 1, Util.ProgramType.PROGRAM)
-        self.__program_info__[name] = program
-        return program
+        with self.__lock__.writer():
+            assert name not in self.__program_info__
+            program: MyProgramStorageInfo = MyProgramStorageInfo(name, '', None, None, False, 1, 1, Util.ProgramType.PROGRAM)
+            self.__program_info__[name] = program
+            self.mark_modified('program', name)
+            self.__created__[('program', name)] = self.__version__
+            return program
 
     def get_program(self, name: str) -> MyProgramStorageInfo | None:
         return self.__program_info__[name] if name in self.__program_info__ else None
 
     def del_contact(self, name: str) -> None:
-        if name in self.__contact_info__:
-            del self.__contact_info__[name]
+        with self.__lock__.writer():
+            if name in self.__contact_info__:
+                self.witness_public('contact', name)
+                self.__image_index__.remove_entity(self.__contact_info__[name])
+                del self.__contact_info__[name]
+                self.__created__.pop(('contact', name), None)
+                self.mark_modified('contact', name)
 
     def rename_contact(self, old_name: str, new_name: str) -> None:
-        if old_name in self.__contact_info__ and old_name != new_name:
-            contact: MyContactStorageInfo = self.__contact_info__[old_name]
-            contact.__contact_name__ = new_name
-            self.__contact_info__[new_name] = contact
-            del self.__contact_info__[old_name]
+        with self.__lock__.writer():
+            if old_name in self.__contact_info__ and old_name != new_name:
+                self.witness_public('contact', old_name)
+                self.witness_public('contact', new_name, created=True)
+                contact: MyContactStorageInfo = self.__contact_info__[old_name]
+                contact.__contact_name__ = new_name
+                self.__contact_info__[new_name] = contact
+                del self.__contact_info__[old_name]
+                self.__created__.pop(('contact', old_name), None)
+                self.mark_modified('contact', old_name)
+                self.mark_modified('contact', new_name)
+                self.__created__[('contact', new_name)] = self.__version__
 
     def add_contact(self, name: str) -> MyContactStorageInfo:
-        assert name not in self.__program_info__
-        contact: MyContactStorageInfo = MyContactStorageInfo(name, '', None, Util.ContactType.NONE, None, False)
-        self.__contact_info__[name] = contact
-        return contact
+        with self.__lock__.writer():
+            assert name not in self.__program_info__
+            contact: MyContactStorageInfo = MyContactStorageInfo(name, '', None, Util.ContactType.NONE, None, False)
+            self.__contact_info__[name] = contact
+            self.mark_modified('contact', name)
+            self.__created__[('contact', name)] = self.__version__
+            return contact
 
     def get_contact(self, name: str) -> MyContactStorageInfo | None:
         return self.__contact_info__[name] if name in self.__contact_info__ else None
 
+    @property
+    def version(self) -> int:
+        return self.__version__
+
+    @property
+    def modified(self) -> bool:
+        return self.__saved_generations__ != self.__generations__
+
+    @property
+    def lazy(self) -> bool:
+        return self.__lazy__
+
+    @property
+    def image_references(self) -> MyImageReferenceIndex:
+        return self.__image_index__
+
+    @property
+    def change_feed(self) -> MyChangeFeed:
+        return self.__change_feed__
+
+    @property
+    def search_index(self) -> Search.MySearchIndex:
+        return self.__search_index__
+
     @property
     def MyImageLoader(self) -> Image.MyImageLoader:
         return self.__images__
@@ -60,6 +60,11 @@ def spawn_subserver(event: threading.Event, host: str, route_name: str, executab
         for closed in closed_modules:
             del sys.modules[closed]
 
+        snapshot_spec: importlib.machinery.ModuleSpec = importlib.util.spec_from_file_location('CatalogSnapshot', os.path.join(root, 'CatalogSnapshot.py'))
+        snapshot_module: types.ModuleType = importlib.util.module_from_spec(snapshot_spec)
+        sys.modules['CatalogSnapshot'] = snapshot_module
+        snapshot_spec.loader.exec_module(snapshot_module)
+
         executable_dir: str = os.path.dirname(executable_path)
         os.chdir(executable_dir)
         module_name: str = f'subserver-{route_name}'
@@ -1,5 +1,8 @@
+from __future__ import annotations
+
 import enum
 import socket
+import threading
 
 
 class ProgramType(enum.IntEnum):
@@ -21,6 +24,100 @@ class UserElevationType(enum.IntEnum):
     MODERATOR = 2
 
 
+class ReadWriteLock:
+    """
+    Reentrant reader-writer lock preferring writers
+    A thread holding the writer lock may also acquire the reader lock
+    """
+
+    class Lock:
+        def __init__(self, rw_lock: ReadWriteLock, is_writer: bool):
+            assert isinstance(rw_lock, ReadWriteLock)
+            self.__rw_lock__: ReadWriteLock = rw_lock
+            self.__writer__: bool = bool(is_writer)
+
+        def __enter__(self) -> ReadWriteLock.Lock:
+            if self.__writer__:
+                self.__rw_lock__.acquire_writer()
+            else:
+                self.__rw_lock__.acquire_reader()
+
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+            if self.__writer__:
+                self.__rw_lock__.release_writer()
+            else:
+                self.__rw_lock__.release_reader()
+
+    def __init__(self):
+        self.__condition__: threading.Condition = threading.Condition(threading.Lock())
+        self.__readers__: dict[int, int] = {}
+        self.__writer__: int | None = None
+        self.__writer_depth__: int = 0
+        self.__writers_waiting__: int = 0
+
+    def acquire_reader(self, blocking: bool = True) -> bool:
+        """
+        Acquires the reader lock
+        :param blocking: (bool) Whether to wait for an active or queued writer
+        :return: (bool) Whether the lock was acquired
+        """
+
+        ident: int = threading.get_ident()
+
+        with self.__condition__:
+            if self.__writer__ != ident and ident not in self.__readers__:
+                if not blocking and (self.__writer__ is not None or self.__writers_waiting__ > 0):
+                    return False
+
+                self.__condition__.wait_for(lambda: self.__writer__ is None and self.__writers_waiting__ == 0)
+
+            self.__readers__[ident] = self.__readers__.get(ident, 0) + 1
+            return True
+
+    def release_reader(self) -> None:
+        ident: int = threading.get_ident()
+
+        with self.__condition__:
+            assert ident in self.__readers__, 'Reader lock not acquired'
+            self.__readers__[ident] -= 1
+
+            if self.__readers__[ident] == 0:
+                del self.__readers__[ident]
+                self.__condition__.notify_all()
+
+    def acquire_writer(self) -> None:
+        ident: int = threading.get_ident()
+
+        with self.__condition__:
+            if self.__writer__ == ident:
+                self.__writer_depth__ += 1
+                return
+
+            assert ident not in self.__readers__, 'Cannot upgrade a reader lock'
+            self.__writers_waiting__ += 1
+            self.__condition__.wait_for(lambda: self.__writer__ is None and len(self.__readers__) == 0)
+            self.__writers_waiting__ -= 1
+            self.__writer__ = ident
+            self.__writer_depth__ = 1
+
+    def release_writer(self) -> None:
+        with self.__condition__:
+            assert self.__writer__ == threading.get_ident(), 'Writer lock not acquired'
+            self.__writer_depth__ -= 1
+
+            if self.__writer_depth__ == 0:
+                self.__writer__ = None
+                self.__condition__.notify_all()
+
+    def reader(self) -> ReadWriteLock.Lock:
+        return ReadWriteLock.Lock(self, False)
+
+    def writer(self) -> ReadWriteLock.Lock:
+        return ReadWriteLock.Lock(self, True)
+
+
 def get_addr_ipv4_ipv6(ip: str) -> tuple[int, bool | None]:
     """
     Checks if the specified IP string is ipv4 or ipv6
@@ -1,15 +1,13 @@
-import base64
 import datetime
 import flask
-import io
-import json
 import multiprocessing
 import multiprocessing.connection
 import os
-import PIL.Image
 import requests
 import requests.structures
+import shutil
 import signal
+import tempfile
 import threading
 import traceback
 import time
@@ -21,9 +19,17 @@ import CustomMethodsVI.Stream as Stream
 
 import Admins
 import APIHandler
+import CatalogSnapshot
+import Image
+import ImageVariants
+import ImageWorker
+import JsonCodec
+import Replication
+import SQLiteStorage
 import Storage
 import Util
 import SocketHandler
+import StaticExport
 import Subserver
 
 flask_app: flask.Flask = flask.Flask(__name__, template_folder='templates')
@@ -31,18 +37,39 @@ flask_app.config['MAX_FORM_MEMORY_SIZE'] = 10 * 2 ** 20
 admin_cache: Admins.MyAdminCache = Admins.MyAdminCache.load('Data/admin.dat')
 executable_dir: FileSystem.Directory = FileSystem.Directory('Executables')
 external_executable_file: FileSystem.File = executable_dir.file('executables.json')
-storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage.load('Data/storage.json')
+storage_path: str = 'Data/storage.bin' if os.getenv('STORAGEFORMAT') == 'binary' else 'Data/storage.json'
+REPLICATION: str = os.getenv('REPLICATION', 'off')
+REPLICATION_ADDRESS: str = os.getenv('REPLICATIONADDRESS', '127.0.0.1:5001')
+assert REPLICATION in ('off', 'primary', 'replica'), 'Invalid replication role'
+
+if REPLICATION == 'replica':
+    storage: Storage.MyGlobalServerStorage = Storage.MyGlobalServerStorage()
+else:
+    storage: Storage.MyGlobalServerStorage = SQLiteStorage.MySQLiteServerStorage.load('Data/storage.db', 'Data/storage.json') if os.getenv('STORAGEENGINE') == 'sqlite' else Storage.MyGlobalServerStorage.load(storage_path if os.path.exists(storage_path) else 'Data/storage.json', os.getenv('STORAGELAZY') == '1')
+replication: Replication.MyReplicationPrimary | Replication.MyReplicaClient | None = None if REPLICATION == 'off' else Replication.MyReplicationPrimary(storage, REPLICATION_ADDRESS) if REPLICATION == 'primary' else Replication.MyReplicaClient(storage, REPLICATION_ADDRESS)
 socketio: SocketHandler.SocketioHandler = SocketHandler.SocketioHandler(flask_app, admin_cache, async_mode='gevent')
+image_workers: ImageWorker.MyImageWorkerPool = ImageWorker.MyImageWorkerPool()
+image_variants: ImageVariants.MyImageVariantCache = ImageVariants.MyImageVariantCache(os.getenv('IMAGEVARIANTS', 'Data/image-variants'), image_workers, int(os.getenv('IMAGEVARIANTSIZE', 256)) * 2 ** 20)
 fileshare_root: FileSystem.Directory = FileSystem.Directory('Data/fileshare')
 APIHandler.handler(flask_app)
 executables: dict[str, tuple[int, tuple[str, str], multiprocessing.Process, multiprocessing.connection.Connection, multiprocessing.connection.Connection]] = {}
 temp_program_listings: dict[str, str] = {}
 thread_close_event: threading.Event = threading.Event()
 storage_save_thread: threading.Thread = ...
+image_collector_thread: threading.Thread = ...
+snapshot_publisher_thread: threading.Thread = ...
+static_exporter_thread: threading.Thread = ...
+snapshot_path: str | None = None if os.getenv('CATALOGSNAPSHOT') == 'off' else os.path.abspath(os.getenv('CATALOGSNAPSHOT', 'Data/catalog-snapshot'))
 HOST: str = '0.0.0.0'
 SCHEMA: str = 'http://'
 PORT: int = 5000
 SAVE_DELAY: int = 600
+EVICT_DELAY: int = 1800
+IMAGE_COLLECT_DELAY: int = 86400
+SNAPSHOT_DELAY: int = 5
+INDEX_INLINE: bool = os.getenv('INDEXINLINE') == '1'
+index_page: Storage.MyCatalogPayload | None = None
+STATIC_EXPORT_DELAY: int = 30
 
 if not executable_dir.exists():
     executable_dir.create()
@@ -62,9 +89,46 @@ def apply_headers(response: flask.Response):
     return response
 
 
+@flask_app.before_request
+def guard_replica():
+    if REPLICATION == 'replica' and (flask.request.path == '/admin' or flask.request.path.startswith(('/admin/', '/admin-'))):
+        return flask.Response(status=403, response='Read-only replica')
+
+
+def render_index() -> Storage.MyCatalogPayload:
+    global index_page
+    catalog: Storage.MyCatalogPayload | None = storage.public_payload() if INDEX_INLINE else None
+    version: int = 0 if catalog is None else catalog.version
+    page: Storage.MyCatalogPayload | None = index_page
+
+    if page is not None and page.version == version:
+        return page
+
+    inline_catalog: str | None = None if catalog is None else catalog.body.decode().replace('<', '\\u003c')
+    page = Storage.MyCatalogPayload(version, flask.render_template('index.html', inline_catalog=inline_catalog, inline_version=version).encode())
+
+    if index_page is None or index_page.version <= version:
+        index_page = page
+
+    return page
+
+
 @flask_app.route('/')
 def index():
-    return flask.render_template('index.html')
+    page: Storage.MyCatalogPayload = render_index()
+    response: flask.Response
+
+    if flask.request.if_none_match.contains(page.etag):
+        response = flask.Response(status=304)
+    elif flask.request.accept_encodings['gzip']:
+        response = flask.Response(status=200, response=page.compressed_body, headers={'Content-Type': 'text/html; charset=utf-8', 'Content-Encoding': 'gzip'})
+    else:
+        response = flask.Response(status=200, response=page.body, headers={'Content-Type': 'text/html; charset=utf-8'})
+
+    response.set_etag(page.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 
 @flask_app.route('/filetree', methods=('GET', 'POST'))
@@ -76,7 +140,7 @@ def filetree():
             'dirs': [child.dirname for child in fileshare_root.dirs],
             'files': [child.basename for child in fileshare_root.files]
         }
-        return flask.Response(status=200, response=json.dumps(content), headers={'Content-Type': 'application/json'})
+        return flask.Response(status=200, response=JsonCodec.dumpb(content), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/filetree/<path:subpath>', methods=('POST',))
@@ -94,7 +158,7 @@ def filepath(subpath: str):
             'dirs': [child.dirname for child in subdir.dirs],
             'files': [child.basename for child in subdir.files]
         }
-        return flask.Response(status=200, response=json.dumps(content), headers={'Content-Type': 'application/json'})
+        return flask.Response(status=200, response=JsonCodec.dumpb(content), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/proxyhost/<path:subdomain>', methods=('GET', 'POST'))
@@ -169,6 +233,40 @@ def admin_login():
     return response
 
 
+def catalog_query_response(category: str) -> flask.Response:
+    visible: str | None = flask.request.args.get('visible')
+    item_type: str | None = flask.request.args.get('type')
+    order: str = flask.request.args.get('order', 'asc')
+    limit: str = flask.request.args.get('limit', '50')
+
+    if visible not in (None, 'true', 'false') or order not in ('asc', 'desc') or (item_type is not None and not item_type.isdigit()) or not limit.isdigit() or int(limit) == 0:
+        return flask.Response(status=400, response='Invalid query')
+
+    try:
+        page, cursor = storage.query(category, None if visible is None else visible == 'true', None if item_type is None else int(item_type), flask.request.args.get('prefix'), flask.request.args.get('sort', 'name'), order == 'desc', flask.request.args.get('cursor'), min(int(limit), 500))
+        offset, total = storage.query_position(category, None if visible is None else visible == 'true', None if item_type is None else int(item_type), flask.request.args.get('prefix'), flask.request.args.get('sort', 'name'), order == 'desc', flask.request.args.get('cursor'))
+    except (AssertionError, ValueError) as err:
+        return flask.Response(status=400, response=str(err) or 'Invalid query')
+
+    response: flask.Response = flask.Response(status=200, response=JsonCodec.dumpb(page), headers={'Content-Type': 'application/json', 'X-Offset': str(offset), 'X-Total-Count': str(total)})
+
+    if cursor is not None:
+        response.headers['X-Next-Cursor'] = cursor
+
+    return response
+
+
+def catalog_stream_response(category: str, **fields: typing.Any) -> flask.Response:
+    def stream() -> typing.Iterator[str]:
+        fragments: typing.Iterator[str] = storage.iter_category_json(category, False)
+
+        for chunk in Storage.MyJsonStream.chunks(Storage.MyJsonStream.wrap(fragments, 'body', **fields) if len(fields) > 0 else fragments):
+            yield chunk
+            socketio.sleep()
+
+    return flask.Response(status=200, response=stream(), headers={'Content-Type': 'application/json'})
+
+
 @flask_app.route('/admin/games-list', methods=('POST',))
 def admin_games_list():
     if 'AuthToken' not in flask.request.cookies:
@@ -180,7 +278,7 @@ def admin_games_list():
     if flask.request.content_type != 'application/json' or flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
         return flask.Response(status=401, response='Invalid Session')
 
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['game-storage']))
+    return catalog_query_response('game')
 
 
 @flask_app.route('/admin/programs-list', methods=('POST',))
@@ -194,7 +292,7 @@ def admin_programs_list():
     if flask.request.content_type != 'application/json' or flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
         return flask.Response(status=401, response='Invalid Session')
 
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['program-storage']))
+    return catalog_query_response('program')
 
 
 @flask_app.route('/admin/users-list', methods=('POST',))
@@ -208,7 +306,7 @@ def admin_users_list():
     if flask.request.content_type != 'application/json' or flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
         return flask.Response(status=401, response='Invalid Session')
 
-    return flask.Response(status=200, response=json.dumps(admin_cache.send_users()))
+    return flask.Response(status=200, response=JsonCodec.dumpb(admin_cache.send_users()))
 
 
 @flask_app.route('/admin/contacts-list', methods=('POST',))
@@ -222,7 +320,27 @@ def admin_contacts_list():
     if flask.request.content_type != 'application/json' or flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
         return flask.Response(status=401, response='Invalid Session')
 
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['contact-storage']))
+    return catalog_query_response('contact')
+
+
+@flask_app.route('/admin/search', methods=('POST',))
+def admin_search():
+    if 'AuthToken' not in flask.request.cookies:
+        return flask.Response(status=401, response='Unauthorized')
+
+    cookie: str = flask.request.cookies['AuthToken']
+    token: uuid.UUID = uuid.UUID(int=int(cookie, 16), version=4)
+
+    if flask.request.content_type != 'application/json' or flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
+        return flask.Response(status=401, response='Invalid Session')
+
+    query: str = flask.request.args.get('q', '')
+    limit: str = flask.request.args.get('limit', '50')
+
+    if not limit.isdigit():
+        return flask.Response(status=400, response='Invalid limit')
+
+    return flask.Response(status=200, response=JsonCodec.dumpb(storage.search(query, min(int(limit), 500), False)), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/admin/games-add', methods=('POST',))
@@ -244,7 +362,7 @@ def admin_games_add():
         name = Util.to_functional_name(display_name)
 
     storage.add_game(name)
-    return flask.Response(status=200, response=json.dumps({'new': name, 'body': storage.send_dict(False)['game-storage']}), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('game', new=name)
 
 
 @flask_app.route('/admin/programs-add', methods=('POST',))
@@ -266,7 +384,7 @@ def admin_programs_add():
         name = Util.to_functional_name(display_name)
 
     storage.add_program(name)
-    return flask.Response(status=200, response=json.dumps({'new': name, 'body': storage.send_dict(False)['program-storage']}), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('program', new=name)
 
 
 @flask_app.route('/admin/users-add', methods=('POST',))
@@ -284,7 +402,7 @@ def admin_users_add():
 
     new_user: Admins.MyAdminInfo = admin_cache.add_user(Util.UserElevationType.MODERATOR, False, -1, '', None, None)
     new_token: uuid.UUID = new_user.token
-    return flask.Response(status=200, response=json.dumps({'new': str(new_token.int), 'body': admin_cache.send_users()}), headers={'Content-Type': 'application/json'})
+    return flask.Response(status=200, response=JsonCodec.dumpb({'new': str(new_token.int), 'body': admin_cache.send_users()}), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/admin/contacts-add', methods=('POST',))
@@ -306,7 +424,60 @@ def admin_contacts_add():
         name = Util.to_functional_name(display_name)
 
     storage.add_contact(name)
-    return flask.Response(status=200, response=json.dumps({'new': name, 'body': storage.send_dict(False)['contact-storage']}), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('contact', new=name)
+
+
+@flask_app.route('/admin/catalog-export', methods=('GET',))
+def admin_catalog_export():
+    if 'AuthToken' not in flask.request.cookies:
+        return flask.Response(status=401, response='Unauthorized')
+
+    cookie: str = flask.request.cookies['AuthToken']
+    token: uuid.UUID = uuid.UUID(int=int(cookie, 16), version=4)
+
+    if flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
+        return flask.Response(status=401, response='Invalid Session')
+    elif socketio.get_session_admin_info(token).access > Util.UserElevationType.ADMINISTRATOR:
+        return flask.Response(status=403, response='Insufficient Permissions')
+
+    def stream() -> typing.Iterator[str]:
+        for chunk in Storage.MyJsonStream.chunks(storage.export_ndjson()):
+            yield chunk
+            socketio.sleep()
+
+    return flask.Response(status=200, response=stream(), headers={'Content-Type': 'application/x-ndjson', 'Content-Disposition': 'attachment; filename="catalog.ndjson"'})
+
+
+@flask_app.route('/admin/catalog-import', methods=('POST',))
+def admin_catalog_import():
+    if 'AuthToken' not in flask.request.cookies:
+        return flask.Response(status=401, response='Unauthorized')
+
+    cookie: str = flask.request.cookies['AuthToken']
+    token: uuid.UUID = uuid.UUID(int=int(cookie, 16), version=4)
+
+    if flask.request.user_agent.string == '' or not socketio.is_admin_session_active(token):
+        return flask.Response(status=401, response='Invalid Session')
+    elif socketio.get_session_admin_info(token).access > Util.UserElevationType.ADMINISTRATOR:
+        return flask.Response(status=403, response='Insufficient Permissions')
+
+    replace: str = flask.request.args.get('replace', 'false')
+
+    if replace not in ('true', 'false'):
+        return flask.Response(status=400, response='Invalid query')
+
+    upload: typing.Any = flask.request.files.get('file')
+
+    with tempfile.TemporaryFile('w+b') as spool:
+        shutil.copyfileobj(flask.request.stream if upload is None else upload.stream, spool, 1 << 20)
+        spool.seek(0)
+
+        try:
+            counts: dict[str, int] = storage.import_ndjson(spool, replace == 'true', pause=socketio.sleep)
+        except AssertionError as err:
+            return flask.Response(status=400, response=str(err) or 'Malformed')
+
+    return flask.Response(status=200, response=JsonCodec.dumpb(counts), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/admin/games-del', methods=('POST',))
@@ -323,7 +494,7 @@ def admin_games_del():
         return flask.Response(status=403, response='Insufficient Permissions')
 
     storage.del_game(flask.request.json['game-id'])
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['game-storage']), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('game')
 
 
 @flask_app.route('/admin/programs-del', methods=('POST',))
@@ -340,7 +511,7 @@ def admin_programs_del():
         return flask.Response(status=403, response='Insufficient Permissions')
 
     storage.del_program(flask.request.json['program-id'])
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['program-storage']), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('program')
 
 
 @flask_app.route('/admin/users-del', methods=('POST',))
@@ -364,7 +535,7 @@ def admin_users_del():
         return flask.Response(status=403, response='Insufficient Permissions')
 
     admin_cache.del_user(target_id)
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['program-storage']), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('program')
 
 
 @flask_app.route('/admin/contacts-del', methods=('POST',))
@@ -381,7 +552,7 @@ def admin_contacts_del():
         return flask.Response(status=403, response='Insufficient Permissions')
 
     storage.del_contact(flask.request.json['contact-id'])
-    return flask.Response(status=200, response=json.dumps(storage.send_dict(False)['contact-storage']), headers={'Content-Type': 'application/json'})
+    return catalog_stream_response('contact')
 
 
 @flask_app.route('/admin/game-editor', methods=('POST',))
@@ -397,79 +568,76 @@ def admin_game_editor():
     elif socketio.get_session_admin_info(token).access > Util.UserElevationType.ADMINISTRATOR:
         return flask.Response(status=403, response='Insufficient Permissions')
 
-    game: Storage.MyGameStorageInfo = storage.get_game(flask.request.form.get('game-editor-game-id'))
+    if storage.get_game(flask.request.form.get('game-editor-game-id')) is None:
+        return flask.Response(status=404, response='Specified game does not exist')
+
+    uploads: list[tuple[Image.MyImageLoader.MyImageContainer, str, dict[str, typing.Any], str]] = []
+    uploaded: list[tuple[Image.MyImageLoader.MyImageContainer, int]] = []
 
-    if game is not None:
+    def upload(container: Image.MyImageLoader.MyImageContainer, data: str, target: dict[str, typing.Any], field: str) -> None:
+        uploads.append((container, data, target, field))
+
+    try:
         url: str | None = flask.request.form.get('game-editor-game-url') if 'game-editor-game-url' in flask.request.form else None
-        game.display_name = flask.request.form.get('game-editor-game-name')
-        game.url = None if url is None or len(url) == 0 else url
-        game.visible = 'game-editor-game-visible' in flask.request.form and flask.request.form.get('game-editor-game-visible') == 'true'
-        icon_image_data: str = flask.request.form.get('game-editor-game-icon-image-data')
-        background_image_data: str = flask.request.form.get('game-editor-game-bg-image-data')
-        section_data: dict = json.loads(flask.request.form.get('game-editor-game-sections'))
+        icon_image_data: str = flask.request.form.get('game-editor-game-icon-image-data', '')
+        background_image_data: str = flask.request.form.get('game-editor-game-bg-image-data', '')
+        changes: dict[str, typing.Any] = {
+            'display-name': flask.request.form.get('game-editor-game-name'),
+            'url': None if url is None or len(url) == 0 else url,
+            'visible': 'game-editor-game-visible' in flask.request.form and flask.request.form.get('game-editor-game-visible') == 'true',
+            'sections': {}
+        }
 
         if len(icon_image_data) > 0:
-            bytestream: io.BytesIO = io.BytesIO(base64.b64decode(icon_image_data))
-            image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-            game.icon_image = image
+            upload(storage.MyImageLoader.MyIconStorage, icon_image_data, changes, 'icon-image')
 
         if len(background_image_data) > 0:
-            bytestream: io.BytesIO = io.BytesIO(base64.b64decode(background_image_data))
-            image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-            game.background_image = image
+            upload(storage.MyImageLoader.MyBackgroundStorage, background_image_data, changes, 'background-image')
 
-        for section_name, section_data in section_data.items():
+        for section_name, section_data in JsonCodec.loads(flask.request.form.get('game-editor-game-sections', '{}')).items():
             if section_data is None:
-                game.del_section(section_name)
+                changes['sections'][section_name] = None
                 continue
 
-            section: Storage.MyGameStorageInfo.MyGameSectionInfo = game.get_section(section_name)
-            visible: bool = section_data['visible']
-            display_name: str = section_data['display-name']
-            new_background_image: str | None = section_data['new-background-image']
-            children: dict = section_data['children']
-            background_image: int | None = None
-
-            if len(new_background_image):
-                bytestream: io.BytesIO = io.BytesIO(base64.b64decode(new_background_image))
-                image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-                background_image = storage.MyImageLoader.MyBackgroundStorage.set_image(None, image)
-
-            if section is None:
-                section = game.add_section(Util.to_functional_name(display_name), display_name, background_image, visible)
-            else:
-                section.display_name = display_name
-                section.background_image = background_image
-                section.visible = visible
-
-            for child_name, child_data in children.items():
+            section_changes: dict[str, typing.Any] = {'display-name': section_data['display-name'], 'visible': section_data['visible'], 'children': {}}
+            changes['sections'][section_name] = section_changes
+
+            if len(section_data['new-background-image']) > 0:
+                upload(storage.MyImageLoader.MyBackgroundStorage, section_data['new-background-image'], section_changes, 'background-image')
+
+            for child_name, child_data in section_data['children'].items():
                 if child_data is None:
-                    section.del_child(child_name)
+                    section_changes['children'][child_name] = None
                     continue
 
-                child: Storage.MyGameStorageInfo.MyGameObjectInfo = section.get_child(child_name)
-                child_display_name: str = child_data['display-name']
-                child_url: str = child_data['url']
-                child_visible: bool = child_data['visible']
-                new_child_icon_image: str = child_data['new-icon-image']
-                child_icon_image: int | None = None
+                section_changes['children'][child_name] = {'display-name': child_data['display-name'], 'url': child_data['url'], 'visible': child_data['visible']}
 
-                if len(new_child_icon_image):
-                    bytestream: io.BytesIO = io.BytesIO(base64.b64decode(new_child_icon_image))
-                    image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-                    child_icon_image = storage.MyImageLoader.MyIconStorage.set_image(None, image)
+                if len(child_data['new-icon-image']) > 0:
+                    upload(storage.MyImageLoader.MyIconStorage, child_data['new-icon-image'], section_changes['children'][child_name], 'icon-image')
+
+        for (container, _, target, field), image_id in zip(uploads, image_workers.store_all((container, data) for container, data, _, _ in uploads)):
+            target[field] = image_id
+            uploaded.append((container, image_id))
+    except (KeyError, ValueError, TypeError, AttributeError, OSError) as err:
+        for container, image_id in uploaded:
+            container.del_image(image_id)
+
+        return flask.Response(status=400, response=f'Malformed game changes: {err}')
+
+    try:
+        diff: dict[str, typing.Any] = storage.apply_game_changes(flask.request.form.get('game-editor-game-id'), changes)
+    except KeyError:
+        for container, image_id in uploaded:
+            container.del_image(image_id)
 
-                if child is None:
-                    section.add_child(Util.to_functional_name(child_display_name), child_display_name, child_url, child_icon_image, child_visible)
-                else:
-                    child.display_name = child_display_name
-                    child.url = child_url
-                    child.icon_image = child_icon_image
-                    child.visible = child_visible
-    else:
         return flask.Response(status=404, response='Specified game does not exist')
+    except AssertionError as err:
+        for container, image_id in uploaded:
+            container.del_image(image_id)
 
-    return flask.redirect('/admin', 302)
+        return flask.Response(status=400, response=f'Invalid game changes: {err}')
+
+    return flask.Response(status=200, response=JsonCodec.dumpb(diff), headers={'Content-Type': 'application/json'})
 
 
 @flask_app.route('/admin/program-editor', methods=('POST',))
@@ -485,26 +653,37 @@ def admin_program_editor():
     elif socketio.get_session_admin_info(token).access > Util.UserElevationType.ADMINISTRATOR:
         return flask.Response(status=403, response='Insufficient Permissions')
 
-    program: Storage.MyProgramStorageInfo = storage.get_program(flask.request.form.get('program-editor-program-id'))
+    if storage.get_program(flask.request.form.get('program-editor-program-id')) is None:
+        return flask.Response(status=404, response='Specified program does not exist')
 
-    if program is not None:
-        url: str | None = flask.request.form.get('program-editor-program-url') if 'program-editor-program-url' in flask.request.form else None
-        program.display_name = flask.request.form.get('program-editor-program-name')
-        program.url = None if url is None or len(url) == 0 else url
-        program.visible = 'program-editor-program-visible' in flask.request.form and flask.request.form.get('program-editor-program-visible') == 'true'
-        width: int = int(flask.request.form.get('program-editor-program-width'))
-        height: int = int(flask.request.form.get('program-editor-program-height'))
-        program_type: int = int(flask.request.form.get('program-editor-program-type'))
-        program.dimensions = (width if 0 < width <= 5 else None, height if 0 < height <= 5 else None)
-        program.program_type = Stream.LinqStream(iter(Util.ProgramType)).filter(lambda enum: enum.value == program_type).first_or_default(Util.ProgramType.PROGRAM)
-        icon_image_data: str = flask.request.form.get('program-editor-program-icon-image-data')
+    icon_image_data: str = flask.request.form.get('program-editor-program-icon-image-data', '')
 
-        if len(icon_image_data) > 0:
-            bytestream: io.BytesIO = io.BytesIO(base64.b64decode(icon_image_data))
-            image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-            program.icon_image = image
-    else:
-        return flask.Response(status=404, response='Specified program does not exist')
+    try:
+        icon_image: int | None = image_workers.store(storage.MyImageLoader.MyIconStorage, icon_image_data) if len(icon_image_data) > 0 else None
+    except (ValueError, OSError) as err:
+        return flask.Response(status=400, response=f'Malformed program icon: {err}')
+
+    with storage.writer():
+        program: Storage.MyProgramStorageInfo = storage.get_program(flask.request.form.get('program-editor-program-id'))
+
+        if program is not None:
+            url: str | None = flask.request.form.get('program-editor-program-url') if 'program-editor-program-url' in flask.request.form else None
+            program.display_name = flask.request.form.get('program-editor-program-name')
+            program.url = None if url is None or len(url) == 0 else url
+            program.visible = 'program-editor-program-visible' in flask.request.form and flask.request.form.get('program-editor-program-visible') == 'true'
+            width: int = int(flask.request.form.get('program-editor-program-width'))
+            height: int = int(flask.request.form.get('program-editor-program-height'))
+            program_type: int = int(flask.request.form.get('program-editor-program-type'))
+            program.dimensions = (width if 0 < width <= 5 else None, height if 0 < height <= 5 else None)
+            program.program_type = Stream.LinqStream(iter(Util.ProgramType)).filter(lambda enum: enum.value == program_type).first_or_default(Util.ProgramType.PROGRAM)
+
+            if icon_image is not None:
+                program.icon_image = icon_image
+        else:
+            if icon_image is not None:
+                storage.MyImageLoader.MyIconStorage.del_image(icon_image)
+
+            return flask.Response(status=404, response='Specified program does not exist')
 
 
     return flask.redirect('/admin', 302)
@@ -538,12 +717,13 @@ def admin_user_editor():
             return flask.Response(status=403, response='Insufficient Permissions')
 
         target_user.access = Stream.LinqStream(iter(Util.UserElevationType)).filter(lambda enum: enum.value == access_type).first_or_default(Util.UserElevationType.MODERATOR)
-        icon_image_data: str = flask.request.form.get('user-editor-user-icon-image-data')
+        icon_image_data: str = flask.request.form.get('user-editor-user-icon-image-data', '')
 
         if len(icon_image_data) > 0:
-            bytestream: io.BytesIO = io.BytesIO(base64.b64decode(icon_image_data))
-            image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-            target_user.usericon = image
+            try:
+                target_user.usericon = image_workers.encode(icon_image_data)
+            except (ValueError, OSError) as err:
+                return flask.Response(status=400, response=f'Malformed user icon: {err}')
     else:
         return flask.Response(status=404, response='Specified user does not exist')
 
@@ -563,21 +743,32 @@ def admin_contact_editor():
     elif socketio.get_session_admin_info(token).access > Util.UserElevationType.ADMINISTRATOR:
         return flask.Response(status=403, response='Insufficient Permissions')
 
-    contact: Storage.MyContactStorageInfo = storage.get_contact(flask.request.form.get('contact-editor-contact-id'))
+    if storage.get_contact(flask.request.form.get('contact-editor-contact-id')) is None:
+        return flask.Response(status=404, response='Specified contact does not exist')
 
-    if contact is not None:
-        contact.contact_type = int(flask.request.form.get('contact-editor-contact-type'), 10)
-        contact.content = flask.request.form.get('contact-editor-contact-content') if 'contact-editor-contact-content' in flask.request.form else None
-        contact.display_name = flask.request.form.get('contact-editor-contact-name')
-        contact.visible = 'contact-editor-contact-visible' in flask.request.form and flask.request.form.get('contact-editor-contact-visible') == 'true'
-        icon_image_data: str = flask.request.form.get('contact-editor-contact-icon-image-data')
+    icon_image_data: str = flask.request.form.get('contact-editor-contact-icon-image-data', '')
 
-        if len(icon_image_data) > 0:
-            bytestream: io.BytesIO = io.BytesIO(base64.b64decode(icon_image_data))
-            image: PIL.Image.Image = PIL.Image.open(bytestream, 'r')
-            contact.icon_image = image
-    else:
-        return flask.Response(status=404, response='Specified contact does not exist')
+    try:
+        icon_image: int | None = image_workers.store(storage.MyImageLoader.MyIconStorage, icon_image_data) if len(icon_image_data) > 0 else None
+    except (ValueError, OSError) as err:
+        return flask.Response(status=400, response=f'Malformed contact icon: {err}')
+
+    with storage.writer():
+        contact: Storage.MyContactStorageInfo = storage.get_contact(flask.request.form.get('contact-editor-contact-id'))
+
+        if contact is not None:
+            contact.contact_type = int(flask.request.form.get('contact-editor-contact-type'), 10)
+            contact.content = flask.request.form.get('contact-editor-contact-content') if 'contact-editor-contact-content' in flask.request.form else None
+            contact.display_name = flask.request.form.get('contact-editor-contact-name')
+            contact.visible = 'contact-editor-contact-visible' in flask.request.form and flask.request.form.get('contact-editor-contact-visible') == 'true'
+
+            if icon_image is not None:
+                contact.icon_image = icon_image
+        else:
+            if icon_image is not None:
+                storage.MyImageLoader.MyIconStorage.del_image(icon_image)
+
+            return flask.Response(status=404, response='Specified contact does not exist')
 
 
     return flask.redirect('/admin', 302)
@@ -595,61 +786,128 @@ def admin_current_user():
     if flask.request.user_agent.string == '' or user_info is None:
         return flask.Response(status=401, response='Invalid Session')
 
-    return flask.Response(response=json.dumps(user_info.send_dict()), status=200, headers={'Content-Type': 'application/json'})
+    return flask.Response(response=JsonCodec.dumpb(user_info.send_dict()), status=200, headers={'Content-Type': 'application/json'})
 
 
-@flask_app.route('/connect-init', methods=('POST',))
+@flask_app.route('/connect-init', methods=('GET', 'POST'))
 def connect_init():
     request: flask.Request = flask.request
 
     if request.content_type != 'application/json' or request.user_agent.string == '':
         return flask.Response(status=401)
 
-    return flask.Response(status=200, response=json.dumps(storage.send_dict()))
+    since: str = request.args.get('since', '')
+    delta: Storage.MyCatalogPayload | None = storage.public_delta(int(since)) if since.isdigit() else None
+    payload: Storage.MyCatalogPayload = storage.public_payload() if delta is None else delta
+    response: flask.Response
 
+    if request.if_none_match.contains(payload.etag):
+        response = flask.Response(status=304)
+    elif request.accept_encodings['gzip']:
+        response = flask.Response(status=200, response=payload.compressed_body, headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'})
+    else:
+        response = flask.Response(status=200, response=payload.body, headers={'Content-Type': 'application/json'})
 
-@flask_app.route('/image/icon/<path:image_id>', methods=('GET', 'POST',))
-def icon_image(image_id: str):
-    if flask.request.user_agent.string == '':
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['X-Catalog-Version'] = str(payload.version)
+    response.headers['X-Catalog-Sync'] = 'full' if delta is None else 'delta'
+    return response
+
+
+@flask_app.route('/search', methods=('GET',))
+def search():
+    request: flask.Request = flask.request
+
+    if request.user_agent.string == '':
         return flask.Response(status=401)
-    elif not image_id.isnumeric():
+
+    query: str = request.args.get('q', '')
+    limit: str = request.args.get('limit', '20')
+
+    if len(query) > 256 or not limit.isdigit():
         return flask.Response(status=400)
 
-    image_id: int = int(image_id, 10)
-    file: FileSystem.File | None = storage.MyImageLoader.MyIconStorage.image_file(image_id)
-    response: flask.Response = flask.Response(status=404, response=f'No such image: {image_id}') if file is None else flask.send_from_directory(storage.MyImageLoader.MyIconStorage.dir.dirpath, file.basename)
-    response.headers['Cache-Control'] = 'no-store'
+    response: flask.Response = flask.Response(status=200, response=JsonCodec.dumpb(storage.search(query, min(int(limit), 100))), headers={'Content-Type': 'application/json'})
+    response.headers['Cache-Control'] = 'no-cache'
     return response
 
 
-@flask_app.route('/image/background/<path:image_id>', methods=('GET', 'POST',))
-def background_image(image_id: str):
-    if flask.request.user_agent.string == '':
-        return flask.Response(status=401)
-    elif not image_id.isnumeric():
-        return flask.Response(status=400)
+@flask_app.route('/replication-status', methods=('GET',))
+def replication_status():
+    status: dict[str, typing.Any] = {'role': 'standalone', 'version': storage.version} if replication is None else replication.status
+    response: flask.Response = flask.Response(status=200, response=JsonCodec.dumpb(status), headers={'Content-Type': 'application/json'})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
-    image_id: int = int(image_id, 10)
-    file: FileSystem.File | None = storage.MyImageLoader.MyBackgroundStorage.image_file(image_id)
-    response: flask.Response = flask.Response(status=404, response=f'No such image: {image_id}') if file is None else flask.send_from_directory(storage.MyImageLoader.MyBackgroundStorage.dir.dirpath, file.basename)
+
+@flask_app.route('/image-cache-status', methods=('GET',))
+def image_cache_status():
+    status: dict[str, typing.Any] = {'memory': storage.MyImageLoader.cache.status, 'variants': image_variants.status, 'workers': image_workers.status}
+    response: flask.Response = flask.Response(status=200, response=JsonCodec.dumpb(status), headers={'Content-Type': 'application/json'})
     response.headers['Cache-Control'] = 'no-store'
     return response
 
 
-@flask_app.route('/image/generic/<path:image_id>', methods=('GET', 'POST',))
-def generic_image(image_id: str):
-    if flask.request.user_agent.string == '':
+def image_response(kind: str, container: Image.MyImageLoader.MyImageContainer, image_id: str) -> flask.Response:
+    request: flask.Request = flask.request
+    width: str | None = request.args.get('w')
+    requested_format: str = request.args.get('format', 'auto').lower()
+
+    if request.user_agent.string == '':
         return flask.Response(status=401)
-    elif not image_id.isnumeric():
+    elif not image_id.isnumeric() or (width is not None and (not width.isdigit() or int(width) == 0)) or (requested_format != 'auto' and requested_format not in ImageVariants.MyImageVariantCache.FORMATS):
         return flask.Response(status=400)
 
     image_id: int = int(image_id, 10)
-    file: FileSystem.File | None = storage.MyImageLoader.MyGenericStorage.image_file(image_id)
-    response: flask.Response = flask.Response(status=404, response=f'No such image: {image_id}') if file is None else flask.send_from_directory(storage.MyImageLoader.MyGenericStorage.dir.dirpath, file.basename)
-    response.headers['Cache-Control'] = 'no-store'
+    image_format: str = ImageVariants.MyImageVariantCache.negotiate(requested_format, request.accept_mimetypes)
+    variant_width: int | None = ImageVariants.MyImageVariantCache.bucket(None if width is None else int(width), container.image_size)
+    variant: tuple = () if variant_width is None and image_format == 'jpeg' else (variant_width, image_format)
+    body: Image.MyImageBodyCache.MyImageBody | None = container.cache.get(container.dir.dirpath, image_id, variant)
+    response: flask.Response
+
+    if body is None:
+        try:
+            path: str | None = image_variants.variant(kind, container, image_id, variant_width, image_format)
+        except OSError as err:
+            return flask.Response(status=500, response=f'Failed to transform image: {err}')
+
+        body = None if path is None else container.cache.load(container.dir.dirpath, image_id, variant, path)
+
+    if body is None:
+        response = flask.Response(status=404, response=f'No such image: {image_id}')
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    elif request.if_none_match.contains(body.etag):
+        response = flask.Response(status=304)
+    else:
+        response = flask.Response(status=200, response=body.data, mimetype=ImageVariants.MyImageVariantCache.FORMATS[image_format][1])
+
+    response.set_etag(body.etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+
+    if requested_format == 'auto':
+        response.headers['Vary'] = 'Accept'
+
     return response
 
 
+@flask_app.route('/image/icon/<path:image_id>', methods=('GET', 'POST',))
+def icon_image(image_id: str):
+    return image_response('icon', storage.MyImageLoader.MyIconStorage, image_id)
+
+
+@flask_app.route('/image/background/<path:image_id>', methods=('GET', 'POST',))
+def background_image(image_id: str):
+    return image_response('background', storage.MyImageLoader.MyBackgroundStorage, image_id)
+
+
+@flask_app.route('/image/generic/<path:image_id>', methods=('GET', 'POST',))
+def generic_image(image_id: str):
+    return image_response('generic', storage.MyImageLoader.MyGenericStorage, image_id)
+
+
 @flask_app.route('/shutdown', methods=('POST',))
 def shutdown():
     if flask.request.remote_addr == '127.0.0.1':
@@ -678,8 +936,18 @@ def shutdown():
 
         thread_close_event.set()
         storage_save_thread.join()
+        image_collector_thread.join()
+        snapshot_publisher_thread.join()
+        static_exporter_thread.join()
         executables.clear()
-        storage.save('Data/storage.json')
+        image_workers.close()
+
+        if replication is not None:
+            replication.close()
+
+        if REPLICATION != 'replica':
+            storage.save(storage_path)
+
         admin_cache.save('Data/admin.dat')
         socketio.socketio.socketio.stop()
         print('\033[38;2;255;0;0m [X] Server Closed\033[0m\n')
@@ -712,7 +980,7 @@ def load_executables(host: str, port: int):
     if external_executable_file.exists():
 
         with external_executable_file.open('r') as f:
-            data = json.load(f)
+            data = JsonCodec.load(f)
 
             for route_name, executable in data.items():
                 if not executable['enabled']:
@@ -765,13 +1033,14 @@ def load_executables(host: str, port: int):
         elif subdomain not in listing or subdomain not in data:
             continue
 
-        program: Storage.MyProgramStorageInfo = storage.add_program(subdomain)
-        program.url = f'/proxyhost/{subdomain}'
-        program.dimensions = (data[subdomain]['width'], data[subdomain]['height'])
-        program.program_type = Util.ProgramType.WEBSITE
-        program.visible = True
-        program.display_name = data[subdomain].get('display-name') or 'N/A'
-        temp_program_listings[subdomain] = program.name
+        with storage.writer():
+            program: Storage.MyProgramStorageInfo = storage.add_program(subdomain)
+            program.url = f'/proxyhost/{subdomain}'
+            program.dimensions = (data[subdomain]['width'], data[subdomain]['height'])
+            program.program_type = Util.ProgramType.WEBSITE
+            program.visible = True
+            program.display_name = data[subdomain].get('display-name') or 'N/A'
+            temp_program_listings[subdomain] = program.name
 
     for close in closed:
         del executables[close]
@@ -791,20 +1060,117 @@ def storage_saver(close_event: threading.Event) -> None:
                 if close_event.is_set():
                     return
 
-            storage.save('Data/storage.json')
-            admin_cache.save('Data/admin.dat')
-            print('\033[38;2;128;128;128m [*] Saved storage and admin cache\033[0m')
+            saved_storage: bool = REPLICATION != 'replica' and storage.save(storage_path)
+            saved_admins: bool = admin_cache.save('Data/admin.dat')
+
+            if saved_storage or saved_admins:
+                print(f'\033[38;2;128;128;128m [*] Saved{' storage' if saved_storage else ''}{' and' if saved_storage and saved_admins else ''}{' admin cache' if saved_admins else ''}\033[0m')
+
+            evicted: int = storage.evict(EVICT_DELAY) if storage.lazy else 0
+
+            if evicted > 0:
+                print(f'\033[38;2;128;128;128m [*] Evicted {evicted} idle game(s)\033[0m')
     except KeyboardInterrupt:
         pass
     finally:
         print(f'\033[38;2;0;150;0m [+] Stopped storage saver thread on thread {tid}\033[0m')
 
 
+def image_collector(close_event: threading.Event) -> None:
+    try:
+        tid: int = threading.current_thread().native_id
+        mode: str = os.getenv('IMAGECOLLECT', 'on')
+        print(f'\033[38;2;0;150;0m [+] Started image collector on thread {tid} - DELAY={IMAGE_COLLECT_DELAY} MODE={mode}\033[0m')
+
+        while mode != 'off' and not close_event.is_set():
+            for _ in range(IMAGE_COLLECT_DELAY):
+                time.sleep(1)
+
+                if close_event.is_set():
+                    return
+
+            report: dict[str, typing.Any] = storage.collect_images(mode == 'dry')
+
+            if report['orphaned'] > 0:
+                print(f'\033[38;2;128;128;128m [*] Image collector {'found' if report['dry-run'] else 'removed'} {report['orphaned']} orphaned image(s) of {report['scanned']} ({report['bytes']} bytes)\033[0m')
+
+                for orphan in report['orphans'] if report['dry-run'] else ():
+                    print(f'\033[38;2;128;128;128m ... {orphan}\033[0m')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f'\033[38;2;0;150;0m [+] Stopped image collector thread on thread {tid}\033[0m')
+
+
+def snapshot_publisher(close_event: threading.Event) -> None:
+    try:
+        tid: int = threading.current_thread().native_id
+        print(f'\033[38;2;0;150;0m [+] Started catalog snapshot publisher on thread {tid} - DELAY={SNAPSHOT_DELAY} PATH={snapshot_path}\033[0m')
+
+        while snapshot_path is not None and not close_event.is_set():
+            try:
+                storage.publish_snapshot(snapshot_path)
+            except IOError as err:
+                print(f'\033[38;5;214m [!] Failed to publish catalog snapshot - {err.__cause__}\033[0m')
+
+            for _ in range(SNAPSHOT_DELAY):
+                time.sleep(1)
+
+                if close_event.is_set():
+                    return
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f'\033[38;2;0;150;0m [+] Stopped catalog snapshot publisher on thread {tid}\033[0m')
+
+
+def static_exporter(close_event: threading.Event) -> None:
+    try:
+        tid: int = threading.current_thread().native_id
+        output: str | None = os.getenv('STATICEXPORT')
+        exporter: StaticExport.MyStaticSiteExporter | None = None if output is None else StaticExport.MyStaticSiteExporter(storage, output)
+        print(f'\033[38;2;0;150;0m [+] Started static site exporter on thread {tid} - DELAY={STATIC_EXPORT_DELAY} PATH={output}\033[0m')
+
+        while exporter is not None and not close_event.is_set():
+            if exporter.version != storage.version:
+                try:
+                    report: dict[str, int] = exporter.export()
+                    print(f'\033[38;2;128;128;128m [*] Exported static site version {report['version']} - {report['written']} file(s) written, {report['reused']} reused, {report['removed']} removed\033[0m')
+                except IOError as err:
+                    print(f'\033[38;5;214m [!] Failed to export static site - {err.__cause__}\033[0m')
+
+            for _ in range(STATIC_EXPORT_DELAY):
+                time.sleep(1)
+
+                if close_event.is_set():
+                    return
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f'\033[38;2;0;150;0m [+] Stopped static site exporter on thread {tid}\033[0m')
+
+
 def main():
-    global storage_save_thread
+    global storage_save_thread, image_collector_thread, snapshot_publisher_thread, static_exporter_thread
+
+    if snapshot_path is not None:
+        os.environ[CatalogSnapshot.MyCatalogSnapshot.ENVIRONMENT] = snapshot_path
+        storage.publish_snapshot(snapshot_path)
+
     load_executables(HOST, PORT)
+    image_workers.start()
     storage_save_thread = threading.Thread(target=storage_saver, args=(thread_close_event,))
     storage_save_thread.start()
+    image_collector_thread = threading.Thread(target=image_collector, args=(thread_close_event,))
+    image_collector_thread.start()
+    snapshot_publisher_thread = threading.Thread(target=snapshot_publisher, args=(thread_close_event,))
+    snapshot_publisher_thread.start()
+    static_exporter_thread = threading.Thread(target=static_exporter, args=(thread_close_event,))
+    static_exporter_thread.start()
+
+    if replication is not None:
+        replication.start()
+
     socketio.listen(HOST, PORT, True)
     print('\033[38;2;0;255;0m [+] Server Started\033[0m')
 
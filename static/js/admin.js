@@ -25,6 +25,59 @@
         win.document.body.style.justifyContent = 'center';
     }
 
+    function catalog_pager(url, prefix)
+    {
+        return {'url': url, 'prefix': prefix, 'cursors': [null], 'next': null, 'offset': 0, 'total': 0};
+    }
+
+    async function fetch_catalog_listing(pager)
+    {
+        let cursor = pager['cursors'][pager['cursors'].length - 1];
+        let url = pager['url'];
+        let response = await window.fetch((cursor === null) ? `${url}?limit=50` : `${url}?limit=50&cursor=${encodeURIComponent(cursor)}`, {method: 'POST', headers: {'Content-Type': 'application/json'}});
+        if (!response.ok) return [null, await response.text()];
+        let listing = await response.json();
+        pager['next'] = response.headers.get('X-Next-Cursor');
+        pager['offset'] = Number(response.headers.get('X-Offset'));
+        pager['total'] = Number(response.headers.get('X-Total-Count'));
+
+        if (Object.keys(listing).length === 0 && pager['cursors'].length > 1)
+        {
+            pager['cursors'].pop();
+            return await fetch_catalog_listing(pager);
+        }
+
+        return [listing, null];
+    }
+
+    function bind_catalog_pager(pager, update)
+    {
+        document.getElementById(`${pager['prefix']}-prev-button`).addEventListener('click', (e) => {
+            if (pager['offset'] === 0 || pager['cursors'].length <= 1) return;
+            pager['cursors'].pop();
+            update();
+        });
+        document.getElementById(`${pager['prefix']}-next-button`).addEventListener('click', (e) => {
+            if (pager['next'] === null) return;
+            pager['cursors'].push(pager['next']);
+            update();
+        });
+    }
+
+    function render_catalog_pager(pager, count)
+    {
+        let first = Math.min(pager['offset'] + 1, pager['total']);
+        let last = Math.min(pager['offset'] + count, pager['total']);
+        document.getElementById(`${pager['prefix']}-prev-button`).disabled = pager['offset'] === 0;
+        document.getElementById(`${pager['prefix']}-next-button`).disabled = pager['next'] === null || last >= pager['total'];
+        document.getElementById(`${pager['prefix']}-page`).innerText = `${first}-${last} / ${pager['total']}`;
+    }
+
+    function is_listing_changed(category, events)
+    {
+        return events.some((event) => event['category'] === category && event['path'].length === 1 && event['type'] !== 'updated');
+    }
+
     function update_session_user_info()
     {
         window.fetch('/admin/current-user', {method: 'POST', headers: {'Content-Type': 'application/json'}}).then(async (response) => {
@@ -57,6 +110,7 @@
             let socket = io(`${window.location.host}/admin`);
             let token = null;
             let interval = undefined;
+            let games_list_chunks = [];
 
             socket.on('disconnect', (e) => {
                 window.clearInterval(interval);
@@ -72,6 +126,15 @@
                 interval = window.setInterval(() => socket.emit('session-tick', token), 300000);
             })
 
+            socket.on('catalog-changes', (payload) => document.dispatchEvent(new CustomEvent('catalog-changes', {detail: JSON.parse(payload)})));
+
+            socket.on('games-list-chunk', (sid, seq, chunk, done) => {
+                if (seq === 0) games_list_chunks = [];
+                games_list_chunks.push(chunk);
+                socket.emit('games-list-ack', sid, seq);
+                if (done) document.dispatchEvent(new CustomEvent('games-list-response', {detail: JSON.parse(games_list_chunks.splice(0).join(''))}));
+            });
+
             socket.emit('request-begin-session');
         });
     }
@@ -80,6 +143,8 @@
     {
         let contacts_container = document.getElementById('contacts-container');
         let listing = contacts_container.querySelector('#contacts-list');
+        let contacts_listing_cache = null;
+        let contacts_pager = catalog_pager('/admin/contacts-list', 'contacts');
 
         async function submit_contact_listing(e)
         {
@@ -124,7 +189,7 @@
             document.getElementById('contact-editor-delete').onclick = (e) => {
                 if (!window.confirm('Delete Contact?')) return;
                 window.fetch('/admin/contacts-del', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({'contact-id': contact_name})}).then(async (response) => {
-                    if (response.ok) update_contacts_listing((await response.json()));
+                    if (response.ok) update_contacts_listing();
                     else alert(`Failed to delete contact:\n${await response.text()}`);
                     dialog.close();
                 });
@@ -156,6 +221,8 @@
         {
             function internal_update(contacts_list)
             {
+                contacts_listing_cache = contacts_list;
+                render_catalog_pager(contacts_pager, Object.keys(contacts_list).length);
                 while (listing.hasChildNodes()) listing.removeChild(listing.firstChild);
 
                 for (let [contactid, contact] of Object.entries(contacts_list))
@@ -181,7 +248,7 @@
                     remove_action.addEventListener('click', (e) => {
                         if (!window.confirm('Delete Contact?')) return;
                         window.fetch('/admin/contacts-del', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({'contact-id': contactid})}).then(async (response) => {
-                            if (response.ok) update_contacts_listing((await response.json()));
+                            if (response.ok) update_contacts_listing();
                             else alert(`Failed to delete contact:\n${await response.text()}`);
                         });
                     });
@@ -196,9 +263,9 @@
 
             if (contacts_listing === undefined)
             {
-                window.fetch('/admin/contacts-list', {method: 'POST', headers: {'Content-Type': 'application/json'}}).then(async (response) => {
-                    if (response.ok) internal_update((await response.json()));
-                    else alert(`Failed to download contacts listing:\n${await response.text()}`);
+                fetch_catalog_listing(contacts_pager).then(([listing, error]) => {
+                    if (listing !== null) internal_update(listing);
+                    else alert(`Failed to download contacts listing:\n${error}`);
                 });
             }
             else
@@ -220,7 +287,7 @@
                 let json = await response.json();
                 let new_contact_id = json['new'];
                 let contacts = json['body'];
-                update_contacts_listing(contacts);
+                update_contacts_listing();
                 open_contact_editor(new_contact_id, contacts[new_contact_id]);
             });
         });
@@ -228,12 +295,21 @@
         contacts_container.ondisplaychange = (element, is_visible) => {
             if (is_visible) update_contacts_listing();
         };
+
+        bind_catalog_pager(contacts_pager, () => update_contacts_listing());
+
+        document.addEventListener('catalog-changes', (e) => {
+            if ((e.detail['reset'] || is_listing_changed('contact', e.detail['events'])) && contacts_listing_cache !== null) update_contacts_listing();
+            else if (apply_catalog_events({'contact': contacts_listing_cache}, e.detail['events']).size > 0) update_contacts_listing(contacts_listing_cache);
+        });
     }
 
     // Programs Section
     {
         let programs_container = document.getElementById('programs-container');
         let tbody = programs_container.getElementsByTagName('tbody')[0];
+        let programs_listing_cache = null;
+        let programs_pager = catalog_pager('/admin/programs-list', 'programs');
 
         async function submit_program_listing(e)
         {
@@ -276,7 +352,7 @@
             document.getElementById('program-editor-delete').onclick = (e) => {
                 if (!window.confirm('Delete Program?')) return;
                 window.fetch('/admin/programs-del', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({'program-id': program_name})}).then(async (response) => {
-                    if (response.ok) update_programs_listing((await response.json()));
+                    if (response.ok) update_programs_listing();
                     else alert(`Failed to delete program:\n${await response.text()}`);
                     dialog.close();
                 });
@@ -291,6 +367,8 @@
         {
             function internal_update(programs_list)
             {
+                programs_listing_cache = programs_list;
+                render_catalog_pager(programs_pager, Object.keys(programs_list).length);
                 while (tbody.hasChildNodes()) tbody.removeChild(tbody.firstChild);
                 let max_col_count = 10;
                 let count = 0;
@@ -335,9 +413,9 @@
 
             if (programs_listing === undefined)
             {
-                window.fetch('/admin/programs-list', {method: 'POST', headers: {'Content-Type': 'application/json'}}).then(async (response) => {
-                    if (response.ok) internal_update((await response.json()));
-                    else alert(`Failed to download programs listing:\n${await response.text()}`);
+                fetch_catalog_listing(programs_pager).then(([listing, error]) => {
+                    if (listing !== null) internal_update(listing);
+                    else alert(`Failed to download programs listing:\n${error}`);
                 });
             }
             else
@@ -359,7 +437,7 @@
                 let json = await response.json();
                 let new_program_id = json['new'];
                 let programs = json['body'];
-                update_programs_listing(programs);
+                update_programs_listing();
                 open_program_editor(new_program_id, programs[new_program_id]);
             });
         });
@@ -367,6 +445,13 @@
         programs_container.ondisplaychange = (element, is_visible) => {
             if (is_visible) update_programs_listing();
         };
+
+        bind_catalog_pager(programs_pager, () => update_programs_listing());
+
+        document.addEventListener('catalog-changes', (e) => {
+            if ((e.detail['reset'] || is_listing_changed('program', e.detail['events'])) && programs_listing_cache !== null) update_programs_listing();
+            else if (apply_catalog_events({'program': programs_listing_cache}, e.detail['events']).size > 0) update_programs_listing(programs_listing_cache);
+        });
     }
 
     // Games Section
@@ -428,10 +513,45 @@
                     }
 
                     document.getElementById('game-editor-container').close();
-                    update_games_listing();
+                    apply_game_diff((await response.json()));
                 });
         }
 
+        function apply_game_diff(diff)
+        {
+            let game = games_listing_cache?.[diff['previous']];
+
+            if (game === undefined || diff['previous'] !== diff['game'])
+            {
+                update_games_listing();
+                return;
+            }
+
+            delete games_listing_cache[diff['previous']];
+            games_listing_cache[diff['game']] = game;
+            Object.assign(game, diff['fields']);
+
+            for (let [section_name, section_diff] of Object.entries(diff['sections']))
+            {
+                if (section_diff === null)
+                {
+                    delete game['sections'][section_name];
+                    continue;
+                }
+
+                let section = game['sections'][section_name] ??= {'children': {}};
+                Object.assign(section, section_diff['fields']);
+
+                for (let [child_name, child] of Object.entries(section_diff['children']))
+                {
+                    if (child === null) delete section['children'][child_name];
+                    else section['children'][child_name] = child;
+                }
+            }
+
+            update_games_listing(games_listing_cache);
+        }
+
         function open_child_editor(game_name, game, section_name, section_data, child_name)
         {
             let parent = document.getElementById('game-section-editor-container');
@@ -675,6 +795,8 @@
         {
             function internal_update(games_list)
             {
+                games_listing_cache = games_list;
+                render_catalog_pager(games_pager, Object.keys(games_list).length);
                 while (listing.hasChildNodes()) listing.removeChild(listing.firstChild);
 
                 for (let [game_name, game] of Object.entries(games_list))
@@ -699,7 +821,7 @@
                     remove_action.addEventListener('click', (e) => {
                         if (!window.confirm('Delete Game?')) return;
                         window.fetch('/admin/games-del', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({'game-id': game_name})}).then(async (response) => {
-                            if (response.ok) update_games_listing((await response.json()));
+                            if (response.ok) update_games_listing();
                             else alert(`Failed to delete game:\n${await response.text()}`);
                         });
                     });
@@ -714,9 +836,9 @@
 
             if (games_listing === undefined)
             {
-                window.fetch('/admin/games-list', {method: 'POST', headers: {'Content-Type': 'application/json'}}).then(async (response) => {
-                    if (response.ok) internal_update((await response.json()));
-                    else alert(`Failed to download games listing:\n${await response.text()}`);
+                fetch_catalog_listing(games_pager).then(([listing, error]) => {
+                    if (listing !== null) internal_update(listing);
+                    else alert(`Failed to download games listing:\n${error}`);
                 });
             }
             else
@@ -737,6 +859,8 @@
         let modified_sections = [];
         let modified_children = [];
         let uuids = [];
+        let games_listing_cache = null;
+        let games_pager = catalog_pager('/admin/games-list', 'games');
 
         document.getElementById('game-editor').addEventListener('submit', submit_game_listing);
         document.getElementById('game-editor-close').addEventListener('click', (e) => {
@@ -764,7 +888,7 @@
                 let json = await response.json();
                 let new_game_id = json['new'];
                 let games = json['body'];
-                update_games_listing(games);
+                update_games_listing();
                 open_game_editor(new_game_id, games[new_game_id]);
             });
         });
@@ -772,6 +896,13 @@
         games_container.ondisplaychange = (element, is_visible) => {
             if (is_visible) update_games_listing();
         };
+
+        bind_catalog_pager(games_pager, () => update_games_listing());
+
+        document.addEventListener('catalog-changes', (e) => {
+            if ((e.detail['reset'] || is_listing_changed('game', e.detail['events'])) && games_listing_cache !== null) update_games_listing();
+            else if (apply_catalog_events({'game': games_listing_cache}, e.detail['events']).size > 0) update_games_listing(games_listing_cache);
+        });
     }
 
     // Users Section
@@ -0,0 +1,43 @@
+let catalog_images = null;
+
+function catalog_image_url(kind, image_id, width = 0)
+{
+    if (catalog_images !== null) return catalog_images[kind][String(image_id)] ?? '';
+    if (width <= 0) return `/image/${kind}/${image_id}`;
+    return `/image/${kind}/${image_id}?w=${Math.ceil(width * (window.devicePixelRatio || 1))}`;
+}
+
+function set_catalog_image(img, kind, image_id, width = 0)
+{
+    // Without an explicit width, the variant is sized to the element once it has been laid out
+    if (width > 0 || catalog_images !== null) img.src = catalog_image_url(kind, image_id, width);
+    else requestAnimationFrame(() => img.src = catalog_image_url(kind, image_id, img.clientWidth));
+}
+
+function apply_catalog_events(storages, events)
+{
+    let touched = new Set();
+
+    for (let event of events)
+    {
+        let container = storages[event['category']];
+        let path = event['path'];
+        if (container === undefined || container === null) continue;
+
+        for (let i = 0; i < path.length - 1 && container !== undefined; ++i)
+        {
+            let parent = container[path[i]];
+            container = (parent === undefined) ? undefined : parent[(i === 0) ? 'sections' : 'children'];
+        }
+
+        if (container === undefined) continue;
+        let name = path[path.length - 1];
+        touched.add(event['category']);
+
+        if (event['type'] === 'removed') delete container[name];
+        else if (event['type'] === 'added') container[name] = event['data'];
+        else if (container[name] !== undefined) Object.assign(container[name], event['fields']);
+    }
+
+    return touched;
+}
@@ -29,10 +29,10 @@
             header.title = game_url;
             header.onclick = (e) => window.open(game_url, '_blank');
             header_container.className = 'section-header';
-            if (icon_image !== null) icon_img.src = `/image/icon/${icon_image}`;
+            if (icon_image !== null) set_catalog_image(icon_img, 'icon', icon_image);
             icon_img.onclick = header.onclick;
             icon_img.title = header.title;
-            if (bg_image !== null) background_image.src = `/image/background/${bg_image}`;
+            if (bg_image !== null) set_catalog_image(background_image, 'background', bg_image, Math.max(window.innerWidth, 2 * window.innerHeight));
             background_image_box.className = 'background-image-box';
 
             for (let section of Object.values(sections))
@@ -58,7 +58,7 @@
 
                     let child_icon_img = document.createElement('img');
                     child_icon_img.className = 'game-icon-image';
-                    child_icon_img.src = (child_icon_image === null) ? icon_img.src : `/image/icon/${child_icon_image}`;
+                    if ((child_icon_image ?? icon_image) !== null) set_catalog_image(child_icon_img, 'icon', child_icon_image ?? icon_image);
 
                     let child_name = document.createElement('a');
                     child_name.className = 'game-name';
@@ -195,7 +195,7 @@
             else if (program_url === null) program_cont.title = program_name;
             else program_cont.title = `${program_name}\n${program_url}`;
             if (icon_image === null && program_url !== null) program_image.src = `https://s2.googleusercontent.com/s2/favicons?domain_url=${program_url}`;
-            else if (icon_image !== null) program_image.src = `/image/icon/${icon_image}`;
+            else if (icon_image !== null) set_catalog_image(program_image, 'icon', icon_image);
             program_cont.style.gridArea = `${celly + 1}/${cellx + 1}/span ${height}/span ${width}`;
             program_cont.style.borderColor = program_colors[type];
             if (program_url !== null) program_cont.addEventListener('click', (e) => window.open(program_url, '_blank'));
@@ -217,7 +217,7 @@
             let contact_url = contact['url'];
 
             contact_container.className = 'contact';
-            contact_icon.src = `/image/icon/${contact['icon-image']}`;
+            set_catalog_image(contact_icon, 'icon', contact['icon-image']);
             contact_header.innerText = contact['display-name'];
 
             if (contact_url !== null)
@@ -237,14 +237,105 @@
 
     // Retrieve program info
     {
-        window.fetch('/connect-init', {headers: {'Content-Type': 'application/json'}, method: 'POST'}).then(async (response) => {
-            let json = JSON.parse(await response.text());
-            if (json == null) return;
-            propagate_game_info(json['game-storage']);
-            propagate_program_info(json['program-storage']);
-            propagate_contact_info(json['contact-storage']);
-            window.addEventListener('resize', (e) => propagate_program_info(json['program-storage']));
-        });
+        let cached = null;
+        let syncing = false;
+        let queued = [];
+        let static_catalog = document.querySelector('meta[name="static-catalog"]');
+
+        try { cached = (static_catalog === null) ? JSON.parse(window.localStorage.getItem('catalog')) : null; }
+        catch (e) { cached = null; }
+
+        function store_catalog()
+        {
+            try { window.localStorage.setItem('catalog', JSON.stringify(cached)); }
+            catch (e) { window.localStorage.removeItem('catalog'); }
+        }
+
+        function render_catalog()
+        {
+            let game_master = document.getElementById('gameextras');
+            let contact_listing = document.getElementById('contact-info-container').firstElementChild;
+            while (game_master.hasChildNodes()) game_master.removeChild(game_master.firstChild);
+            while (contact_listing.hasChildNodes()) contact_listing.removeChild(contact_listing.firstChild);
+            document.querySelectorAll('#section-links a[href^="#game-"]').forEach((anchor) => anchor.remove());
+
+            propagate_game_info(cached['catalog']['game-storage']);
+            propagate_program_info(cached['catalog']['program-storage']);
+            propagate_contact_info(cached['catalog']['contact-storage']);
+        }
+
+        function apply_catalog_changes(changes)
+        {
+            if (syncing || cached === null) queued.push(changes);
+            else if (changes['reset'] || changes['since'] > Number(cached['version'])) sync_catalog();
+            else if (changes['version'] > Number(cached['version']))
+            {
+                let catalog = cached['catalog'];
+                apply_catalog_events({'game': catalog['game-storage'], 'program': catalog['program-storage'], 'contact': catalog['contact-storage']}, changes['events']);
+                cached['version'] = changes['version'];
+                store_catalog();
+                render_catalog();
+            }
+        }
+
+        function load_static_catalog()
+        {
+            window.fetch(static_catalog.content, {method: 'GET'}).then(async (response) => {
+                if (!response.ok) return;
+                let json = await response.json();
+                catalog_images = json['images'];
+                cached = {'version': String(json['version']), 'catalog': json['catalog']};
+                render_catalog();
+            });
+        }
+
+        function sync_catalog()
+        {
+            let url = (cached === null) ? '/connect-init' : `/connect-init?since=${cached['version']}`;
+            syncing = true;
+
+            window.fetch(url, {headers: {'Content-Type': 'application/json'}, method: 'GET'}).then(async (response) => {
+                let json = JSON.parse(await response.text());
+                syncing = false;
+                if (json == null) return;
+
+                if (response.headers.get('X-Catalog-Sync') === 'delta')
+                {
+                    for (let storage_key of ['game-storage', 'program-storage', 'contact-storage'])
+                    {
+                        for (let name of json['removed'][storage_key]) delete cached['catalog'][storage_key][name];
+                        Object.assign(cached['catalog'][storage_key], json['added'][storage_key], json['changed'][storage_key]);
+                    }
+
+                    json = cached['catalog'];
+                }
+
+                cached = {'version': response.headers.get('X-Catalog-Version'), 'catalog': json};
+                store_catalog();
+                render_catalog();
+                for (let changes of queued.splice(0)) apply_catalog_changes(changes);
+            }).finally(() => syncing = false);
+        }
+
+        window.addEventListener('resize', (e) => { if (cached !== null) propagate_program_info(cached['catalog']['program-storage']); });
+
+        let inline_catalog = document.getElementById('inline-catalog');
+
+        if (static_catalog !== null) load_static_catalog();
+        else
+        {
+            if (inline_catalog === null) sync_catalog();
+            else
+            {
+                cached = {'version': inline_catalog.dataset.version, 'catalog': JSON.parse(inline_catalog.textContent)};
+                store_catalog();
+                render_catalog();
+            }
+
+            let socket = io(`${window.location.host}/catalog`);
+            socket.on('catalog-version', (version) => { if (!syncing && cached !== null && Number(version) !== Number(cached['version'])) sync_catalog(); });
+            socket.on('catalog-changes', (payload) => apply_catalog_changes(JSON.parse(payload)));
+        }
     }
 
     // Navbar Animation